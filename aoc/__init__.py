@@ -0,0 +1,3 @@
+from aoc.registry import Day, discover, get_day, get_solver
+
+__all__ = ["Day", "discover", "get_day", "get_solver"]
@@ -0,0 +1,494 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Subsystems are imported by the commands that use them: `solve` talks to the
+# daemon, it should not pay for NumPy, pools and the rest before trying the socket
+from aoc.registry import discover, get_day
+
+
+def run(args: argparse.Namespace) -> None:
+    from aoc_utils import timing
+
+    from aoc import bench, history, instrument, memo, memory, runner, telemetry
+
+    if args.cprofile is not None:
+        os.environ["AOC_PROFILE"] = "cprofile"
+    elif args.memory:
+        os.environ["AOC_PROFILE"] = "memory"
+    elif args.profile or args.collapsed is not None:
+        os.environ["AOC_PROFILE"] = "1"
+    if args.telemetry is not None:
+        os.environ["AOC_TELEMETRY"] = "1"
+    day = get_day(args.day)
+    path = args.input if args.input is not None else day.default_input
+    # The day module is imported here, after the switch is set
+    solver = day.solver(args.part)
+    memory.set_limit(memory.budget(args.memory_limit))
+    start, start_cpu = time.perf_counter(), time.process_time()
+    status, result = runner.ERROR, None
+    try:
+        with instrument.profile(args.cprofile), instrument.phase(f"day{day.number}.part{args.part}"):
+            with timing():
+                result = solver(path)
+        status = runner.OK
+    except MemoryError:
+        status = runner.MEMORY
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - start, time.process_time() - start_cpu
+        record = history.make_run(
+            day.number, args.part, path, "run", status, wall, cpu, history.peak_rss(), result
+        )
+        history.append([record])
+    print(result)
+    if instrument.enabled():
+        print(instrument.format_tree(), file=sys.stderr)
+    if (tracer := instrument.RECORDER.tracer) is not None:
+        print(memory.format_sites(tracer.sites, tracer.fullest), file=sys.stderr)
+    if args.collapsed is not None:
+        args.collapsed.write_text("\n".join(instrument.collapsed_stacks()) + "\n")
+    if args.telemetry is not None:
+        bench.save_report(telemetry.export(), args.telemetry)
+    if args.memo_stats:
+        print(memo.format_report(memo.report()), file=sys.stderr)
+
+
+def run_bench(args: argparse.Namespace) -> None:
+    from aoc import bench, generators, runner
+
+    baseline = args.baseline or bench.DEFAULT_BASELINE
+    curves = bench.run_suite(
+        days=args.day,
+        parts=args.part or (1, 2),
+        inputs=(
+            generators.provider(args.generate, args.seed)
+            if args.generate
+            else bench.glob_inputs(args.inputs or bench.DEFAULT_INPUTS)
+        ),
+        repeats=args.repeats,
+        use_cache=args.use_cache,
+        timeout=args.timeout or runner.DEFAULT_TIMEOUT,
+    )
+    report = bench.to_report(curves)
+    if args.output is not None:
+        bench.save_report(report, args.output)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.save_baseline:
+        bench.save_report(report, baseline)
+        return
+    if baseline.exists():
+        regressions = bench.find_regressions(report, bench.load_report(baseline), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+def run_all(args: argparse.Namespace) -> None:
+    from aoc import bench, history, memory, runner
+
+    jobs = runner.make_jobs(args.day, args.part or (1, 2), args.inputs or runner.DEFAULT_INPUTS)
+    durations_path = args.durations or runner.DEFAULT_DURATIONS
+    durations = runner.load_durations(durations_path)
+    workers = args.workers or runner.default_workers()
+    timeout = args.timeout or runner.DEFAULT_TIMEOUT
+    start = time.perf_counter()
+    memory_limit = memory.budget(args.memory_limit)
+    results = runner.run_jobs(jobs, workers, timeout, durations, memory_limit)
+    history.append(
+        history.make_run(
+            r.day, r.part, job.path, "all", r.status, r.seconds, r.cpu, r.peak_rss, r.result
+        )
+        for job, r in zip(jobs, results)
+        if r.status != runner.MISSING
+    )
+    report = runner.to_report(results, time.perf_counter() - start, workers)
+    runner.update_durations(durations, results)
+    runner.save_durations(durations, durations_path)
+    if args.output is not None:
+        bench.save_report(report, args.output)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    for result in results:
+        if result.status != runner.OK:
+            print(f"day {result.day} part {result.part}: {result.status}", file=sys.stderr)
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    from aoc import batch, history, runner
+
+    paths = batch.expand_inputs(args.inputs)
+    print(json.dumps({"day": args.day, "prepare": batch.prepare(args.day)}), flush=True)
+    for result in batch.run_batch(args.day, paths, args.part or (1, 2)):
+        print(json.dumps(result.to_dict()), flush=True)
+        if result.status != runner.MISSING:
+            # The peak is the one of the whole batch so far
+            record = history.make_run(
+                args.day,
+                result.part,
+                Path(result.input),
+                "batch",
+                result.status,
+                result.seconds,
+                result.cpu,
+                history.peak_rss(),
+                result.result,
+            )
+            history.append([record])
+
+
+def serve(args: argparse.Namespace) -> None:
+    from aoc import daemon
+
+    if args.stop:
+        print(json.dumps(daemon.request({"op": "shutdown"}, args.socket)))
+        return
+    daemon.serve(args.socket, args.day, args.timeout)
+
+
+def solve(args: argparse.Namespace) -> None:
+    from aoc import daemon
+
+    if args.stdin:
+        data = sys.stdin.buffer.read()
+        answer, remote = daemon.solve(
+            args.day, args.part, data=data, name=args.name, path=args.socket
+        )
+    else:
+        day = get_day(args.day)
+        path = args.input if args.input is not None else day.default_input
+        answer, remote = daemon.solve(args.day, args.part, input=path, path=args.socket)
+    # Only needed once the answer is in
+    from aoc import history, runner
+
+    print(answer["result"] if answer["status"] == runner.OK else answer["error"])
+    if answer["status"] != runner.MISSING:
+        # Timed where it ran, the peak RSS of the daemon is not known here
+        record = history.make_run(
+            args.day,
+            args.part,
+            data if args.stdin else path,
+            "daemon" if remote else "solve",
+            answer["status"],
+            answer["seconds"],
+            answer.get("cpu"),
+            None if remote else history.peak_rss(),
+            answer["result"],
+        )
+        history.append([record])
+    where = "daemon" if remote else "in process"
+    print(f"{answer['status']} in {answer['seconds']:.4f}s ({where})", file=sys.stderr)
+    if answer["status"] != runner.OK:
+        sys.exit(1)
+
+
+def show_history(args: argparse.Namespace) -> None:
+    from aoc import history, runner
+
+    last = args.last or history.DEFAULT_LAST
+    with history.connect(args.database) as connection:
+        runs = history.select(connection, args.day, args.part, status=runner.OK)
+    if args.query == "trend":
+        print(history.format_trends(history.trends(runs, last)))
+        return
+    if args.query == "regressions":
+        problems = history.regressions(runs, last, args.tolerance or history.DEFAULT_TOLERANCE)
+    else:
+        problems = history.answer_changes(runs)
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+
+
+def check_engines(args: argparse.Namespace) -> None:
+    from aoc import engines
+
+    registered = engines.engines(args.day)
+    paths = list(args.inputs or [])
+    if not args.inputs or args.generate:
+        paths += engines.generated_inputs(
+            args.day, args.scale or engines.DEFAULT_SCALES, args.seeds or engines.DEFAULT_SEEDS
+        )
+    checks = []
+    for part in args.part or sorted(registered):
+        kinds = registered.get(part, {})
+        if engines.FAST not in kinds:
+            print(f"{args.day}.{part}: no fast engine, nothing to check", file=sys.stderr)
+            continue
+        checks += engines.cross_check(args.day, part, paths, minimise=not args.no_shrink)
+    if args.output is not None:
+        args.output.write_text(json.dumps([check.to_dict() for check in checks], indent=2))
+    if checks:
+        print(engines.format_checks(checks))
+    if any(check.status != engines.MATCH for check in checks):
+        sys.exit(1)
+
+
+def calibrate(args: argparse.Namespace) -> None:
+    from aoc import dispatch
+
+    # Importing the days registers their dispatches
+    for day in args.day or discover():
+        get_day(day).load()
+    if args.show:
+        thresholds = {name: d.thresholds for name, d in dispatch.dispatches().items()}
+    else:
+        thresholds = dispatch.calibrate(args.name)
+    print(dispatch.format_thresholds(thresholds))
+
+
+def run_footprint(args: argparse.Namespace) -> None:
+    from aoc import footprint
+
+    print(footprint.format_report(footprint.report(args.n or footprint.DEFAULT_N)))
+
+
+def generate(args: argparse.Namespace) -> None:
+    from aoc import generators
+
+    for scale in args.scale:
+        path = args.output if len(args.scale) == 1 else None
+        print(generators.generate(args.day, scale, args.seed, path))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="aoc")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run a single part of a day")
+    run_parser.add_argument("--day", type=int, required=True)
+    run_parser.add_argument("--part", type=int, choices=(1, 2), required=True)
+    run_parser.add_argument("--input", type=Path, default=None)
+    run_parser.add_argument(
+        "--profile", action="store_true", help="Print the time spent in each phase"
+    )
+    run_parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Print the peak memory of each phase and the top allocation sites",
+    )
+    run_parser.add_argument(
+        "--memory-limit",
+        default=None,
+        help="Fail with a MemoryError past this size (bytes, or 512M, 2G...)",
+    )
+    run_parser.add_argument(
+        "--collapsed",
+        type=Path,
+        default=None,
+        help="Write the phases as collapsed stacks, for flame graphs",
+    )
+    run_parser.add_argument(
+        "--cprofile", type=Path, default=None, help="Write cProfile stats there"
+    )
+    run_parser.add_argument(
+        "--telemetry",
+        type=Path,
+        default=None,
+        help="Report progress while running and write the samples there as JSON",
+    )
+    run_parser.add_argument(
+        "--memo-stats",
+        action="store_true",
+        help="Print the hits, misses and evictions of the memoised functions",
+    )
+    run_parser.set_defaults(func=run)
+
+    bench_parser = subparsers.add_parser(
+        "bench", help="Measure how each part scales with the input size"
+    )
+    bench_parser.add_argument("--day", type=int, action="append", default=None)
+    bench_parser.add_argument(
+        "--part", type=int, choices=(1, 2), action="append", default=None
+    )
+    bench_parser.add_argument(
+        "--inputs",
+        default=None,
+        help="Glob relative to the repo root, {day} is replaced by the day number "
+        "(default: day{day}/scaling/*.txt)",
+    )
+    bench_parser.add_argument(
+        "--generate",
+        type=int,
+        nargs="+",
+        default=None,
+        metavar="SCALE",
+        help="Use generated inputs at these scales instead of --inputs",
+    )
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.add_argument("--repeats", type=int, default=5)
+    bench_parser.add_argument("--use-cache", action="store_true")
+    bench_parser.add_argument(
+        "--timeout", type=float, default=None, help="Seconds per solve (default: 60)"
+    )
+    bench_parser.add_argument("--output", type=Path, default=None)
+    bench_parser.add_argument(
+        "--baseline", type=Path, default=None, help="Default: benchmarks/baseline.json"
+    )
+    bench_parser.add_argument("--save-baseline", action="store_true")
+    bench_parser.add_argument("--tolerance", type=float, default=1.25)
+    bench_parser.set_defaults(func=run_bench)
+
+    all_parser = subparsers.add_parser(
+        "all", help="Run many parts in parallel, each with a timeout"
+    )
+    all_parser.add_argument("--day", type=int, action="append", default=None)
+    all_parser.add_argument(
+        "--part", type=int, choices=(1, 2), action="append", default=None
+    )
+    all_parser.add_argument(
+        "--inputs",
+        default=None,
+        help="Path relative to the repo root, {day} is replaced by the day number "
+        "(default: day{day}/input.txt)",
+    )
+    all_parser.add_argument(
+        "--workers", type=int, default=None, help="Defaults to the number of CPUs"
+    )
+    all_parser.add_argument(
+        "--timeout", type=float, default=None, help="Seconds per part (default: 60)"
+    )
+    all_parser.add_argument(
+        "--durations",
+        type=Path,
+        default=None,
+        help="Durations of previous runs, used to start the longest parts first",
+    )
+    all_parser.add_argument(
+        "--memory-limit", default=None, help="Per part, in bytes or with a K, M or G suffix"
+    )
+    all_parser.add_argument("--output", type=Path, default=None)
+    all_parser.set_defaults(func=run_all)
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Solve many inputs of one day in one process, one JSON line per result",
+    )
+    batch_parser.add_argument("--day", type=int, required=True)
+    batch_parser.add_argument(
+        "--part", type=int, choices=(1, 2), action="append", default=None
+    )
+    batch_parser.add_argument(
+        "inputs", nargs="+", help="Input files, directories of .txt files or globs"
+    )
+    batch_parser.set_defaults(func=run_batch)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Keep the days imported and warm, answer solves on a Unix socket"
+    )
+    serve_parser.add_argument(
+        "--day", type=int, action="append", default=None, help="Days to warm (default: all)"
+    )
+    serve_parser.add_argument("--socket", type=Path, default=None)
+    serve_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Seconds a solve may take before it is killed (default: 60)",
+    )
+    serve_parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    serve_parser.set_defaults(func=serve)
+
+    solve_parser = subparsers.add_parser(
+        "solve", help="Solve through the daemon, or in this process if none is running"
+    )
+    solve_parser.add_argument("--day", type=int, required=True)
+    solve_parser.add_argument("--part", type=int, choices=(1, 2), required=True)
+    solve_parser.add_argument("--input", type=Path, default=None)
+    solve_parser.add_argument(
+        "--stdin", action="store_true", help="Send the input itself, read from stdin"
+    )
+    solve_parser.add_argument(
+        "--name", default=None, help="File name to give the input read from stdin"
+    )
+    solve_parser.add_argument("--socket", type=Path, default=None)
+    solve_parser.set_defaults(func=solve)
+
+    history_parser = subparsers.add_parser(
+        "history", help="Query the timings and answers of previous runs"
+    )
+    history_parser.add_argument(
+        "query",
+        choices=("trend", "regressions", "answers"),
+        help="Recent timings, runs slower than the median before them, changed answers",
+    )
+    history_parser.add_argument("--day", type=int, action="append", default=None)
+    history_parser.add_argument(
+        "--part", type=int, choices=(1, 2), action="append", default=None
+    )
+    history_parser.add_argument(
+        "--last", type=int, default=None, help="Runs the median is taken over (default: 10)"
+    )
+    history_parser.add_argument("--tolerance", type=float, default=None, help="Default: 1.25")
+    history_parser.add_argument("--database", type=Path, default=None)
+    history_parser.set_defaults(func=show_history)
+
+    check_parser = subparsers.add_parser(
+        "check", help="Compare the fast engines of a day with the reference ones"
+    )
+    check_parser.add_argument("--day", type=int, required=True)
+    check_parser.add_argument(
+        "--part", type=int, choices=(1, 2), action="append", default=None
+    )
+    check_parser.add_argument(
+        "--inputs", type=Path, nargs="+", default=None, help="Check on these inputs"
+    )
+    check_parser.add_argument(
+        "--generate",
+        action="store_true",
+        help="Check on generated inputs too (the default without --inputs)",
+    )
+    check_parser.add_argument("--scale", type=int, nargs="+", default=None)
+    check_parser.add_argument(
+        "--seeds", type=int, default=None, help="Generated inputs per scale"
+    )
+    check_parser.add_argument(
+        "--no-shrink", action="store_true", help="Do not shrink the inputs that disagree"
+    )
+    check_parser.add_argument("--output", type=Path, default=None)
+    check_parser.set_defaults(func=check_engines)
+
+    calibrate_parser = subparsers.add_parser(
+        "calibrate",
+        help="Measure where the vectorised implementations start to beat plain Python",
+    )
+    calibrate_parser.add_argument(
+        "--day", type=int, action="append", default=None, help="Days to load (default: all)"
+    )
+    calibrate_parser.add_argument(
+        "--name", action="append", default=None, help="Only these dispatches"
+    )
+    calibrate_parser.add_argument(
+        "--show", action="store_true", help="Print the thresholds in use, measure nothing"
+    )
+    calibrate_parser.set_defaults(func=calibrate)
+
+    footprint_parser = subparsers.add_parser(
+        "footprint", help="Bytes per element of the domain objects, before and after"
+    )
+    footprint_parser.add_argument("--n", type=int, default=None)
+    footprint_parser.set_defaults(func=run_footprint)
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="Write synthetic inputs, by default in day<N>/scaling"
+    )
+    generate_parser.add_argument("--day", type=int, required=True)
+    generate_parser.add_argument("--scale", type=int, nargs="+", required=True)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--output", type=Path, default=None)
+    generate_parser.set_defaults(func=generate)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
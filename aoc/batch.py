@@ -0,0 +1,89 @@
+"""
+Solve many inputs of one day in a single process.
+
+The day module is imported once, and with it everything that does not depend
+on the input: keypad tables, memoised results and so on. A day module can also
+define `prepare()` to build or warm up such things ahead of time, it is called
+once, before the first input, and timed on its own.
+Results are yielded one input and part at a time, as they are computed.
+"""
+
+from __future__ import annotations
+import glob
+import os
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from aoc.registry import get_day
+from aoc.runner import ERROR, MISSING, OK
+
+
+@dataclass
+class BatchResult:
+    input: str
+    part: int
+    status: str
+    seconds: float
+    result: str | None = None
+    error: str | None = None
+    cpu: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def expand_inputs(specs: Iterable[str | Path]) -> list[Path]:
+    """Files as they are, the .txt files of directories, and glob patterns"""
+    paths = []
+    for spec in map(str, specs):
+        if os.path.isdir(spec):
+            paths.extend(sorted(Path(spec).glob("*.txt")))
+        elif glob.has_magic(spec):
+            paths.extend(sorted(map(Path, glob.glob(spec))))
+        else:
+            paths.append(Path(spec))
+    return paths
+
+
+def prepare(day: int) -> float:
+    """Import the day and run its prepare hook, if any, returns the time it took"""
+    start = time.perf_counter()
+    module = get_day(day).load()
+    if (hook := getattr(module, "prepare", None)) is not None:
+        hook()
+    return time.perf_counter() - start
+
+
+def run_batch(
+    day: int, paths: Iterable[Path], parts: Iterable[int] = (1, 2)
+) -> Iterator[BatchResult]:
+    solvers = {}
+    for part in parts:
+        try:
+            solvers[part] = get_day(day).solver(part)
+        except LookupError:
+            solvers[part] = None
+    for path in paths:
+        for part, solver in solvers.items():
+            if solver is None:
+                error = f"Day {day} has no part {part}"
+                yield BatchResult(str(path), part, MISSING, 0.0, error=error)
+                continue
+            # The solvers are chatty (prints and progress bars)
+            with open(os.devnull, "w") as sink, redirect_stdout(sink), redirect_stderr(sink):
+                start, start_cpu = time.perf_counter(), time.process_time()
+                try:
+                    result = solver(path)
+                except Exception as e:
+                    seconds = time.perf_counter() - start
+                    cpu = time.process_time() - start_cpu
+                    error = f"{type(e).__name__}: {e}"
+                    outcome = BatchResult(str(path), part, ERROR, seconds, error=error, cpu=cpu)
+                else:
+                    seconds = time.perf_counter() - start
+                    cpu = time.process_time() - start_cpu
+                    outcome = BatchResult(str(path), part, OK, seconds, str(result), cpu=cpu)
+            yield outcome
@@ -0,0 +1,241 @@
+"""
+Scaling benchmarks.
+
+Every part is run over inputs of growing size, a few times each, and an empirical
+exponent k is fitted to time ~ size^k on a log-log scale.
+k close to 1 means linear, close to 2 means quadratic, and so on.
+Sizes are the input sizes in bytes.
+
+Every point runs in a worker of aoc.runner, with a timeout per solve. A part
+that never ends, or fails, is recorded as such for that point and the suite
+goes on. Points are told apart by their input file and nominal size, the
+generator scale or the file size, so inputs of the same size stay distinct.
+A generated input may come with its answer (see aoc.generators), a point that
+gets another one is recorded as WRONG, its times do not count.
+"""
+
+from __future__ import annotations
+import glob
+import json
+import math
+import os
+import statistics
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from aoc import runner
+from aoc.registry import ROOT, Day, discover
+
+DEFAULT_INPUTS = "day{day}/scaling/*.txt"
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+# The smallest inputs run in microseconds, slowdowns below this are noise
+MIN_REGRESSION_SECONDS = 1e-3
+# Status of a point whose answer is not the one its generator planted
+WRONG = "wrong"
+
+# (nominal size, path) of every input of a day
+InputProvider = Callable[[Day], list[tuple[int, Path]]]
+
+
+@dataclass
+class Measurement:
+    size: int
+    times: list[float]
+    input: str = ""
+    nominal: int = 0
+    status: str = runner.OK
+    error: str | None = None
+
+    @property
+    def point(self) -> tuple[str, int]:
+        return self.input, self.nominal
+
+    @property
+    def median(self) -> float | None:
+        return statistics.median(self.times) if self.times else None
+
+    @property
+    def best(self) -> float | None:
+        return min(self.times) if self.times else None
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.times) if len(self.times) > 1 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "input": self.input,
+            "nominal": self.nominal,
+            "size": self.size,
+            "status": self.status,
+            "error": self.error,
+            "median": self.median,
+            "best": self.best,
+            "stdev": self.stdev,
+            "times": self.times,
+        }
+
+
+@dataclass
+class Curve:
+    day: int
+    part: int
+    measurements: list[Measurement] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f"{self.day}.{self.part}"
+
+    @property
+    def exponent(self) -> float | None:
+        solved = [m for m in self.measurements if m.status == runner.OK]
+        return fit_exponent([m.size for m in solved], [m.median for m in solved])
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "day": self.day,
+            "part": self.part,
+            "exponent": self.exponent,
+            "measurements": [m.to_dict() for m in self.measurements],
+        }
+
+
+def fit_exponent(sizes: list[int], times: list[float]) -> float | None:
+    """Least squares slope of log(time) against log(size)"""
+    points = [(math.log(s), math.log(t)) for s, t in zip(sizes, times) if s > 0 and t > 0]
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return covariance / variance
+
+
+def glob_inputs(pattern: str = DEFAULT_INPUTS) -> InputProvider:
+    """Files on disk, their nominal size is their size in bytes"""
+
+    def provider(day: Day) -> list[tuple[int, Path]]:
+        paths = map(Path, glob.glob(str(ROOT / pattern.format(day=day.number))))
+        return [(path.stat().st_size, path) for path in paths]
+
+    return provider
+
+
+def run_suite(
+    days: Iterable[int] | None = None,
+    parts: Iterable[int] = (1, 2),
+    inputs: InputProvider | None = None,
+    repeats: int = 5,
+    warmup: int = 1,
+    use_cache: bool = False,
+    timeout: float = runner.DEFAULT_TIMEOUT,
+) -> list[Curve]:
+    """`timeout` is per solve, a point gets it for each of its runs"""
+    # Imported here, aoc.generators imports this module for InputProvider
+    from aoc import generators
+
+    inputs = inputs or glob_inputs()
+    all_days = discover()
+    days = sorted(all_days) if days is None else days
+    previous = os.environ.get("AOC_CACHE")
+    if not use_cache:
+        # Parsing is part of what we want to measure, the workers inherit this
+        os.environ["AOC_CACHE"] = "0"
+    curves, jobs, points = [], [], []
+    try:
+        for number in days:
+            day = all_days[number]
+            if not (sized_inputs := inputs(day)):
+                continue
+            for part in parts:
+                try:
+                    # Imported here, the forked workers start with it
+                    day.solver(part)
+                except LookupError:
+                    continue
+                curves.append(curve := Curve(number, part))
+                for nominal, path in sorted(sized_inputs):
+                    jobs.append(runner.Job(number, part, path, repeats, warmup))
+                    points.append((curve, nominal))
+        # One at a time, parallel runs would disturb each other's timings
+        results = runner.run_jobs(jobs, 1, timeout * (warmup + repeats))
+        for job, (curve, nominal), result in zip(jobs, points, results):
+            path = job.path.relative_to(ROOT) if job.path.is_relative_to(ROOT) else job.path
+            status, error = result.status, result.error
+            known = generators.known_answers(job.path).get(job.part)
+            if status == runner.OK and known not in (None, result.result):
+                status, error = WRONG, f"Expected {known}, got {result.result}"
+            # A part that failed halfway may have timed some runs, they do not count
+            times = (result.times or []) if status == runner.OK else []
+            measurement = Measurement(
+                job.path.stat().st_size, times, str(path), nominal, status, error
+            )
+            curve.measurements.append(measurement)
+    finally:
+        if previous is None:
+            os.environ.pop("AOC_CACHE", None)
+        else:
+            os.environ["AOC_CACHE"] = previous
+    return curves
+
+
+def to_report(curves: list[Curve]) -> dict[str, Any]:
+    return {"curves": {curve.key: curve.to_dict() for curve in curves}}
+
+
+def find_regressions(
+    report: dict[str, Any], baseline: dict[str, Any], tolerance: float = 1.25
+) -> list[str]:
+    """
+    Compare the medians point by point, a part regresses when it is more than
+    `tolerance` times slower than the baseline at any point, or stops solving one.
+    """
+    regressions = []
+    for key, curve in report["curves"].items():
+        if (reference := baseline["curves"].get(key)) is None:
+            continue
+        before_points = {_point(m): m for m in reference["measurements"]}
+        for measurement in curve["measurements"]:
+            if (before := before_points.get(_point(measurement))) is None:
+                continue
+            where = f"day {curve['day']} part {curve['part']} {_label(measurement)}"
+            before_status = before.get("status", runner.OK)
+            if (after_status := measurement.get("status", runner.OK)) != runner.OK:
+                if before_status == runner.OK:
+                    regressions.append(f"{where}: {before_status} -> {after_status}")
+                continue
+            if before_status != runner.OK:
+                continue
+            before_median, after = before["median"], measurement["median"]
+            if after > before_median * tolerance and after - before_median > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{where}: {before_median:.4f}s -> {after:.4f}s")
+        before_k, after_k = reference["exponent"], curve["exponent"]
+        if before_k is not None and after_k is not None and after_k > before_k + 0.5:
+            regressions.append(
+                f"day {curve['day']} part {curve['part']}: "
+                f"scaling exponent {before_k:.2f} -> {after_k:.2f}"
+            )
+    return regressions
+
+
+def _point(measurement: dict[str, Any]) -> tuple[str, int]:
+    # Reports from before points had names only know their size
+    return measurement.get("input", ""), measurement.get("nominal", measurement["size"])
+
+
+def _label(measurement: dict[str, Any]) -> str:
+    input, nominal = _point(measurement)
+    return f"{input} (size {nominal})" if input else f"size {nominal}"
+
+
+def load_report(path: Path) -> dict[str, Any]:
+    with path.open("r") as fin:
+        return json.load(fin)
+
+
+def save_report(report: dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as fout:
+        json.dump(report, fout, indent=2)
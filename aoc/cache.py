@@ -0,0 +1,219 @@
+"""
+Content-addressed on-disk cache of parsed inputs.
+
+Entries are keyed by a hash of the input bytes plus the parser name, version and
+other arguments, so part one and part two (and later runs) share the same parsed
+structure. The hash of each input is remembered with its stat (device, inode,
+size, mtime): a warm hit only stats the file, it is read and hashed again only
+when that changes.
+They are written with pickle protocol 5: large buffers (NumPy arrays, bytes)
+go out-of-band, aligned in the file, and on load they are handed back as
+views over a memory map instead of being copied.
+
+Environment:
+    AOC_CACHE=0                 disable the cache
+    AOC_CACHE_DIR=path          where entries live (default: <repo>/.cache/parsed)
+    AOC_CACHE_MAX_BYTES=n       size cap, oldest entries are evicted past it
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from contextlib import contextmanager
+from functools import partial, wraps
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from aoc.registry import ROOT
+
+T = TypeVar("T")
+
+MAGIC = b"AOCC"
+# magic, number of buffers, pickle length
+HEADER = struct.Struct("<4sIQ")
+ALIGNMENT = 64
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+
+def enabled() -> bool:
+    return os.environ.get("AOC_CACHE", "1") != "0"
+
+
+@contextmanager
+def disabled() -> Iterator[None]:
+    """Parse for real inside, for timings that must not measure cache hits"""
+    previous = os.environ.get("AOC_CACHE")
+    os.environ["AOC_CACHE"] = "0"
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("AOC_CACHE", None)
+        else:
+            os.environ["AOC_CACHE"] = previous
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("AOC_CACHE_DIR", ROOT / ".cache" / "parsed"))
+
+
+def max_bytes() -> int:
+    return int(os.environ.get("AOC_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def file_digest(path: Path) -> str:
+    """Hash of the file contents, recomputed only when its stat changes"""
+    stat = path.stat()
+    signature = [stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns]
+    name = hashlib.blake2b(str(path.resolve()).encode(), digest_size=16).hexdigest()
+    record = cache_dir() / "stat" / f"{name}.json"
+    try:
+        saved = json.loads(record.read_text())
+        if saved["stat"] == signature:
+            return saved["digest"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    # Streamed, the input may not fit in memory. Stat from before: a change while hashing
+    # shows up as a mismatch next time.
+    with path.open("rb") as fin:
+        digest = hashlib.file_digest(fin, partial(hashlib.blake2b, digest_size=20)).hexdigest()
+    try:
+        record.parent.mkdir(parents=True, exist_ok=True)
+        temporary = record.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text(json.dumps({"stat": signature, "digest": digest}))
+        temporary.replace(record)
+    except OSError:
+        pass
+    return digest
+
+
+def argument_key(arg: Any) -> str:
+    """How an argument other than the path enters the key, refusing what repr cannot pin"""
+    if isinstance(arg, type):
+        return f"{arg.__module__}.{arg.__qualname__}"
+    if arg is None or isinstance(arg, (bool, int, float, str, bytes)):
+        return repr(arg)
+    raise TypeError(f"cached_parser cannot key on a {type(arg).__name__} argument")
+
+
+def make_key(digest: str, parser: str, version: int, arguments: tuple = ()) -> str:
+    key = hashlib.blake2b(digest.encode(), digest_size=20)
+    key.update(f"\0{parser}\0{version}".encode())
+    for arg in arguments:
+        key.update(f"\0{argument_key(arg)}".encode())
+    return key.hexdigest()
+
+
+def dump(obj: Any, path: Path) -> None:
+    buffers: list[pickle.PickleBuffer] = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, concurrent readers never see half a file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            fout.write(HEADER.pack(MAGIC, len(raws), len(payload)))
+            fout.write(struct.pack(f"<{len(raws)}Q", *(raw.nbytes for raw in raws)))
+            fout.write(payload)
+            offset = fout.tell()
+            for raw in raws:
+                fout.write(b"\0" * _padding(offset))
+                offset += _padding(offset)
+                fout.write(raw)
+                offset += raw.nbytes
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load(path: Path) -> Any:
+    with path.open("rb") as fin:
+        # Copy-on-write: solvers may modify the arrays, pages are only copied if they do
+        mapped = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(mapped)
+    magic, n_buffers, payload_length = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"Not a cache entry: {path}")
+    offset = HEADER.size
+    lengths = struct.unpack_from(f"<{n_buffers}Q", view, offset)
+    offset += 8 * n_buffers
+    payload = view[offset : offset + payload_length]
+    offset += payload_length
+    buffers = []
+    for length in lengths:
+        offset += _padding(offset)
+        buffers.append(view[offset : offset + length])
+        offset += length
+    # The buffers keep the map alive for as long as something references them
+    return pickle.loads(payload, buffers=buffers)
+
+
+def evict(directory: Path, limit: int) -> list[Path]:
+    entries = []
+    for entry in directory.glob("*.bin"):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry))
+    total = sum(size for _, size, _ in entries)
+    evicted = []
+    for _, size, entry in sorted(entries):
+        if total <= limit:
+            break
+        entry.unlink(missing_ok=True)
+        total -= size
+        evicted.append(entry)
+    return evicted
+
+
+def cached_parser(version: int = 1) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Cache the result of a parser whose last positional argument is the input path.
+    The arguments before it (the class of a classmethod, options) are part of the
+    key, and must be classes or plain values. Bump `version` whenever the parser
+    output changes.
+    Every call returns a freshly unpickled object, so solvers may mutate it.
+    """
+
+    def decorator(parser: Callable[..., T]) -> Callable[..., T]:
+        name = f"{parser.__module__}.{parser.__qualname__}"
+
+        @wraps(parser)
+        def wrapper(*args: Any) -> T:
+            if not enabled():
+                return parser(*args)
+            path = Path(args[-1])
+            key = make_key(file_digest(path), name, version, args[:-1])
+            entry = cache_dir() / f"{key}.bin"
+            if entry.exists():
+                try:
+                    result = load(entry)
+                except Exception:
+                    # Stale or corrupted entry, e.g. a class that moved
+                    entry.unlink(missing_ok=True)
+                else:
+                    os.utime(entry)
+                    return result
+            result = parser(*args)
+            try:
+                dump(result, entry)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError):
+                return result
+            evict(entry.parent, max_bytes())
+            return result
+
+        return wrapper
+
+    return decorator
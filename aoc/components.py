@@ -0,0 +1,105 @@
+"""
+Connected components of grids.
+
+`label` finds the regions of equal values of a 2D integer array in two passes.
+The first one gives every run of equal values along a row a provisional
+label and records which runs touch vertically, the second one resolves those
+equivalences with a UnionFind (one union per pair of touching runs, not per
+cell) and relabels. Areas, perimeters and numbers of sides per region are
+then computed with array operations over the label grid.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+
+from aoc.unionfind import UnionFind
+
+# Label of the cells left out by the mask
+UNLABELLED = -1
+
+
+@dataclass
+class Labels:
+    # Region of every cell, UNLABELLED outside the mask
+    labels: np.ndarray
+    # Per region
+    values: np.ndarray
+    area: np.ndarray
+    perimeter: np.ndarray
+    sides: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.area)
+
+    def cells(self) -> list[np.ndarray]:
+        """Flat indices (into `labels`) of the cells of every region, in label order"""
+        flat = self.labels.reshape(-1)
+        order = np.argsort(flat, kind="stable")[np.count_nonzero(flat == UNLABELLED) :]
+        return np.split(order, np.cumsum(self.area)[:-1])
+
+
+def _provisional(cells: np.ndarray, inside: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """A label per run of equal values along the rows, and whether each run is inside"""
+    width = cells.shape[1]
+    flat, inside = cells.reshape(-1), inside.reshape(-1)
+    starts = np.ones(flat.size, dtype=bool)
+    starts[1:] = (flat[1:] != flat[:-1]) | (inside[1:] != inside[:-1])
+    starts[::width] = True
+    return np.cumsum(starts) - 1, inside[starts]
+
+
+def _resolve(
+    runs: np.ndarray, runs_inside: np.ndarray, width: int, same: np.ndarray
+) -> np.ndarray:
+    """Final label of every run, merging the runs that touch vertically"""
+    above, below = runs[:-width][same], runs[width:][same]
+    n_runs = len(runs_inside)
+    # Every cell of a run touching the next row gives the same pair, keep one
+    pairs = np.unique(above * n_runs + below)
+    sets = UnionFind(n_runs)
+    sets.union_all(zip(*np.divmod(pairs, n_runs)))
+    final = np.full(n_runs, UNLABELLED, dtype=np.int64)
+    final[runs_inside] = np.unique(np.array(sets.roots())[runs_inside], return_inverse=True)[1]
+    return final
+
+
+def _corners(padded: np.ndarray) -> np.ndarray:
+    """Corners at every cell of a label grid padded with UNLABELLED, convex and concave"""
+    centre = padded[1:-1, 1:-1]
+    height, width = centre.shape
+    corners = np.zeros(centre.shape, dtype=np.int64)
+    for dy, dx in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+        vertical = padded[1 + dy : 1 + dy + height, 1 : 1 + width] == centre
+        horizontal = padded[1 : 1 + height, 1 + dx : 1 + dx + width] == centre
+        diagonal = padded[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width] == centre
+        corners += (~vertical & ~horizontal) | (vertical & horizontal & ~diagonal)
+    return corners
+
+
+def label(cells: np.ndarray, mask: np.ndarray | None = None) -> Labels:
+    """
+    Regions of 4-connected cells with equal values. Cells where `mask` is
+    false belong to no region.
+    """
+    height, width = cells.shape
+    inside = np.ones(cells.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+    runs, runs_inside = _provisional(cells, inside)
+    flat, flat_inside = cells.reshape(-1), inside.reshape(-1)
+    same = (flat[width:] == flat[:-width]) & flat_inside[width:] & flat_inside[:-width]
+    labels = _resolve(runs, runs_inside, width, same)[runs].reshape(height, width)
+
+    count = int(labels.max()) + 1 if labels.size else 0
+    labelled = labels >= 0
+    area = np.bincount(labels[labelled], minlength=count)
+    values = np.zeros(count, dtype=cells.dtype)
+    values[labels[labelled]] = cells[labelled]
+    # Every pair of neighbours in the same region hides two sides of a square
+    joined = np.bincount(
+        labels[:, 1:][(labels[:, 1:] == labels[:, :-1]) & labelled[:, 1:]], minlength=count
+    ) + np.bincount(labels[1:][(labels[1:] == labels[:-1]) & labelled[1:]], minlength=count)
+    padded = np.pad(labels, 1, constant_values=UNLABELLED)
+    # A polygon has as many sides as corners
+    sides = np.bincount(labels[labelled], weights=_corners(padded)[labelled], minlength=count)
+    return Labels(labels, values, area, 4 * area - 2 * joined, sides.astype(np.int64))
@@ -0,0 +1,195 @@
+"""
+A long-running solver process, and the client that talks to it.
+
+Starting Python and importing NumPy costs more than many of the solves, and so
+does rebuilding tables that do not depend on the input (day21's keypads, the
+memoised stone counts of day11). The daemon imports the day modules once, runs
+their `prepare()` hooks, and then answers requests on a Unix domain socket, one
+at a time.
+
+The protocol is one JSON object per line each way:
+
+    {"op": "solve", "day": 21, "part": 2, "input": "/abs/path.txt"}
+    {"op": "solve", "day": 21, "part": 2, "data": "<base64>", "name": "x.txt"}
+    {"op": "ping"}
+    {"op": "shutdown"}
+
+Inputs sent as bytes are written to a temporary file named `name`, some days
+read the size of the puzzle from the file name. Answers are the fields of a
+BatchResult, with `seconds` measured inside the daemon, and statuses are those
+of aoc.runner.
+
+Every solve runs in a worker forked from the daemon, through aoc.runner, so it
+starts with the days already imported and prepared. A solve that runs past the
+timeout is killed, it does not take the daemon with it. A solve message can
+ask for its own "timeout" in seconds. What a solve memoises stays in its worker.
+
+Environment:
+    AOC_SOCKET=path     where the socket lives (default: <repo>/.cache/aoc.sock)
+"""
+
+from __future__ import annotations
+import base64
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from aoc.registry import ROOT, discover
+
+DEFAULT_NAME = "input.txt"
+
+
+def socket_path() -> Path:
+    return Path(os.environ.get("AOC_SOCKET", ROOT / ".cache" / "aoc.sock"))
+
+
+def _solve_path(day: int, part: int, path: Path, timeout: float | None) -> dict[str, Any]:
+    # Imported here, a client talking to a daemon does not need them
+    from aoc import batch, runner
+
+    if timeout is None:
+        return next(batch.run_batch(day, [path], [part])).to_dict()
+    (job,) = runner.run_jobs([runner.Job(day, part, path)], workers=1, timeout=timeout)
+    result = batch.BatchResult(
+        str(path), part, job.status, job.seconds, job.result, job.error, job.cpu
+    )
+    return result.to_dict()
+
+
+def _solve(message: dict[str, Any], timeout: float | None = None) -> dict[str, Any]:
+    """Solve in this process without a timeout, in a worker with one"""
+    day, part = int(message["day"]), int(message["part"])
+    if "data" not in message:
+        return _solve_path(day, part, Path(message["input"]), timeout)
+    with tempfile.TemporaryDirectory(prefix="aoc-") as directory:
+        path = Path(directory) / Path(message.get("name") or DEFAULT_NAME).name
+        path.write_bytes(base64.b64decode(message["data"]))
+        return _solve_path(day, part, path, timeout)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: Server
+
+    def handle(self) -> None:
+        from aoc.runner import ERROR, OK
+
+        for line in self.rfile:
+            stop = False
+            try:
+                message = json.loads(line)
+                op = message.get("op", "solve")
+                if op == "ping":
+                    answer = {"status": OK, "pid": os.getpid(), "uptime": self.server.uptime}
+                elif op == "solve":
+                    answer = _solve(message, float(message.get("timeout", self.server.solve_timeout)))
+                elif op == "shutdown":
+                    answer = {"status": OK}
+                    stop = True
+                    # serve_forever is waiting for this very handler to return
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    answer = {"status": ERROR, "error": f"Unknown op {op!r}"}
+            except Exception as e:
+                answer = {"status": ERROR, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(answer).encode() + b"\n")
+            self.wfile.flush()
+            if stop:
+                return
+
+
+class Server(socketserver.UnixStreamServer):
+    # One request at a time: the day modules keep global state
+    def __init__(self, path: Path, timeout: float):
+        self.start = time.perf_counter()
+        # Per solve. Not `timeout`, which socketserver uses for handle_request
+        self.solve_timeout = timeout
+        super().__init__(str(path), _Handler)
+
+    @property
+    def uptime(self) -> float:
+        return time.perf_counter() - self.start
+
+
+def warm(days: Iterable[int] | None = None) -> dict[int, float]:
+    """Import the days and run their prepare hooks, day -> seconds"""
+    from aoc import batch
+
+    return {day: batch.prepare(day) for day in (days or discover())}
+
+
+def serve(
+    path: Path | None = None, days: Iterable[int] | None = None, timeout: float | None = None
+) -> None:
+    from aoc.runner import DEFAULT_TIMEOUT
+
+    path = Path(path or socket_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        if ping(path) is not None:
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        # Left behind by a daemon that did not exit cleanly
+        path.unlink()
+    timings = warm(days)
+    print(f"Warmed {len(timings)} days in {sum(timings.values()):.2f}s", file=sys.stderr)
+    with Server(path, timeout or DEFAULT_TIMEOUT) as server:
+        try:
+            print(f"Listening on {path}", file=sys.stderr)
+            server.serve_forever(poll_interval=0.1)
+        finally:
+            path.unlink(missing_ok=True)
+
+
+def request(
+    message: dict[str, Any], path: Path | None = None, timeout: float | None = None
+) -> dict[str, Any]:
+    """Send one message, raises OSError when no daemon is listening"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(str(path or socket_path()))
+        client.sendall(json.dumps(message).encode() + b"\n")
+        with client.makefile("rb") as answer:
+            line = answer.readline()
+    if not line:
+        raise ConnectionError("The daemon closed the connection")
+    return json.loads(line)
+
+
+def ping(path: Path | None = None) -> dict[str, Any] | None:
+    try:
+        return request({"op": "ping"}, path, timeout=1.0)
+    except OSError:
+        return None
+
+
+def solve(
+    day: int,
+    part: int,
+    input: Path | None = None,
+    data: bytes | None = None,
+    name: str | None = None,
+    path: Path | None = None,
+) -> tuple[dict[str, Any], bool]:
+    """
+    Solve with the daemon if one is running, in this process otherwise.
+    Returns the answer and whether the daemon gave it.
+    """
+    if (input is None) == (data is None):
+        raise ValueError("Give either an input path or its data")
+    message: dict[str, Any] = {"op": "solve", "day": day, "part": part}
+    if input is not None:
+        # The daemon may run from another directory
+        message["input"] = str(Path(input).resolve())
+    else:
+        message["data"] = base64.b64encode(data).decode()
+        message["name"] = name
+    try:
+        return request(message, path), True
+    except OSError:
+        return _solve(message), False
@@ -0,0 +1,238 @@
+"""
+Size-adaptive choice between a plain Python and a vectorised implementation.
+
+Plain Python wins on small inputs (the examples, the tests), NumPy on large
+ones, and importing NumPy costs more than solving a small input does. A
+Dispatch holds both implementations of the same step and picks one per call
+from the size of its arguments:
+
+    parse = Dispatch("day13.parse", size=file_size, sample=...)
+
+    @parse.scalar
+    def parse_list(path: Path) -> ...: ...
+
+    @parse.vector
+    def parse_arrays(path: Path) -> ...: ...   # imports NumPy inside
+
+    machines = parse(path)
+
+There are two thresholds. `warm` applies once NumPy is imported, it is where
+the vectorised code starts to win. `cold` applies before that, and it also
+counts the import, which is paid only when the vectorised path is taken.
+Both come from `calibrate`, a micro-benchmark of the two implementations on
+inputs of growing size. The results are kept in .cache/dispatch.json, so the
+benchmark runs once per machine (`python -m aoc calibrate`). A Dispatch that
+was never calibrated uses the thresholds it was declared with.
+
+Environment:
+    AOC_DISPATCH=scalar|vector  always take that implementation
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from aoc import cache
+from aoc.registry import ROOT
+
+SCALAR, VECTOR = "scalar", "vector"
+DEFAULT_PATH = ROOT / ".cache" / "dispatch.json"
+SAMPLES = ROOT / ".cache" / "dispatch"
+# Sizes tried by the calibration, they stop growing once a run takes MAX_SECONDS
+DEFAULT_SCALES = tuple(4**k for k in range(1, 10))
+MAX_SECONDS = 0.5
+REPEATS = 3
+IMPORT_NUMPY = "import time; t = time.perf_counter(); import numpy; print(time.perf_counter() - t)"
+
+_dispatches: dict[str, Dispatch] = {}
+# name -> thresholds, loaded from the calibration file on first use
+_thresholds: dict[str, Thresholds] | None = None
+
+
+def forced() -> str | None:
+    return os.environ.get("AOC_DISPATCH") or None
+
+
+def file_size(path: Path, *args: Any, **kwargs: Any) -> int:
+    """Size of an input given as its path, the usual measure"""
+    return Path(path).stat().st_size
+
+
+def generated(day: int) -> Callable[[int], tuple[Path]]:
+    """Samples written by the day's input generator, for inputs given as a path"""
+
+    def sample(scale: int) -> tuple[Path]:
+        from aoc import generators
+
+        path = SAMPLES / f"day{day}-{generators.filename(day, scale)}"
+        if not path.exists():
+            generators.generate(day, scale, 0, path)
+        return (path,)
+
+    return sample
+
+
+def numpy_loaded() -> bool:
+    return "numpy" in sys.modules
+
+
+@dataclass
+class Thresholds:
+    # Smallest size taking the vectorised path, with NumPy imported already and not
+    warm: float
+    cold: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class Dispatch:
+    def __init__(
+        self,
+        name: str,
+        size: Callable[..., int] = file_size,
+        sample: Callable[[int], tuple] | None = None,
+        warm: float = 1 << 12,
+        cold: float = 1 << 16,
+        scales: tuple[int, ...] = DEFAULT_SCALES,
+    ):
+        """`sample(scale)` gives the arguments of a call on an input of about that scale"""
+        self.name = name
+        self.size = size
+        self.sample = sample
+        self.default = Thresholds(warm, cold)
+        self.scales = scales
+        self.implementations: dict[str, Callable] = {}
+        _dispatches[name] = self
+
+    def scalar(self, func: Callable) -> Callable:
+        self.implementations[SCALAR] = func
+        return func
+
+    def vector(self, func: Callable) -> Callable:
+        self.implementations[VECTOR] = func
+        return func
+
+    @property
+    def thresholds(self) -> Thresholds:
+        return load().get(self.name, self.default)
+
+    def kind(self, size: int) -> str:
+        if (kind := forced()) is not None:
+            return kind
+        thresholds = self.thresholds
+        threshold = thresholds.warm if numpy_loaded() else thresholds.cold
+        return VECTOR if size >= threshold else SCALAR
+
+    def choose(self, size: int) -> Callable:
+        return self.implementations[self.kind(size)]
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.choose(self.size(*args, **kwargs))(*args, **kwargs)
+
+    def _time(self, kind: str, args: tuple) -> float:
+        func = self.implementations[kind]
+        best = math.inf
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def calibrate(self, import_seconds: float) -> Thresholds:
+        """
+        Time both implementations on samples of growing size. Warm is the
+        smallest size from which the vectorised one is always faster, cold
+        the one from which it is faster by more than the import of NumPy.
+        """
+        if self.sample is None:
+            raise LookupError(f"{self.name} has no sample inputs to calibrate with")
+        timings = []
+        # Implementations may be cached parsers, the repeats would time cache hits
+        with cache.disabled():
+            for scale in self.scales:
+                args = self.sample(scale)
+                scalar, vector = self._time(SCALAR, args), self._time(VECTOR, args)
+                timings.append((self.size(*args), scalar, vector))
+                if max(scalar, vector) > MAX_SECONDS:
+                    break
+        warm = cold = math.inf
+        for size, scalar, vector in reversed(timings):
+            if vector >= scalar:
+                break
+            warm = size
+        for size, scalar, vector in reversed(timings):
+            if vector + import_seconds >= scalar:
+                break
+            cold = size
+        if math.isinf(cold):
+            # Past the sizes measured, assume both grow linearly from the largest one
+            size, scalar, vector = timings[-1]
+            if (saved := (scalar - vector) / size) > 0:
+                cold = max(size, math.ceil(import_seconds / saved))
+        return Thresholds(warm, cold)
+
+
+def dispatches() -> dict[str, Dispatch]:
+    return dict(_dispatches)
+
+
+def load(path: Path | None = None) -> dict[str, Thresholds]:
+    global _thresholds
+    if _thresholds is None or path is not None:
+        try:
+            with Path(path or DEFAULT_PATH).open("r") as fin:
+                _thresholds = {name: Thresholds(**t) for name, t in json.load(fin).items()}
+        except (OSError, ValueError, TypeError):
+            _thresholds = {}
+    return _thresholds
+
+
+def save(thresholds: dict[str, Thresholds], path: Path | None = None) -> None:
+    global _thresholds
+    path = Path(path or DEFAULT_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # json writes infinity as Infinity, which it reads back
+    data = {name: t.to_dict() for name, t in thresholds.items()}
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(data, indent=2, sort_keys=True))
+    temporary.replace(path)
+    _thresholds = None
+
+
+def import_seconds(repeats: int = REPEATS) -> float:
+    """What importing NumPy costs a fresh interpreter"""
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_NUMPY], capture_output=True, text=True, check=True
+        ).stdout
+        times.append(float(output))
+    return min(times)
+
+
+def calibrate(
+    names: list[str] | None = None, path: Path | None = None
+) -> dict[str, Thresholds]:
+    """Calibrate the dispatches registered so far (or those named) and store the results"""
+    seconds = import_seconds()
+    measured = dict(load(path))
+    for name, dispatch in dispatches().items():
+        if names is None or name in names:
+            measured[name] = dispatch.calibrate(seconds)
+    save(measured, path)
+    return measured
+
+
+def format_thresholds(thresholds: dict[str, Thresholds]) -> str:
+    lines = [f"{'dispatch':<24} {'warm':>12} {'cold':>12}"]
+    for name, t in sorted(thresholds.items()):
+        lines.append(f"{name:<24} {t.warm:>12.0f} {t.cold:>12.0f}")
+    return "\n".join(lines)
@@ -0,0 +1,230 @@
+"""
+Reference and fast engines of the same part, checked against each other.
+
+When a solver is rewritten for speed, the previous code stays around as the
+reference. Both are registered from the day module:
+
+    @engine(2, REFERENCE)
+    def part_two_reference(path: Path) -> int: ...
+
+    @engine(2, FAST)
+    def part_two(path: Path) -> int: ...
+
+Normal runs call `part_two`, the fast one. `cross_check` runs both on each
+input, generated or given, and compares the answers. For every mismatch it
+shrinks the input to a smaller one that still disagrees and saves it next
+to the report. It also reports the speedup of the fast engine, both run with
+the parse cache off so neither loads what the other parsed. On generated
+inputs that come with a known answer (see aoc.generators), engines that
+agree on another answer are a mismatch too.
+"""
+
+from __future__ import annotations
+import hashlib
+import io
+import math
+import tempfile
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from aoc import cache
+from aoc.registry import ROOT, Solver, get_day
+
+REFERENCE, FAST = "reference", "fast"
+MATCH, MISMATCH, ERROR = "match", "mismatch", "error"
+DEFAULT_SCALES = (10, 30)
+DEFAULT_SEEDS = 3
+DEFAULT_OUTPUT = ROOT / ".cache" / "engines"
+# Runs of both engines allowed while shrinking one input
+MAX_SHRINK_TESTS = 300
+
+# module -> part -> kind -> solver
+_engines: dict[str, dict[int, dict[str, Solver]]] = {}
+
+
+def engine(part: int, kind: str) -> Callable[[Solver], Solver]:
+    if kind not in (REFERENCE, FAST):
+        raise ValueError(f"Engine kind must be {REFERENCE!r} or {FAST!r}, got {kind!r}")
+
+    def register(solver: Solver) -> Solver:
+        _engines.setdefault(solver.__module__, {}).setdefault(part, {})[kind] = solver
+        return solver
+
+    return register
+
+
+def engines(day: int) -> dict[int, dict[str, Solver]]:
+    """part -> kind -> solver, for the parts of the day that registered any"""
+    module = get_day(day).load()
+    return _engines.get(module.__name__, {})
+
+
+@dataclass
+class Check:
+    day: int
+    part: int
+    input: str
+    status: str
+    reference: str | None
+    fast: str | None
+    reference_seconds: float
+    fast_seconds: float
+    # Smallest input found that still disagrees, for mismatches
+    shrunk: str | None = None
+    # Planted by the generator of the input, when it knows the answer
+    known: str | None = None
+
+    @property
+    def speedup(self) -> float:
+        return self.reference_seconds / self.fast_seconds if self.fast_seconds else math.inf
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self) | {"speedup": self.speedup}
+
+
+def _run(solver: Solver, path: Path) -> tuple[str | None, float, str | None]:
+    """answer, seconds, error"""
+    # The solvers are chatty (prints and progress bars)
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        try:
+            answer = str(solver(path))
+        except Exception as e:
+            return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return answer, time.perf_counter() - start, None
+
+
+def _units(text: str) -> list[str]:
+    # Lines, or characters for inputs that are a single line (day 9)
+    lines = text.splitlines(keepends=True)
+    return lines if len(lines) > 1 else list(text.rstrip("\n"))
+
+
+def shrink(
+    text: str, disagree: Callable[[str], bool], max_tests: int = MAX_SHRINK_TESTS
+) -> str:
+    """
+    Delta debugging: drop ever smaller slices of lines (or characters) as
+    long as the engines still disagree on what is left.
+    """
+    units = _units(text)
+    suffix = "" if len(text.splitlines()) > 1 else "\n"
+    pieces = 2
+    tests = 0
+    while len(units) >= 2 and tests < max_tests:
+        size = math.ceil(len(units) / pieces)
+        for start in range(0, len(units), size):
+            candidate = units[:start] + units[start + size :]
+            tests += 1
+            if disagree("".join(candidate) + suffix):
+                units = candidate
+                pieces = max(pieces - 1, 2)
+                break
+            if tests >= max_tests:
+                break
+        else:
+            if pieces >= len(units):
+                break
+            pieces = min(len(units), 2 * pieces)
+    return "".join(units) + suffix
+
+
+def cross_check(
+    day: int,
+    part: int,
+    paths: Iterable[Path],
+    minimise: bool = True,
+    output: Path = DEFAULT_OUTPUT,
+) -> list[Check]:
+    kinds = engines(day).get(part, {})
+    if REFERENCE not in kinds or FAST not in kinds:
+        raise LookupError(f"Day {day} part {part} needs both a reference and a fast engine")
+    reference, fast = kinds[REFERENCE], kinds[FAST]
+    # Imported here, the day modules import this one to register their engines
+    from aoc import generators
+
+    checks = []
+    for path in paths:
+        known = generators.known_answers(Path(path)).get(part)
+        with cache.disabled():
+            expected, reference_seconds, reference_error = _run(reference, path)
+            answer, fast_seconds, fast_error = _run(fast, path)
+        if reference_error is not None:
+            # Nothing to compare against, the input is probably not valid
+            status, expected = ERROR, reference_error
+        elif fast_error is not None:
+            status, answer = ERROR, fast_error
+        else:
+            status = MATCH if answer == expected and known in (None, answer) else MISMATCH
+        check = Check(
+            day,
+            part,
+            str(path),
+            status,
+            expected,
+            answer,
+            reference_seconds,
+            fast_seconds,
+            known=known,
+        )
+        # Engines that agree on a wrong answer give nothing to shrink
+        if status == MISMATCH and answer != expected and minimise:
+            check.shrunk = str(_shrink_input(reference, fast, Path(path), output))
+        checks.append(check)
+    return checks
+
+
+def _shrink_input(reference: Solver, fast: Solver, path: Path, output: Path) -> Path:
+    with tempfile.TemporaryDirectory(prefix="aoc-shrink-") as directory:
+        # Same name, some days read the size of the puzzle from it
+        candidate = Path(directory) / path.name
+
+        def disagree(text: str) -> bool:
+            candidate.write_text(text)
+            expected, _, reference_error = _run(reference, candidate)
+            answer, _, fast_error = _run(fast, candidate)
+            return reference_error is None and fast_error is None and answer != expected
+
+        shrunk = shrink(path.read_text(), disagree)
+    digest = hashlib.blake2b(shrunk.encode(), digest_size=6).hexdigest()
+    target = output / f"{path.stem}-shrunk-{digest}{path.suffix}"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(shrunk)
+    return target
+
+
+def generated_inputs(
+    day: int, scales: Iterable[int] = DEFAULT_SCALES, seeds: int = DEFAULT_SEEDS
+) -> list[Path]:
+    """Inputs of the day's generator, written under .cache/engines on first use"""
+    # Imported here, the day modules import this one to register their engines
+    from aoc import generators
+
+    paths = []
+    for scale in scales:
+        for seed in range(seeds):
+            name = f"day{day}-{generators.filename(day, scale, seed)}"
+            if not (path := DEFAULT_OUTPUT / "inputs" / name).exists():
+                generators.generate(day, scale, seed, path)
+            paths.append(path)
+    return paths
+
+
+def format_checks(checks: list[Check]) -> str:
+    lines = [f"{'part':<6} {'status':<9} {'speedup':>8} {'ref s':>9} {'fast s':>9} input"]
+    for check in checks:
+        lines.append(
+            f"{f'{check.day}.{check.part}':<6} {check.status:<9} {check.speedup:>7.1f}x "
+            f"{check.reference_seconds:>9.4f} {check.fast_seconds:>9.4f} {check.input}"
+        )
+        if check.status != MATCH:
+            lines.append(f"       reference: {check.reference}")
+            lines.append(f"       fast:      {check.fast}")
+            if check.known is not None:
+                lines.append(f"       known:     {check.known}")
+        if check.shrunk is not None:
+            lines.append(f"       shrunk to: {check.shrunk}")
+    return "\n".join(lines)
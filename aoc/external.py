@@ -0,0 +1,159 @@
+"""
+External sorting of integer columns, for inputs larger than memory.
+
+`spilled` reads a file of integer rows one chunk at a time, with ingest, and
+cuts every column into runs. Each run is sorted in memory and written to a
+temporary file as raw int64. `merge` streams a column back in sorted order, as
+blocks, with a k-way merge that holds one block per run. It emits everything
+up to the smallest last value of the loaded blocks: no value still on disk can
+be below that.
+
+Sorted streams are then consumed block by block. `aligned` pairs two streams
+position by position, `counted` turns one into distinct values and their
+counts, and `join` matches two counted streams on their values.
+
+The budget (AOC_SORT_BUDGET, see aoc.memory) sizes the runs, the chunks read
+and the merge blocks. Memory use stays within a small multiple of it, however
+large the file is.
+"""
+
+from __future__ import annotations
+import tempfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from aoc import ingest, readers
+from aoc.memory import sort_budget
+
+ITEM = np.dtype(np.int64).itemsize
+# Copies of the data alive at once: a run and its parsed chunk, or a merge block
+# being cut, concatenated and sorted
+COPIES = 4
+MIN_ITEMS = 1 << 10
+
+
+def spill_runs(path: Path, columns: int, directory: Path, size: int) -> list[list[Path]]:
+    """Sorted runs of every column, as files of raw int64"""
+    run_items = max(MIN_ITEMS, size // (ITEM * columns * COPIES))
+    runs: list[list[Path]] = [[] for _ in range(columns)]
+    pending: list[list[np.ndarray]] = [[] for _ in range(columns)]
+    pending_items = 0
+
+    def flush() -> None:
+        for column, parts in enumerate(pending):
+            run = np.concatenate(parts)
+            run.sort()
+            run.tofile(target := directory / f"column{column}-run{len(runs[column])}.i64")
+            runs[column].append(target)
+            parts.clear()
+
+    # Chunks of text about the size of a run once parsed
+    for chunk in readers.chunks(path, run_items * ITEM):
+        table = ingest.table(chunk, columns)
+        for column, parts in enumerate(pending):
+            parts.append(np.ascontiguousarray(table[:, column]))
+        pending_items += len(table)
+        if pending_items >= run_items:
+            flush()
+            pending_items = 0
+    if pending_items:
+        flush()
+    return runs
+
+
+@contextmanager
+def spilled(path: Path, columns: int, size: int | None = None) -> Iterator[list[list[Path]]]:
+    """The runs of every column, deleted on exit"""
+    with tempfile.TemporaryDirectory(prefix="aoc-sort-") as directory:
+        yield spill_runs(path, columns, Path(directory), size or sort_budget())
+
+
+def block_items(runs: int, size: int | None = None) -> int:
+    """Values to load per run so that `runs` of them fit in the budget"""
+    return max(MIN_ITEMS, (size or sort_budget()) // (ITEM * max(runs, 1) * COPIES))
+
+
+def merge(runs: list[Path], items: int) -> Iterator[np.ndarray]:
+    """The values of sorted runs, in order, as non-empty sorted blocks"""
+    with ExitStack() as stack:
+        files = [stack.enter_context(run.open("rb")) for run in runs]
+        blocks = [np.fromfile(fin, dtype=np.int64, count=items) for fin in files]
+        while active := [i for i, block in enumerate(blocks) if len(block)]:
+            # Every run still has its unread values above its last loaded one
+            bound = min(blocks[i][-1] for i in active)
+            taken = []
+            for i in active:
+                cut = np.searchsorted(blocks[i], bound, side="right")
+                taken.append(blocks[i][:cut])
+                blocks[i] = blocks[i][cut:]
+                if not len(blocks[i]):
+                    blocks[i] = np.fromfile(files[i], dtype=np.int64, count=items)
+            merged = np.concatenate(taken)
+            merged.sort()
+            yield merged
+
+
+def aligned(
+    first: Iterator[np.ndarray], second: Iterator[np.ndarray]
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Two streams of blocks, cut into pairs of blocks of the same length"""
+    a = b = np.zeros(0, dtype=np.int64)
+    while True:
+        if not len(a) and (a := next(first, None)) is None:
+            return
+        if not len(b) and (b := next(second, None)) is None:
+            return
+        n = min(len(a), len(b))
+        yield a[:n], b[:n]
+        a, b = a[n:], b[n:]
+
+
+def counted(blocks: Iterator[np.ndarray]) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """The distinct values of a sorted stream, with how many times each appears"""
+    carry: tuple[np.ndarray, np.ndarray] | None = None
+    for block in blocks:
+        starts = np.flatnonzero(np.diff(block, prepend=block[0] - 1))
+        values, counts = block[starts], np.diff(starts, append=len(block))
+        if carry is not None:
+            if values[0] == carry[0][0]:
+                counts[0] += carry[1][0]
+            else:
+                values = np.concatenate((carry[0], values))
+                counts = np.concatenate((carry[1], counts))
+        # The last value may go on in the next block
+        carry = values[-1:], counts[-1:]
+        if len(values) > 1:
+            yield values[:-1], counts[:-1]
+    if carry is not None:
+        yield carry
+
+
+def join(
+    first: Iterator[tuple[np.ndarray, np.ndarray]],
+    second: Iterator[tuple[np.ndarray, np.ndarray]],
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """The values in both counted streams, with their count in the first and in the second"""
+    empty = np.zeros(0, dtype=np.int64)
+    a_values = a_counts = b_values = b_counts = empty
+    while True:
+        if not len(a_values):
+            if (pair := next(first, None)) is None:
+                return
+            a_values, a_counts = pair
+        if not len(b_values):
+            if (pair := next(second, None)) is None:
+                return
+            b_values, b_counts = pair
+        # Values are unique and sorted, those up to the bound are all loaded on both sides
+        bound = min(a_values[-1], b_values[-1])
+        a_cut = np.searchsorted(a_values, bound, side="right")
+        b_cut = np.searchsorted(b_values, bound, side="right")
+        common, a_at, b_at = np.intersect1d(
+            a_values[:a_cut], b_values[:b_cut], assume_unique=True, return_indices=True
+        )
+        yield common, a_counts[a_at], b_counts[b_at]
+        a_values, a_counts = a_values[a_cut:], a_counts[a_cut:]
+        b_values, b_counts = b_values[b_cut:], b_counts[b_cut:]
@@ -0,0 +1,132 @@
+"""
+Bytes per element of the domain objects, before and after their compact forms.
+
+Each layout builds n elements and the memory it allocated is measured with
+tracemalloc. The "before" layouts reproduce the plain dict-backed classes the
+day modules used to have, the "after" ones are what they use now: `__slots__`
+classes, or one array per field for whole collections.
+"""
+
+from __future__ import annotations
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from aoc.registry import get_day
+
+DEFAULT_N = 10**6
+
+
+class _PlainManual:
+    def __init__(self, pages: list[int]):
+        self.pages = pages
+
+
+class _PlainRobot:
+    def __init__(self, position: tuple[int, int], velocity: tuple[int, int]):
+        self.position = position
+        self.velocity = velocity
+
+
+class _PlainClawMachine:
+    def __init__(
+        self, x_a: int, y_a: int, x_b: int, y_b: int, x_prize: int, y_prize: int
+    ):
+        self.x_a = x_a
+        self.y_a = y_a
+        self.x_b = x_b
+        self.y_b = y_b
+        self.x_prize = x_prize
+        self.y_prize = y_prize
+
+
+@dataclass(frozen=True)
+class _PlainNode:
+    operation: str
+    left: str
+    right: str
+
+
+def measure(build: Callable[[int], Any], n: int) -> float:
+    """Bytes allocated per element to build n of them (and kept alive)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        built = build(n)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del built
+    return (after - before) / n
+
+
+def _layouts() -> dict[str, tuple[Callable[[int], Any], Callable[[int], Any]]]:
+    """name -> (before, after), each builds n elements"""
+    # Not at the top, the CLI imports this module for every command
+    import numpy as np
+
+    from aoc.components import label
+
+    day5 = get_day(5).load()
+    day13 = get_day(13).load()
+    day14 = get_day(14).load()
+    day24 = get_day(24).load()
+    # Pages are shared, only the objects around them are measured
+    pages = [list(range(23))] * 4
+    wires = ("AND", "x00", "y00")
+    return {
+        "day5 Manual": (
+            lambda n: [_PlainManual(pages[i % 4]) for i in range(n)],
+            lambda n: [day5.Manual(pages[i % 4]) for i in range(n)],
+        ),
+        "day12 region square": (
+            lambda n: {(i // 1000, i % 1000) for i in range(n)},
+            lambda n: label(np.zeros((n // 1000, 1000), dtype=np.uint8)),
+        ),
+        "day13 ClawMachine": (
+            lambda n: [_PlainClawMachine(i, i, i, i, i, i) for i in range(n)],
+            lambda n: day13.ClawMachines(np.arange(6 * n)),
+        ),
+        "day14 Robot": (
+            lambda n: [_PlainRobot((i, i), (i, -i)) for i in range(n)],
+            lambda n: day14.RobotMap(
+                np.zeros((n, 2), dtype=np.int64),
+                np.zeros((n, 2), dtype=np.int64),
+                101,
+                103,
+            ),
+        ),
+        "day24 Node": (
+            lambda n: [_PlainNode(*wires) for _ in range(n)],
+            lambda n: [day24.Node(*wires) for _ in range(n)],
+        ),
+    }
+
+
+def report(n: int = DEFAULT_N) -> list[dict[str, Any]]:
+    rows = []
+    for name, (before, after) in _layouts().items():
+        before_bytes = measure(before, n)
+        after_bytes = measure(after, n)
+        rows.append(
+            {
+                "name": name,
+                "n": n,
+                "before": before_bytes,
+                "after": after_bytes,
+                "ratio": before_bytes / after_bytes,
+            }
+        )
+    return rows
+
+
+def format_report(rows: list[dict[str, Any]]) -> str:
+    lines = [f"{'element':<22} {'n':>9} {'before B':>10} {'after B':>10} {'ratio':>7}"]
+    for row in rows:
+        lines.append(
+            f"{row['name']:<22} {row['n']:>9} {row['before']:>10.1f} "
+            f"{row['after']:>10.1f} {row['ratio']:>7.1f}"
+        )
+    return "\n".join(lines)
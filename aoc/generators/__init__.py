@@ -0,0 +1,82 @@
+"""
+Synthetic input generators.
+
+Every day has a module `aoc.generators.dayN` exposing
+`generate(out: TextIO, scale: int, rng: random.Random) -> None`,
+which writes an input that the day's own parser accepts.
+The meaning of `scale` is documented in each module (lines, side of a grid, ...).
+Modules that need to encode sizes the solvers cannot infer define `suffix(scale)`,
+which ends up in the file name.
+
+A generator that plants an answer the solvers cannot be checked against
+otherwise (day 24 swaps wires) returns it as {part: answer}. It is saved next
+to the input, see `known_answers`, and `bench` and `check` flag the runs on
+that input that get another answer.
+"""
+
+from __future__ import annotations
+import importlib
+import json
+import random
+from pathlib import Path
+from types import ModuleType
+from typing import Iterable
+
+from aoc.bench import InputProvider
+from aoc.registry import Day, get_day
+
+
+def get_generator(day: int) -> ModuleType:
+    try:
+        return importlib.import_module(f"aoc.generators.day{day}")
+    except ModuleNotFoundError:
+        raise LookupError(f"No generator for day {day}") from None
+
+
+def filename(day: int, scale: int, seed: int = 0) -> str:
+    module = get_generator(day)
+    suffix = f"-{module.suffix(scale)}" if hasattr(module, "suffix") else ""
+    return f"{scale}{suffix}-s{seed}.txt"
+
+
+def generate(day: int, scale: int, seed: int = 0, path: Path | None = None) -> Path:
+    if path is None:
+        path = get_day(day).source.parent / "scaling" / filename(day, scale, seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Seeding with the day as well, so that the same seed gives unrelated inputs
+    rng = random.Random(f"{day}-{scale}-{seed}")
+    with path.open("w") as out:
+        answers = get_generator(day).generate(out, scale, rng)
+    if answers:
+        with answers_path(path).open("w") as fout:
+            json.dump(answers, fout)
+    return path
+
+
+def answers_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.answers.json")
+
+
+def known_answers(path: Path) -> dict[int, str]:
+    """part -> answer planted by the generator of this input, empty when none was"""
+    try:
+        with answers_path(path).open("r") as fin:
+            return {int(part): answer for part, answer in json.load(fin).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def provider(scales: Iterable[int], seed: int = 0) -> InputProvider:
+    """Benchmark inputs, generated on first use and reused afterwards"""
+
+    def sized_inputs(day: Day) -> list[tuple[int, Path]]:
+        # The nominal size of a generated input is its scale
+        paths = []
+        for scale in scales:
+            path = day.source.parent / "scaling" / filename(day.number, scale, seed)
+            if not path.exists():
+                generate(day.number, scale, seed, path)
+            paths.append((scale, path))
+        return paths
+
+    return sized_inputs
@@ -0,0 +1,26 @@
+from typing import Iterable, TextIO
+
+CHUNK = 10_000
+
+
+def write_lines(out: TextIO, lines: Iterable[str], trailing_newline: bool = True) -> None:
+    """
+    Write in chunks, the large inputs do not fit comfortably in a single string.
+    Some parsers split on "\\n" without stripping, those want no trailing newline.
+    """
+    buffer = []
+    first = True
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) == CHUNK:
+            out.write(("" if first else "\n") + "\n".join(buffer))
+            buffer.clear()
+            first = False
+    if buffer:
+        out.write(("" if first else "\n") + "\n".join(buffer))
+    if trailing_newline:
+        out.write("\n")
+
+
+def grid_lines(grid: list[bytearray]) -> Iterable[str]:
+    return (row.decode() for row in grid)
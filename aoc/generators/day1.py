@@ -0,0 +1,16 @@
+"""scale: number of lines, i.e. length of each location list"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    # Ids collide between the two lists often enough to make part two interesting
+    low = 10_000
+    high = max(100_000, 10 * scale)
+    write_lines(
+        out,
+        (f"{rng.randrange(low, high)}   {rng.randrange(low, high)}" for _ in range(scale)),
+    )
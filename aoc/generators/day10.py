@@ -0,0 +1,38 @@
+"""scale: side of the (square) topographic map"""
+
+import random
+from collections import deque
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+# one summit every this many cells, the puzzle map has a few hundred on 50x50
+CELLS_PER_SUMMIT = 40
+NOISE = 0.05
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    # Heights go down by one per step away from the nearest summit,
+    # so every summit is surrounded by rings of trails down to the trailheads
+    distance = [[-1] * scale for _ in range(scale)]
+    queue = deque()
+    for _ in range(max(1, scale * scale // CELLS_PER_SUMMIT)):
+        y, x = rng.randrange(scale), rng.randrange(scale)
+        distance[y][x] = 0
+        queue.append((y, x))
+    while queue:
+        y, x = queue.popleft()
+        for ny, nx in ((y + 1, x), (y - 1, x), (y, x + 1), (y, x - 1)):
+            if 0 <= ny < scale and 0 <= nx < scale and distance[ny][nx] < 0:
+                distance[ny][nx] = distance[y][x] + 1
+                queue.append((ny, nx))
+    lines = []
+    for row in distance:
+        lines.append(
+            "".join(
+                str(rng.randint(0, 9) if rng.random() < NOISE else max(0, 9 - d))
+                for d in row
+            )
+        )
+    # the parser splits on "\n" without stripping empty lines
+    write_lines(out, lines, trailing_newline=False)
@@ -0,0 +1,12 @@
+"""scale: number of stones"""
+
+import random
+from typing import TextIO
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    stones = (
+        rng.choice((0, 1, rng.randint(0, 99), rng.randint(0, 10**7)))
+        for _ in range(scale)
+    )
+    out.write(" ".join(map(str, stones)) + "\n")
@@ -0,0 +1,28 @@
+"""scale: side of the (square) garden"""
+
+import random
+import string
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+# chance of extending the region above or to the left instead of starting a new one
+GROWTH = 0.85
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    previous = ""
+    lines = []
+    for y in range(scale):
+        row = []
+        for x in range(scale):
+            if rng.random() < GROWTH and (x or y):
+                if x and (not y or rng.random() < 0.5):
+                    row.append(row[-1])
+                else:
+                    row.append(previous[x])
+            else:
+                row.append(rng.choice(string.ascii_uppercase))
+        previous = "".join(row)
+        lines.append(previous)
+    write_lines(out, lines)
@@ -0,0 +1,28 @@
+"""scale: number of claw machines"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+
+def machine(rng: random.Random) -> str:
+    while True:
+        x_a, y_a, x_b, y_b = (rng.randint(10, 99) for _ in range(4))
+        # part two solves a 2x2 system, keep it non-singular
+        if x_a * y_b != x_b * y_a:
+            break
+    if rng.random() < 0.4:
+        push_a, push_b = rng.randint(0, 100), rng.randint(0, 100)
+        x, y = push_a * x_a + push_b * x_b, push_a * y_a + push_b * y_b
+    else:
+        x, y = rng.randint(1000, 20000), rng.randint(1000, 20000)
+    return (
+        f"Button A: X+{x_a}, Y+{y_a}\n"
+        f"Button B: X+{x_b}, Y+{y_b}\n"
+        f"Prize: X={x}, Y={y}\n"
+    )
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    write_lines(out, (machine(rng) for _ in range(scale)), trailing_newline=False)
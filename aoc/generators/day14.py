@@ -0,0 +1,31 @@
+"""scale: width of the bathroom, the height is two more, as in 101x103"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+# about 500 robots on the 101x103 puzzle
+CELLS_PER_ROBOT = 20
+
+
+def dimensions(scale: int) -> tuple[int, int]:
+    width = scale | 1
+    return width, width + 2
+
+
+def suffix(scale: int) -> str:
+    # day14.parse_file reads the size back from the file name
+    return "{}x{}".format(*dimensions(scale))
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    width, height = dimensions(scale)
+    speed = max(width, height) - 1
+
+    def robot() -> str:
+        x, y = rng.randrange(width), rng.randrange(height)
+        vx, vy = rng.randint(-speed, speed), rng.randint(-speed, speed)
+        return f"p={x},{y} v={vx},{vy}"
+
+    write_lines(out, (robot() for _ in range(max(1, width * height // CELLS_PER_ROBOT))))
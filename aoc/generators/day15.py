@@ -0,0 +1,34 @@
+"""scale: side of the (square) warehouse, walls included"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import grid_lines, write_lines
+
+WALLS = 0.1
+BOXES = 0.25
+MOVES_PER_CELL = 8
+MOVES_PER_LINE = 1000
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    grid = [bytearray(b"#" * scale)]
+    for _ in range(scale - 2):
+        row = bytearray(b"#")
+        for _ in range(scale - 2):
+            roll = rng.random()
+            row.append(ord("#") if roll < WALLS else ord("O") if roll < WALLS + BOXES else ord("."))
+        row.append(ord("#"))
+        grid.append(row)
+    grid.append(bytearray(b"#" * scale))
+    grid[rng.randint(1, scale - 2)][rng.randint(1, scale - 2)] = ord("@")
+    write_lines(out, grid_lines(grid))
+    out.write("\n")
+    n_moves = MOVES_PER_CELL * scale * scale
+    write_lines(
+        out,
+        (
+            "".join(rng.choices("<>^v", k=min(MOVES_PER_LINE, n_moves - start)))
+            for start in range(0, n_moves, MOVES_PER_LINE)
+        ),
+    )
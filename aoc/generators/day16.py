@@ -0,0 +1,39 @@
+"""scale: side of the (square) maze, walls included"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import grid_lines, write_lines
+
+# Walls knocked down after carving, a perfect maze has a single best path
+EXTRA_OPENINGS = 0.02
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    side = max(5, scale | 1)
+    grid = [bytearray(b"#" * side) for _ in range(side)]
+    # Carve a perfect maze on the odd cells with an iterative depth first search
+    start = (side - 2, 1)
+    grid[start[0]][start[1]] = ord(".")
+    stack = [start]
+    while stack:
+        y, x = stack[-1]
+        candidates = [
+            (y + dy, x + dx)
+            for dy, dx in ((0, 2), (0, -2), (2, 0), (-2, 0))
+            if 0 < y + dy < side - 1
+            and 0 < x + dx < side - 1
+            and grid[y + dy][x + dx] == ord("#")
+        ]
+        if not candidates:
+            stack.pop()
+            continue
+        ny, nx = rng.choice(candidates)
+        grid[(y + ny) // 2][(x + nx) // 2] = ord(".")
+        grid[ny][nx] = ord(".")
+        stack.append((ny, nx))
+    for _ in range(int(EXTRA_OPENINGS * side * side)):
+        grid[rng.randint(1, side - 2)][rng.randint(1, side - 2)] = ord(".")
+    grid[side - 2][1] = ord("S")
+    grid[1][side - 2] = ord("E")
+    write_lines(out, grid_lines(grid))
@@ -0,0 +1,39 @@
+"""scale: number of bits of register A, i.e. how long part one runs"""
+
+import random
+from typing import TextIO
+
+
+def first_output(a: int, k1: int, k2: int) -> int:
+    # the first value printed by the program built in generate
+    b = (a % 8) ^ k1
+    c = a >> b
+    return (b ^ k2 ^ c) % 8
+
+
+def has_quine(program: list[int], k1: int, k2: int) -> bool:
+    # the same three bits at a time search day17.solve does for part two
+    previous = [0]
+    for value in reversed(program):
+        previous = [
+            a
+            for p in previous
+            for a in range(8 * p, 8 * p + 8)
+            if first_output(a, k1, k2) == value
+        ]
+        if not previous:
+            return False
+    return True
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    # The puzzle programs all look like this one:
+    # bst A, bxl k1, cdv B, bxl k2, bxc, out B, adv 3, jnz 0
+    while True:
+        k1, k2 = rng.randrange(8), rng.randrange(8)
+        program = [2, 4, 1, k1, 7, 5, 1, k2, 4, rng.randrange(8), 5, 5, 0, 3, 3, 0]
+        if has_quine(program, k1, k2):
+            break
+    out.write(f"Register A: {rng.getrandbits(max(1, scale)) | 1 << (max(1, scale) - 1)}\n")
+    out.write("Register B: 0\nRegister C: 0\n\n")
+    out.write(f"Program: {','.join(map(str, program))}\n")
@@ -0,0 +1,44 @@
+"""scale: side of the memory space, 71 in the puzzle"""
+
+import random
+from collections import deque
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+# 1024 out of 71x71 cells are corrupted before part one
+PUZZLE_SIDE, PUZZLE_FIRST_BYTES = 71, 1024
+
+
+def first_bytes(scale: int) -> int:
+    # The same share of the cells as the puzzle, exactly 1024 at its side
+    return PUZZLE_FIRST_BYTES * scale * scale // (PUZZLE_SIDE * PUZZLE_SIDE)
+
+
+def suffix(scale: int) -> str:
+    # day18.MemoryMap reads the size and the bytes of part one from the file name
+    return f"{scale}x{scale}-{first_bytes(scale)}"
+
+
+def reachable(corrupted: set[tuple[int, int]], side: int) -> bool:
+    queue = deque([(0, 0)])
+    seen = {(0, 0)}
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) == (side - 1, side - 1):
+            return True
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < side and 0 <= ny < side and (nx, ny) not in corrupted and (nx, ny) not in seen:
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return False
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    # Every cell but the two corners falls eventually, so part two always has an answer
+    cells = [(x, y) for y in range(scale) for x in range(scale)][1:-1]
+    while True:
+        rng.shuffle(cells)
+        if reachable(set(cells[: first_bytes(scale)]), scale):
+            break
+    write_lines(out, (f"{x},{y}" for x, y in cells))
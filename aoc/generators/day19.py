@@ -0,0 +1,27 @@
+"""scale: number of designs"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+COLOURS = "wubrg"
+N_TOWELS = 400
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    towels = sorted(
+        {"".join(rng.choices(COLOURS, k=rng.randint(1, 8))) for _ in range(N_TOWELS)}
+        - set(COLOURS[:4])
+    )
+    # Without all the single colours not every design can be made
+    out.write(", ".join(towels) + "\n\n")
+
+    def design() -> str:
+        pieces = []
+        length = rng.randint(20, 60)
+        while sum(map(len, pieces)) < length:
+            pieces.append(rng.choice(towels) if rng.random() < 0.97 else rng.choice(COLOURS))
+        return "".join(pieces)
+
+    write_lines(out, (design() for _ in range(scale)), trailing_newline=False)
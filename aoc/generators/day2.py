@@ -0,0 +1,22 @@
+"""scale: number of reports"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+
+def report(rng: random.Random) -> str:
+    sign = rng.choice((-1, 1))
+    levels = [rng.randint(10, 90)]
+    for _ in range(rng.randint(4, 7)):
+        step = sign * rng.randint(1, 3)
+        if rng.random() < 0.08:
+            # an unsafe step, either too large, flat or in the wrong direction
+            step = rng.choice((0, -step, 4 * step))
+        levels.append(levels[-1] + step)
+    return " ".join(map(str, levels))
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    write_lines(out, (report(rng) for _ in range(scale)))
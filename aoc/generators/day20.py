@@ -0,0 +1,25 @@
+"""scale: side of the (square) race track, walls included"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import grid_lines, write_lines
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    # A single track, as the puzzle requires: corridors on the odd rows joined
+    # at alternating ends. Cheats through the walls in between save different
+    # amounts depending on how far along the corridor they are taken.
+    side = max(7, scale | 1)
+    grid = [bytearray(b"#" * side) for _ in range(side)]
+    rows = list(range(1, side - 1, 2))
+    for i, y in enumerate(rows):
+        grid[y][1 : side - 1] = b"." * (side - 2)
+        if i + 1 < len(rows):
+            grid[y + 1][side - 2 if i % 2 == 0 else 1] = ord(".")
+    # the track starts on a random cell of the first corridor
+    start = rng.randint(1, side - 2)
+    grid[rows[0]][1:start] = b"#" * (start - 1)
+    grid[rows[0]][start] = ord("S")
+    grid[rows[-1]][1 if len(rows) % 2 == 0 else side - 2] = ord("E")
+    write_lines(out, grid_lines(grid))
@@ -0,0 +1,10 @@
+"""scale: number of door codes"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    write_lines(out, (f"{rng.randrange(1000):03d}A" for _ in range(scale)))
@@ -0,0 +1,10 @@
+"""scale: number of buyers"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    write_lines(out, (str(rng.randrange(1, 2**24)) for _ in range(scale)))
@@ -0,0 +1,42 @@
+"""scale: number of computers"""
+
+import random
+import string
+from itertools import combinations
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+# The puzzle has 520 computers with 13 connections each and a LAN party of 13
+DEGREE = 13
+PARTY = 13
+
+
+def names(n: int, rng: random.Random) -> list[str]:
+    # two letters as in the puzzle, longer names once those run out
+    width = 2
+    while 26**width < n:
+        width += 1
+    chosen = rng.sample(range(26**width), n)
+    result = []
+    for value in chosen:
+        letters = []
+        for _ in range(width):
+            value, letter = divmod(value, 26)
+            letters.append(string.ascii_lowercase[letter])
+        result.append("".join(letters))
+    return result
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    computers = names(max(scale, PARTY + 1), rng)
+    edges = set()
+    for a, b in combinations(rng.sample(computers, PARTY), 2):
+        edges.add((a, b))
+    for a in computers:
+        for b in rng.sample(computers, DEGREE // 2):
+            if a != b and (b, a) not in edges:
+                edges.add((a, b))
+    edges = list(edges)
+    rng.shuffle(edges)
+    write_lines(out, (f"{a}-{b}" for a, b in edges))
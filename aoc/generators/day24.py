@@ -0,0 +1,82 @@
+"""
+scale: number of bits of the adder, it has five gates per bit
+
+As in the puzzle, the outputs of four pairs of gates are swapped. Each swap is
+within the gates of one bit, of a kind that breaks the sum without making a
+loop. The swapped wires are the answer of part two, generate returns it.
+"""
+
+import random
+import string
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+# internal wires must not look like inputs or outputs
+FIRST_LETTERS = string.ascii_lowercase[:-3]
+
+SWAPS = 4
+# Among the outputs of one bit: partial sum, partial carry, sum, carried, next carry.
+# Not partial carry with carried, they are both ORed and swapping them changes nothing.
+SWAP_KINDS = ((0, 1), (2, 1), (2, 3), (2, 4))
+
+
+def wire_names(n: int, rng: random.Random) -> list[str]:
+    width = 3
+    while len(FIRST_LETTERS) * 26 ** (width - 1) < n:
+        width += 1
+    chosen = rng.sample(range(len(FIRST_LETTERS) * 26 ** (width - 1)), n)
+    result = []
+    for value in chosen:
+        value, first = divmod(value, len(FIRST_LETTERS))
+        letters = [FIRST_LETTERS[first]]
+        for _ in range(width - 1):
+            value, letter = divmod(value, 26)
+            letters.append(string.ascii_lowercase[letter])
+        result.append("".join(letters))
+    return result
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> dict[int, str]:
+    # A ripple carry adder, with a bit for each swap past the first one
+    bits = max(SWAPS + 1, scale)
+    digits = max(2, len(str(bits)))
+
+    def wire(letter: str, i: int) -> str:
+        return f"{letter}{i:0{digits}d}"
+
+    internal = iter(wire_names(4 * bits, rng))
+    gates = [
+        (wire("x", 0), "XOR", wire("y", 0), wire("z", 0)),
+        (wire("x", 0), "AND", wire("y", 0), carry := next(internal)),
+    ]
+    # Per bit past the first, the index in gates of the gate behind each output
+    outputs = []
+    for i in range(1, bits):
+        x, y = wire("x", i), wire("y", i)
+        partial_sum, partial_carry, carried = next(internal), next(internal), next(internal)
+        next_carry = wire("z", bits) if i == bits - 1 else next(internal)
+        outputs.append(range(len(gates), len(gates) + 5))
+        gates += [
+            (x, "XOR", y, partial_sum),
+            (x, "AND", y, partial_carry),
+            (partial_sum, "XOR", carry, wire("z", i)),
+            (partial_sum, "AND", carry, carried),
+            (partial_carry, "OR", carried, next_carry),
+        ]
+        carry = next_carry
+    swapped = []
+    for bit in rng.sample(outputs, SWAPS):
+        first, second = (bit[k] for k in rng.choice(SWAP_KINDS))
+        *left, left_out = gates[first]
+        *right, right_out = gates[second]
+        gates[first], gates[second] = (*left, right_out), (*right, left_out)
+        swapped += [left_out, right_out]
+    rng.shuffle(gates)
+    values = [f"{wire('x', i)}: {rng.randint(0, 1)}" for i in range(bits)]
+    values += [f"{wire('y', i)}: {rng.randint(0, 1)}" for i in range(bits)]
+    # no trailing newline in the first section, the parser counts its lines
+    write_lines(out, values, trailing_newline=False)
+    out.write("\n\n")
+    write_lines(out, (" ".join(gate[:3]) + f" -> {gate[3]}" for gate in gates))
+    return {2: ",".join(sorted(swapped))}
@@ -0,0 +1,29 @@
+"""scale: number of schematics, locks and keys"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+WIDTH = 5
+HEIGHT = 7
+
+
+def schematic(rng: random.Random) -> str:
+    heights = [rng.randint(0, HEIGHT - 2) for _ in range(WIDTH)]
+    rows = (
+        ["#" * WIDTH]
+        + [
+            "".join("#" if h > level else "." for h in heights)
+            for level in range(HEIGHT - 2)
+        ]
+        + ["." * WIDTH]
+    )
+    if rng.random() < 0.5:
+        # keys are upside down locks
+        rows = rows[::-1]
+    return "\n".join(rows) + "\n"
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    write_lines(out, (schematic(rng) for _ in range(scale)), trailing_newline=False)
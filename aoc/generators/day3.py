@@ -0,0 +1,34 @@
+"""scale: number of tokens (instructions and garbage) in the memory dump"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+GARBAGE = "!@#$%^&*()[]{}<>,;:'?+-_ /whyselectfromwhomulxdon"
+TOKENS_PER_LINE = 400
+
+
+def token(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.35:
+        return f"mul({rng.randint(1, 999)},{rng.randint(1, 999)})"
+    if roll < 0.40:
+        return "do()"
+    if roll < 0.45:
+        return "don't()"
+    if roll < 0.55:
+        # almost valid ones, the regex has to skip them
+        return rng.choice(("mul(4*", "mul(6,9!", "mul ( 2 , 4 )", "mul[3,7]", "do_not_mul(5,5"))
+    return "".join(rng.choice(GARBAGE) for _ in range(rng.randint(1, 8)))
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    n_lines = max(1, scale // TOKENS_PER_LINE)
+    write_lines(
+        out,
+        (
+            "".join(token(rng) for _ in range(scale // n_lines))
+            for _ in range(n_lines)
+        ),
+    )
@@ -0,0 +1,15 @@
+"""scale: side of the (square) word search"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    # part one splits on "\n" and wants a square, so no trailing newline
+    write_lines(
+        out,
+        ("".join(rng.choices("XMAS", k=scale)) for _ in range(scale)),
+        trailing_newline=False,
+    )
@@ -0,0 +1,28 @@
+"""scale: number of updates"""
+
+import random
+from itertools import combinations
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+N_PAGES = 49
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    # Rules between every pair of pages of a hidden order, as in the puzzle,
+    # so every update has exactly one correct ordering
+    order = rng.sample(range(10, 100), N_PAGES)
+    rank = {page: i for i, page in enumerate(order)}
+    rules = [f"{before}|{after}" for before, after in combinations(order, 2)]
+    rng.shuffle(rules)
+    write_lines(out, rules)
+    out.write("\n")
+
+    def update() -> str:
+        pages = rng.sample(order, rng.randrange(5, 24, 2))
+        if rng.random() < 0.5:
+            pages.sort(key=rank.__getitem__)
+        return ",".join(map(str, pages))
+
+    write_lines(out, (update() for _ in range(scale)))
@@ -0,0 +1,53 @@
+"""scale: side of the (square) lab map"""
+
+from __future__ import annotations
+import random
+from typing import TextIO
+
+from aoc.generators._common import grid_lines, write_lines
+
+DENSITY = 0.045
+# random starts tried on every map, the one with the longest walk is kept
+STARTS = 32
+# up, right, down, left: the guard turns right
+MOVES = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def walk_length(grid: list[bytearray], start: tuple[int, int]) -> int | None:
+    # part one walks until the guard leaves, a looping map would never finish
+    side = len(grid)
+    y, x = start
+    direction = 0
+    seen = set()
+    steps = 0
+    while True:
+        dy, dx = MOVES[direction]
+        ny, nx = y + dy, x + dx
+        if not (0 <= ny < side and 0 <= nx < side):
+            return steps
+        if grid[ny][nx] == ord("#"):
+            if (y, x, direction) in seen:
+                return None
+            seen.add((y, x, direction))
+            direction = (direction + 1) % 4
+        else:
+            y, x = ny, nx
+            steps += 1
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    grid = [bytearray(b"." * scale) for _ in range(scale)]
+    for _ in range(int(DENSITY * scale * scale)):
+        grid[rng.randrange(scale)][rng.randrange(scale)] = ord("#")
+    best, start = -1, None
+    while start is None:
+        # on a random map most starts leave quickly, keep the longest walk
+        for _ in range(STARTS):
+            candidate = rng.randrange(scale), rng.randrange(scale)
+            if grid[candidate[0]][candidate[1]] == ord("#"):
+                continue
+            length = walk_length(grid, candidate)
+            if length is not None and length > best:
+                best, start = length, candidate
+    grid[start[0]][start[1]] = ord("^")
+    write_lines(out, grid_lines(grid))
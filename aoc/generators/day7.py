@@ -0,0 +1,28 @@
+"""scale: number of equations"""
+
+import random
+from typing import TextIO
+
+from aoc.generators._common import write_lines
+
+
+def equation(rng: random.Random) -> str:
+    operands = [rng.randint(1, 999) for _ in range(rng.randint(3, 12))]
+    if rng.random() < 0.5:
+        # solvable by construction, with concatenation sometimes
+        total = operands[0]
+        for operand in operands[1:]:
+            operator = rng.choice("+*|")
+            if operator == "+":
+                total += operand
+            elif operator == "*":
+                total *= operand
+            else:
+                total = int(f"{total}{operand}")
+    else:
+        total = rng.randint(1, 10 ** rng.randint(3, 14))
+    return f"{total}: {' '.join(map(str, operands))}"
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    write_lines(out, (equation(rng) for _ in range(scale)))
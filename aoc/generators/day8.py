@@ -0,0 +1,19 @@
+"""scale: side of the (square) antenna map"""
+
+import random
+import string
+from typing import TextIO
+
+from aoc.generators._common import grid_lines, write_lines
+
+FREQUENCIES = string.digits + string.ascii_letters
+ANTENNAS_PER_FREQUENCY = 4
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    grid = [bytearray(b"." * scale) for _ in range(scale)]
+    cells = rng.sample(range(scale * scale), min(scale * scale, len(FREQUENCIES) * ANTENNAS_PER_FREQUENCY))
+    for i, cell in enumerate(cells):
+        grid[cell // scale][cell % scale] = ord(FREQUENCIES[i % len(FREQUENCIES)])
+    # the height is taken from the number of "\n"-separated lines
+    write_lines(out, grid_lines(grid), trailing_newline=False)
@@ -0,0 +1,18 @@
+"""scale: number of digits in the disk map"""
+
+import random
+from typing import TextIO
+
+
+def generate(out: TextIO, scale: int, rng: random.Random) -> None:
+    # alternating file (1-9) and free space (0-9) lengths, starting and ending on a file
+    scale = scale | 1
+    chunk = 10_000
+    for start in range(0, scale, chunk):
+        out.write(
+            "".join(
+                str(rng.randint(1, 9)) if i % 2 == 0 else str(rng.randint(0, 9))
+                for i in range(start, min(start + chunk, scale))
+            )
+        )
+    out.write("\n")
@@ -0,0 +1,144 @@
+"""
+Shared grid type for the map puzzles.
+
+The cells live in one contiguous NumPy array, row-major, surrounded by `pad` rings
+of an `outside` value. Cells are addressed by their flat index, so a neighbour
+is a single addition and, thanks to the border, never needs a bounds check:
+stepping off the map lands on `outside`.
+
+Hot loops that go cell by cell should index `grid.cells` (a memoryview over the
+same buffer, which returns plain ints) rather than the array, NumPy scalars are slow.
+Whole-map questions should use the array (`grid.flat`, `grid.inner`) and masks.
+"""
+
+from __future__ import annotations
+from functools import cached_property
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+# Byte value of the border of character grids, no puzzle uses it
+OUTSIDE = 0
+
+UP, RIGHT, DOWN, LEFT = range(4)
+# (dy, dx) by direction, turning right is +1 and turning left is -1 (mod 4)
+DIRECTIONS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+ARROWS = {"^": UP, ">": RIGHT, "v": DOWN, "<": LEFT}
+
+
+class Grid:
+    def __init__(self, cells: np.ndarray, pad: int = 1, outside: int = OUTSIDE):
+        self.height, self.width = cells.shape
+        self.pad = pad
+        self.outside = outside
+        self.stride = self.width + 2 * pad
+        padded = np.full((self.height + 2 * pad, self.stride), outside, dtype=cells.dtype)
+        padded[pad : pad + self.height, pad : pad + self.width] = cells
+        self.flat = padded.reshape(-1)
+        # Flat offsets indexed like DIRECTIONS
+        self.offsets = tuple(dy * self.stride + dx for dy, dx in DIRECTIONS)
+
+    @classmethod
+    def view(
+        cls, flat: np.ndarray, height: int, width: int, pad: int = 1, outside: int = OUTSIDE
+    ) -> Grid:
+        """A grid around an already padded flat array, which is not copied"""
+        grid = cls.__new__(cls)
+        grid.height, grid.width = height, width
+        grid.pad = pad
+        grid.outside = outside
+        grid.stride = width + 2 * pad
+        grid.flat = flat
+        grid.offsets = tuple(dy * grid.stride + dx for dy, dx in DIRECTIONS)
+        return grid
+
+    @classmethod
+    def from_lines(
+        cls, lines: Sequence[str], pad: int = 1, outside: int = OUTSIDE
+    ) -> Grid:
+        lines = [line.strip() for line in lines if line.strip()]
+        data = np.frombuffer("".join(lines).encode(), dtype=np.uint8)
+        return cls(data.reshape(len(lines), len(lines[0])), pad, outside)
+
+    @classmethod
+    def from_digits(cls, lines: Sequence[str], pad: int = 1, outside: int = -1) -> Grid:
+        grid = cls.from_lines(lines, pad)
+        cells = grid.inner.astype(np.int8) - ord("0")
+        return cls(cells, pad, outside)
+
+    @classmethod
+    def full(
+        cls,
+        height: int,
+        width: int,
+        value: int = 0,
+        dtype: DTypeLike = np.uint8,
+        pad: int = 1,
+        outside: int = OUTSIDE,
+    ) -> Grid:
+        return cls(np.full((height, width), value, dtype=dtype), pad, outside)
+
+    @property
+    def padded(self) -> np.ndarray:
+        return self.flat.reshape(-1, self.stride)
+
+    @property
+    def inner(self) -> np.ndarray:
+        p = self.pad
+        return self.padded[p : p + self.height, p : p + self.width]
+
+    @cached_property
+    def cells(self) -> memoryview:
+        return memoryview(self.flat)
+
+    @cached_property
+    def inside(self) -> np.ndarray:
+        mask = np.zeros(self.padded.shape, dtype=bool)
+        p = self.pad
+        mask[p : p + self.height, p : p + self.width] = True
+        return mask.reshape(-1)
+
+    def __len__(self) -> int:
+        return self.flat.size
+
+    def __getitem__(self, cell: int) -> int:
+        return self.cells[cell]
+
+    def __setitem__(self, cell: int, value: int) -> None:
+        self.cells[cell] = value
+
+    def id(self, y: int, x: int) -> int:
+        return (y + self.pad) * self.stride + x + self.pad
+
+    def ids(self, ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+        return (np.asarray(ys) + self.pad) * self.stride + np.asarray(xs) + self.pad
+
+    def yx(self, cell: int) -> tuple[int, int]:
+        y, x = divmod(cell, self.stride)
+        return y - self.pad, x - self.pad
+
+    def yxs(self, cells: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        ys, xs = np.divmod(np.asarray(cells), self.stride)
+        return ys - self.pad, xs - self.pad
+
+    def neighbours(self, cell: int) -> list[int]:
+        return [cell + offset for offset in self.offsets]
+
+    def mask(self, value: int | str) -> np.ndarray:
+        if isinstance(value, str):
+            value = ord(value)
+        return self.flat == value
+
+    def find(self, value: int | str) -> np.ndarray:
+        return np.flatnonzero(self.mask(value))
+
+    def find_one(self, value: int | str) -> int:
+        (cell,) = self.find(value)
+        return int(cell)
+
+    def copy(self) -> Grid:
+        return self.with_padding(self.pad)
+
+    def with_padding(self, pad: int) -> Grid:
+        return Grid(self.inner.copy(), pad, self.outside)
@@ -0,0 +1,274 @@
+"""
+History of every run, in a local SQLite database.
+
+Each solve from the CLI (`run`, `all`, `batch`, `solve`) appends one row: day,
+part, a hash of the input, the git revision, wall and CPU time, the peak RSS
+of the process that solved it, the status and the answer. Runs are compared
+on the same input only, through its hash, so moving or renaming inputs
+does not matter.
+
+Queries:
+    trends          recent timings per day and part
+    regressions     latest run slower than the median of the previous ones
+    answer_changes  inputs that got different answers over time
+
+Environment:
+    AOC_HISTORY=0       do not record anything
+    AOC_HISTORY=path    database to use (default: <repo>/.cache/history.sqlite3)
+"""
+
+from __future__ import annotations
+import hashlib
+import os
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import astuple, dataclass, field, fields
+from functools import cache
+from pathlib import Path
+from typing import Any, Iterable
+
+from aoc.registry import ROOT
+
+DEFAULT_PATH = ROOT / ".cache" / "history.sqlite3"
+DEFAULT_LAST = 10
+DEFAULT_TOLERANCE = 1.25
+# The smallest inputs run in microseconds, slowdowns below this are noise
+MIN_REGRESSION_SECONDS = 1e-3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    timestamp REAL NOT NULL,
+    day INTEGER NOT NULL,
+    part INTEGER NOT NULL,
+    input_hash TEXT NOT NULL,
+    input TEXT NOT NULL,
+    revision TEXT NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    wall REAL NOT NULL,
+    cpu REAL,
+    peak_rss INTEGER,
+    answer TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_input ON runs (day, part, input_hash, timestamp);
+"""
+
+
+@dataclass
+class Run:
+    day: int
+    part: int
+    input_hash: str
+    input: str
+    revision: str
+    source: str
+    status: str
+    wall: float
+    cpu: float | None = None
+    peak_rss: int | None = None
+    answer: str | None = None
+    timestamp: float = field(default_factory=time.time)
+
+
+COLUMNS = [f.name for f in fields(Run)]
+
+
+def enabled() -> bool:
+    return os.environ.get("AOC_HISTORY", "1") != "0"
+
+
+def database() -> Path:
+    value = os.environ.get("AOC_HISTORY", "1")
+    return DEFAULT_PATH if value in ("", "1") else Path(value)
+
+
+def _git(*args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+@cache
+def revision() -> str:
+    """Short hash of HEAD, with a + when the tree has local changes"""
+    try:
+        head = _git("rev-parse", "--short", "HEAD")
+        dirty = _git("status", "--porcelain", "--untracked-files=no")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return head + "+" if dirty else head
+
+
+def input_hash(source: Path | bytes) -> str:
+    if isinstance(source, bytes):
+        return hashlib.blake2b(source, digest_size=16).hexdigest()
+    with Path(source).open("rb") as fin:
+        return hashlib.file_digest(fin, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+def peak_rss() -> int:
+    """Peak resident memory of this process so far, in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def connect(path: Path | None = None) -> sqlite3.Connection:
+    path = Path(path or database())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def make_run(
+    day: int,
+    part: int,
+    input: Path | bytes,
+    source: str,
+    status: str,
+    wall: float,
+    cpu: float | None = None,
+    rss: int | None = None,
+    answer: Any = None,
+) -> Run:
+    """The input is a path, or the input itself when it did not come from a file"""
+    try:
+        digest = input_hash(input)
+    except OSError:
+        digest = ""
+    return Run(
+        day,
+        part,
+        digest,
+        "<bytes>" if isinstance(input, bytes) else str(Path(input).resolve()),
+        revision(),
+        source,
+        status,
+        wall,
+        cpu,
+        rss,
+        None if answer is None else str(answer),
+    )
+
+
+def append(runs: Iterable[Run], path: Path | None = None) -> int:
+    """Store the runs, does nothing when the history is off, returns how many"""
+    if not enabled():
+        return 0
+    rows = [astuple(run) for run in runs]
+    placeholders = ", ".join("?" * len(COLUMNS))
+    with connect(path) as connection:
+        connection.executemany(
+            f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows
+        )
+    connection.close()
+    return len(rows)
+
+
+def select(
+    connection: sqlite3.Connection,
+    days: Iterable[int] | None = None,
+    parts: Iterable[int] | None = None,
+    status: str | None = None,
+) -> list[Run]:
+    """Oldest first"""
+    clauses, parameters = [], []
+    for column, values in (("day", days), ("part", parts)):
+        if values:
+            values = list(values)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            parameters.extend(values)
+    if status is not None:
+        clauses.append("status = ?")
+        parameters.append(status)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = connection.execute(
+        f"SELECT {', '.join(COLUMNS)} FROM runs {where} ORDER BY timestamp", parameters
+    )
+    return [Run(**row) for row in rows]
+
+
+def _by_input(runs: Iterable[Run]) -> dict[tuple[int, int, str], list[Run]]:
+    groups = defaultdict(list)
+    for run in runs:
+        groups[(run.day, run.part, run.input_hash)].append(run)
+    return groups
+
+
+def trends(runs: Iterable[Run], last: int = DEFAULT_LAST) -> list[dict[str, Any]]:
+    """Per day, part and input: the latest run against the ones before it"""
+    rows = []
+    for (day, part, digest), group in sorted(_by_input(runs).items()):
+        recent = [run.wall for run in group[-last - 1 : -1]]
+        latest = group[-1]
+        median = statistics.median(recent) if recent else None
+        rows.append(
+            {
+                "day": day,
+                "part": part,
+                "input": digest[:8],
+                "runs": len(group),
+                "latest": latest.wall,
+                "median": median,
+                "best": min(run.wall for run in group),
+                "change": None if not median else latest.wall / median - 1,
+                "revision": latest.revision,
+                "peak_rss": latest.peak_rss,
+            }
+        )
+    return rows
+
+
+def regressions(
+    runs: Iterable[Run], last: int = DEFAULT_LAST, tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """Latest run slower than `tolerance` times the median of the `last` runs before it"""
+    found = []
+    for (day, part, digest), group in sorted(_by_input(runs).items()):
+        if len(group) < 2:
+            continue
+        latest = group[-1]
+        median = statistics.median(run.wall for run in group[-last - 1 : -1])
+        if latest.wall > tolerance * median and latest.wall - median > MIN_REGRESSION_SECONDS:
+            found.append(
+                f"{day}.{part} on {digest[:8]}: {latest.wall:.4f}s at {latest.revision}, "
+                f"median {median:.4f}s over the {len(group[-last - 1 : -1])} runs before"
+            )
+    return found
+
+
+def answer_changes(runs: Iterable[Run]) -> list[str]:
+    """Inputs whose answer is not the same in every successful run"""
+    found = []
+    for (day, part, digest), group in sorted(_by_input(runs).items()):
+        answers = {}
+        for run in group:
+            answers.setdefault(run.answer, run.revision)
+        if len(answers) > 1:
+            seen = ", ".join(f"{answer!r} since {rev}" for answer, rev in answers.items())
+            found.append(f"{day}.{part} on {digest[:8]}: {seen}")
+    return found
+
+
+def format_trends(rows: list[dict[str, Any]]) -> str:
+    lines = [
+        f"{'part':<6} {'input':<8} {'runs':>5} {'latest s':>10} {'median s':>10} "
+        f"{'best s':>10} {'change':>8} {'peak MB':>8} revision"
+    ]
+    for row in rows:
+        median = "-" if row["median"] is None else f"{row['median']:.4f}"
+        change = "-" if row["change"] is None else f"{row['change']:+.0%}"
+        rss = "-" if row["peak_rss"] is None else f"{row['peak_rss'] / 1e6:.0f}"
+        lines.append(
+            f"{str(row['day']) + '.' + str(row['part']):<6} {row['input']:<8} {row['runs']:>5} "
+            f"{row['latest']:>10.4f} {median:>10} {row['best']:>10.4f} {change:>8} "
+            f"{rss:>8} {row['revision']}"
+        )
+    return "\n".join(lines)
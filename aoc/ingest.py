@@ -0,0 +1,159 @@
+"""
+Bulk parsing of integers into NumPy arrays.
+
+Every run of digits is a number, with a minus sign right before it making it
+negative, and everything else is a separator. That covers whitespace, commas
+and the prose around numbers ("Button A: X+94, Y+34") alike, no regex needed.
+Digit runs are found and folded into values with array operations on the raw
+bytes, nothing goes through a Python int.
+
+Files are read through aoc.readers, one chunk of whole lines at a time, which
+bounds the temporaries to a few times the chunk size.
+Rows of different lengths come back as a Ragged: all the values in one array
+and an offsets array where row i is values[offsets[i]:offsets[i + 1]].
+"""
+
+from __future__ import annotations
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from aoc import readers
+
+ZERO, NINE, MINUS, NEWLINE = b"09-\n"
+# Significant digits of the widest int64, 19 digit numbers still fold exactly in uint64
+MAX_DIGITS = 19
+POWERS_OF_TEN = 10 ** np.arange(MAX_DIGITS, dtype=np.uint64)
+INT64 = np.iinfo(np.int64)
+SPACED = readers.SPACED
+
+Source = Path | bytes
+
+
+@dataclass
+class Ragged:
+    values: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> np.ndarray:
+        return self.values[self.offsets[row] : self.offsets[row + 1]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(np.split(self.values, self.offsets[1:-1]))
+
+    def slice(self, start: int, stop: int) -> Ragged:
+        """Rows start to stop, a view of the values"""
+        offsets = self.offsets[start : stop + 1]
+        return Ragged(self.values[offsets[0] : offsets[-1]], offsets - offsets[0])
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def tolist(self) -> list[list[int]]:
+        values = self.values.tolist()
+        bounds = self.offsets.tolist()
+        return [values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _runs(data: bytes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The bytes, and where every run of digits starts and ends"""
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    digits = (buffer - np.uint8(ZERO)) < 10
+    edges = np.diff(digits.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    return buffer, np.flatnonzero(edges > 0), np.flatnonzero(edges < 0)
+
+
+def _fold(buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    The value of every run of digits, taking the sign before it into account.
+    Raises OverflowError for values outside int64.
+    """
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64)
+    # Leading zeros do not count: digits start at the first nonzero one of the run
+    nonzero = np.append(np.flatnonzero((buffer - np.uint8(ZERO + 1)) < 9), len(buffer))
+    lengths = np.maximum(ends - nonzero[np.searchsorted(nonzero, starts)], 0)
+    negative = (buffer[np.maximum(starts - 1, 0)] == MINUS) & (starts > 0)
+    if (width := int(lengths.max())) > MAX_DIGITS:
+        raise OverflowError(f"A number of {width} digits does not fit in int64")
+    if not width:
+        return np.zeros(len(starts), dtype=np.int64)
+    # One row per number, its digits right-aligned and zeros on the left
+    columns = np.arange(-width, 0)
+    digits = buffer[np.maximum(ends[:, None] + columns, 0)] - np.uint8(ZERO)
+    digits[columns < -lengths[:, None]] = 0
+    magnitudes = digits.astype(np.uint64) @ POWERS_OF_TEN[width - 1 :: -1]
+    # -2**63 is the one magnitude that only fits negated
+    limits = np.where(negative, np.uint64(INT64.max) + np.uint64(1), np.uint64(INT64.max))
+    if width == MAX_DIGITS and (magnitudes > limits).any():
+        raise OverflowError("A number does not fit in int64")
+    # 2**63 wraps to -2**63, which negating leaves as it is
+    values = magnitudes.astype(np.int64)
+    values[negative] *= -1
+    return values
+
+
+def _parse(data: bytes) -> np.ndarray:
+    # Fast path: with every other byte turned into a space, NumPy's own text
+    # parser does the job. Anything it chokes on (a minus sign in the middle
+    # of "5-3") goes through the digit runs instead.
+    spaced = data.translate(SPACED)
+    if b"-" in spaced:
+        spaced = spaced.replace(b"- ", b"  ").rstrip(b"- ")
+    if not spaced.strip():
+        return np.zeros(0, dtype=np.int64)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(spaced, dtype=np.int64, sep=" ")
+    except (ValueError, DeprecationWarning):
+        return _fold(*_runs(data))
+    # Numbers too large for int64 come out clamped, not as an error
+    if values.size and (values.max() == INT64.max or values.min() == INT64.min):
+        return _fold(*_runs(data))
+    return values
+
+
+def _chunks(source: Source) -> Iterator[bytes]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+    else:
+        yield from readers.chunks(source)
+
+
+def ints(source: Source) -> np.ndarray:
+    """Every integer, in order, as one int64 array"""
+    parts = [_parse(chunk) for chunk in _chunks(source)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def table(source: Source, columns: int) -> np.ndarray:
+    """The integers as rows of `columns`, one per line for a regular file"""
+    values = ints(source)
+    if len(values) % columns:
+        raise ValueError(f"{len(values)} integers do not make rows of {columns}")
+    return values.reshape(-1, columns)
+
+
+def rows(source: Source) -> Ragged:
+    """The integers of every non-empty line"""
+    values = []
+    counts = []
+    for chunk in _chunks(source):
+        buffer, starts, ends = _runs(chunk)
+        values.append(_parse(chunk))
+        # Numbers per line, lines without any are dropped
+        line_of_number = np.searchsorted(np.flatnonzero(buffer == NEWLINE), starts)
+        per_line = np.bincount(line_of_number)
+        counts.append(per_line[per_line > 0])
+    if not values:
+        return Ragged(np.zeros(0, dtype=np.int64), np.zeros(1, dtype=np.int64))
+    offsets = np.concatenate(([0], np.cumsum(np.concatenate(counts))))
+    return Ragged(np.concatenate(values), offsets.astype(np.int64))
@@ -0,0 +1,197 @@
+"""
+Nested timings of the phases of a run.
+
+`phase("name")` (a context manager) and `@instrumented` (a decorator) record
+how long each phase takes and how many times it runs, nested under the phase
+that was running when they were entered. The result is a tree, for instance
+    day12.part2 > parse_file
+                > get_regions
+
+Environment:
+    AOC_PROFILE=1           record phases
+    AOC_PROFILE=cprofile    record phases and run cProfile as well
+    AOC_PROFILE=memory      record phases with their memory peaks, see aoc.memory
+
+The switch is read when a function is decorated, that is when a day module is
+imported. Disabled, `@instrumented` returns the function itself and `phase`
+a shared no-op context manager, so there is nothing to pay.
+"""
+
+from __future__ import annotations
+import cProfile
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Iterator, TypeVar
+
+if TYPE_CHECKING:
+    from aoc.memory import Tracer
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_NULL = nullcontext()
+
+
+def enabled() -> bool:
+    return os.environ.get("AOC_PROFILE", "0") not in ("", "0")
+
+
+def cprofile_enabled() -> bool:
+    return os.environ.get("AOC_PROFILE") == "cprofile"
+
+
+def memory_enabled() -> bool:
+    return os.environ.get("AOC_PROFILE") == "memory"
+
+
+@dataclass
+class Node:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    # Memory mode only: highest traced peak of a call, total growth of the peak RSS
+    peak_bytes: int = 0
+    rss_growth: int = 0
+    children: dict[str, Node] = field(default_factory=dict)
+
+    @property
+    def own_seconds(self) -> float:
+        return self.seconds - sum(child.seconds for child in self.children.values())
+
+    def child(self, name: str) -> Node:
+        if (node := self.children.get(name)) is None:
+            node = self.children[name] = Node(name)
+        return node
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "peak_bytes": self.peak_bytes,
+            "rss_growth": self.rss_growth,
+            "children": [child.to_dict() for child in self.children.values()],
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self.root = Node("root")
+        self.stack = [self.root]
+        self.tracer: Tracer | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Node]:
+        if len(self.stack) == 1 and self.tracer is None and memory_enabled():
+            # Started by the outermost phase, the switch may be set after the import
+            from aoc.memory import Tracer
+
+            self.tracer = Tracer()
+        node = self.stack[-1].child(name)
+        self.stack.append(node)
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.enter()
+        start = time.perf_counter()
+        try:
+            yield node
+        finally:
+            node.seconds += time.perf_counter() - start
+            node.calls += 1
+            if tracer is not None:
+                peak, rss = tracer.exit()
+                node.peak_bytes = max(node.peak_bytes, peak)
+                node.rss_growth += rss
+            self.stack.pop()
+
+    def reset(self) -> None:
+        self.root = Node("root")
+        self.stack = [self.root]
+
+
+RECORDER = Recorder()
+
+
+def phase(name: str) -> ContextManager:
+    if not enabled():
+        return _NULL
+    return RECORDER.phase(name)
+
+
+def instrumented(func: F | None = None, *, name: str | None = None) -> F | Callable[[F], F]:
+    """Record every call as a phase, named after the function by default"""
+
+    def decorator(func: F) -> F:
+        if not enabled():
+            return func
+        phase_name = name or func.__name__
+        record = RECORDER.phase
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with record(phase_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator if func is None else decorator(func)
+
+
+@contextmanager
+def profile(path: Path | None = None) -> Iterator[cProfile.Profile | None]:
+    """cProfile the block when asked to by AOC_PROFILE, dumping the stats to path"""
+    if not cprofile_enabled():
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+
+
+def format_tree(root: Node | None = None, memory: bool | None = None) -> str:
+    root = root or RECORDER.root
+    memory = RECORDER.tracer is not None if memory is None else memory
+    lines = [f"{'phase':<48} {'calls':>9} {'total s':>10} {'own s':>10}"]
+    if memory:
+        lines[0] += f" {'peak MB':>10} {'+RSS MB':>10}"
+
+    def walk(node: Node, depth: int) -> None:
+        label = "  " * depth + node.name
+        line = f"{label:<48} {node.calls:>9} {node.seconds:>10.4f} {node.own_seconds:>10.4f}"
+        if memory:
+            line += f" {node.peak_bytes / 1e6:>10.2f} {node.rss_growth / 1e6:>10.1f}"
+        lines.append(line)
+        for child in sorted(node.children.values(), key=lambda n: -n.seconds):
+            walk(child, depth + 1)
+
+    for child in root.children.values():
+        walk(child, 0)
+    return "\n".join(lines)
+
+
+def collapsed_stacks(root: Node | None = None) -> list[str]:
+    """
+    One "outer;inner;innermost microseconds" line per phase, using the time not
+    spent in sub-phases, the input format of flamegraph.pl and speedscope
+    """
+    root = root or RECORDER.root
+    lines = []
+
+    def walk(node: Node, prefix: str) -> None:
+        stack = f"{prefix};{node.name}" if prefix else node.name
+        if (own := round(node.own_seconds * 1e6)) > 0:
+            lines.append(f"{stack} {own}")
+        for child in node.children.values():
+            walk(child, stack)
+
+    for child in root.children.values():
+        walk(child, "")
+    return lines
@@ -0,0 +1,187 @@
+"""
+Bounded memoisation for recursive solvers.
+
+A Memo is an LRU mapping with a budget on the number of entries, on their
+size in bytes, or both. Past the budget the least recently used entries are
+dropped, so a long run or a batch of inputs keeps a bounded working set
+instead of every result it ever computed. Sizes come from a `weigh` function,
+`sys.getsizeof` by default, which is shallow: pass something better for values
+that own large objects.
+
+Every memo keeps counters (hits, misses, evictions, entries, bytes) and is
+registered by name, `report()` returns them all.
+
+    @memoize(max_entries=10_000)
+    def f(n): ...
+
+    f.memo.clear()          # forget everything
+    with f.memo.scope():    # forget what was added for this input only
+        ...
+
+Environment:
+    AOC_MEMO_SCALE=x        multiply every budget by x (default: 1)
+"""
+
+from __future__ import annotations
+import os
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from functools import wraps
+from typing import Any, Callable, Hashable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+_registry: dict[str, Memo] = {}
+
+
+def scale() -> float:
+    return float(os.environ.get("AOC_MEMO_SCALE", 1))
+
+
+@dataclass
+class MemoStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self) | {"hit_rate": self.hit_rate}
+
+
+class Memo:
+    def __init__(
+        self,
+        name: str,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        weigh: Callable[[Any], int] = sys.getsizeof,
+    ):
+        self.name = name
+        self.max_entries = None if max_entries is None else int(max_entries * scale())
+        self.max_bytes = None if max_bytes is None else int(max_bytes * scale())
+        self.weigh = weigh
+        # key -> (value, bytes), least recently used first
+        self.entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        # Plain attributes, they are bumped on every lookup
+        self.hits = self.misses = self.evictions = self.bytes = 0
+        _registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    @property
+    def stats(self) -> MemoStats:
+        return MemoStats(self.hits, self.misses, self.evictions, len(self.entries), self.bytes)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if (entry := self.entries.get(key)) is None:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self.weigh(value)
+        if (previous := self.entries.pop(key, None)) is not None:
+            self.bytes -= previous[1]
+        self.entries[key] = (value, size)
+        self.bytes += size
+        if (self.max_entries is not None and len(self.entries) > self.max_entries) or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            self._evict()
+
+    def _evict(self) -> None:
+        # The entry just added stays, even when it is over the budget on its own
+        while len(self.entries) > 1 and (
+            (self.max_entries is not None and len(self.entries) > self.max_entries)
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop the entries, the counters keep going"""
+        self.entries.clear()
+        self.bytes = 0
+
+    @contextmanager
+    def scope(self) -> Iterator[Memo]:
+        """Entries added inside the block are dropped when it ends"""
+        before = set(self.entries)
+        try:
+            yield self
+        finally:
+            for key in [key for key in self.entries if key not in before]:
+                _, size = self.entries.pop(key)
+                self.bytes -= size
+
+
+def memoize(
+    max_entries: int | None = None,
+    max_bytes: int | None = None,
+    weigh: Callable[[Any], int] = sys.getsizeof,
+    name: str | None = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Memoise a function of hashable positional arguments in a bounded Memo,
+    available as the `memo` attribute of the wrapper.
+    """
+
+    def decorator(function: Callable[..., T]) -> Callable[..., T]:
+        memo = Memo(
+            name or f"{function.__module__}.{function.__qualname__}",
+            max_entries,
+            max_bytes,
+            weigh,
+        )
+
+        @wraps(function)
+        def wrapper(*args: Hashable) -> T:
+            if (value := memo.get(args, _MISSING)) is not _MISSING:
+                return value
+            value = function(*args)
+            memo.put(args, value)
+            return value
+
+        wrapper.memo = memo
+        return wrapper
+
+    return decorator
+
+
+def memos() -> dict[str, Memo]:
+    return dict(_registry)
+
+
+def report() -> dict[str, dict[str, Any]]:
+    return {name: memo.stats.to_dict() for name, memo in _registry.items()}
+
+
+def format_report(stats: dict[str, dict[str, Any]]) -> str:
+    lines = [
+        f"{'memo':<32} {'hits':>10} {'misses':>10} {'hit rate':>8} "
+        f"{'evictions':>10} {'entries':>8} {'MB':>8}"
+    ]
+    for name, row in stats.items():
+        lines.append(
+            f"{name:<32} {row['hits']:>10} {row['misses']:>10} {row['hit_rate']:>8.1%} "
+            f"{row['evictions']:>10} {row['entries']:>8} {row['bytes'] / 1e6:>8.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""
+Memory accounting per phase, and a memory ceiling per part.
+
+With AOC_PROFILE=memory, every phase recorded by aoc.instrument also records
+the peak of the memory traced by tracemalloc while it ran (above what was
+already allocated when it started) and how much it raised the peak RSS of the
+process. Entering a phase resets tracemalloc's peak after handing it to the
+phase around it, so nested phases each see their own peak.
+
+Whenever the traced memory at the end of a phase is a new high, by
+SNAPSHOT_GROWTH at least, the top allocation sites are taken from a
+snapshot. Those of the fullest moment are listed at the end of the run:
+what was holding the memory, rather than what allocated and freed it.
+
+The ceiling is a soft RLIMIT_AS on the process, past which allocations fail
+with a MemoryError instead of sending the machine into swap. It counts address
+space, interpreter and NumPy included, so leave a few hundred MB for those.
+`all` sets it in every worker, so it applies per part.
+
+The sort budget is for solvers that can work out of core (see aoc.external):
+inputs that would not fit in it once parsed are sorted on disk instead.
+
+Environment:
+    AOC_MEMORY_LIMIT=size   ceiling per part, in bytes or with a K, M or G suffix
+    AOC_SORT_BUDGET=size    memory for sorting inputs (default: a quarter of the RAM)
+"""
+
+from __future__ import annotations
+import os
+import re
+import resource
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from aoc.history import peak_rss
+
+# Only snapshot when the traced memory grew that much since the last one, snapshots are slow
+SNAPSHOT_GROWTH = 1.1
+TOP_SITES = 10
+# Text inputs take about this many times their size once parsed and sorted in memory
+IN_MEMORY_FACTOR = 4
+UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+SIZE = re.compile(r"(\d+(?:\.\d*)?)\s*([KMGT]?)I?B?", re.IGNORECASE)
+# The tracer's own allocations are not the solver's
+IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def parse_size(text: str) -> int:
+    """Bytes in "1073741824", "512M", "1.5G" or "2GiB" """
+    if (match := SIZE.fullmatch(text.strip())) is None:
+        raise ValueError(f"Not a memory size: {text!r}")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def budget(size: str | int | None = None) -> int | None:
+    """The ceiling asked for, or the one from the environment, None for no ceiling"""
+    if size is None:
+        size = os.environ.get("AOC_MEMORY_LIMIT") or None
+    if isinstance(size, str):
+        size = parse_size(size)
+    return size
+
+
+def sort_budget() -> int:
+    if value := os.environ.get("AOC_SORT_BUDGET"):
+        return parse_size(value)
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 4
+    except (AttributeError, ValueError, OSError):
+        return 1 << 30
+
+
+def fits(path: Path, size: int | None = None) -> bool:
+    """Whether the input can be parsed and sorted within the sort budget"""
+    return Path(path).stat().st_size * IN_MEMORY_FACTOR <= (size or sort_budget())
+
+
+def set_limit(size: int | None) -> None:
+    """Cap the address space of this process, the hard limit stays as it was"""
+    if size is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        size = min(size, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (size, hard))
+
+
+@dataclass
+class Site:
+    location: str
+    bytes: int
+    blocks: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class Tracer:
+    def __init__(self, top: int = TOP_SITES):
+        self.top = top
+        # Per open phase: traced memory and peak RSS when it started, highest peak seen in it
+        self.starts: list[tuple[int, int]] = []
+        self.peaks: list[int] = []
+        self.fullest = 0
+        self.sites: list[Site] = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def enter(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if self.peaks:
+            self.peaks[-1] = max(self.peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self.starts.append((current, peak_rss()))
+        self.peaks.append(current)
+
+    def exit(self) -> tuple[int, int]:
+        """Peak traced memory above the start of the phase, growth of the peak RSS"""
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(self.peaks.pop(), peak)
+        start, rss = self.starts.pop()
+        if self.peaks:
+            self.peaks[-1] = max(self.peaks[-1], peak)
+        if current > self.fullest * SNAPSHOT_GROWTH:
+            self.fullest = current
+            self.sites = self._top_sites()
+            # The snapshot itself is traced, it should not count in anyone's peak
+            tracemalloc.reset_peak()
+        return peak - start, peak_rss() - rss
+
+    def _top_sites(self) -> list[Site]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(IGNORED)
+        return [
+            Site(str(stat.traceback[0]), stat.size, stat.count)
+            for stat in snapshot.statistics("lineno")[: self.top]
+        ]
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+
+def format_sites(sites: list[Site], fullest: int) -> str:
+    lines = [f"Top allocation sites, with {fullest / 1e6:.1f} MB traced:"]
+    for site in sites:
+        lines.append(f"{site.bytes / 1e6:>10.2f} MB {site.blocks:>10} blocks  {site.location}")
+    return "\n".join(lines)
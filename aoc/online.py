@@ -0,0 +1,271 @@
+"""
+Order statistics and running sums over integer keys, updated one key at a time.
+
+CountTree is a multiset of keys 0 <= key < 2**KEY_BITS with ranks and sums. It
+is a Fenwick tree kept in a dict, so it only allocates what updates touch. Insert,
+delete, rank, prefix sums and k-th smallest each walk KEY_BITS levels at most.
+
+StepSum holds an integer step function D over the keys, zero at first. It
+changes by suffix additions (D(t) += delta for every t >= key), and answers
+sums of |D(t)| over t. A suffix addition can flip the sign of D anywhere
+after its key, so no tree with lazy additions keeps that sum in O(log n):
+a node must know how much of it sits at each value. StepSum therefore cuts the
+keys where D steps into blocks of about sqrt(n). Each block keeps its values
+sorted with running weights, so a block shifted as a whole gets its new sum
+from one bisection. An update rebuilds the block of its key and shifts every
+block after it: O(sqrt(n) log n) for n keys where D steps. A key whose step
+drops back to zero is removed, so memory follows the keys present now.
+"""
+
+from __future__ import annotations
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from math import isqrt
+from typing import Mapping
+
+KEY_BITS = 48
+SPAN = 1 << KEY_BITS
+# Smallest block of StepSum, below that the blocks cost more than they save
+MIN_BLOCK = 64
+
+
+def _check(key: int) -> None:
+    if not 0 <= key < SPAN:
+        raise ValueError(f"Keys must be in [0, 2**{KEY_BITS}), got {key}")
+
+
+class CountTree:
+    def __init__(self):
+        # Fenwick node -> (count, sum of keys) below it
+        self.counts: dict[int, int] = {}
+        self.sums: dict[int, int] = {}
+        self.total = 0
+        self.key_sum = 0
+
+    @classmethod
+    def from_counts(cls, counts: Mapping[int, int]) -> CountTree:
+        """A tree holding every key `count` times, built in one pass"""
+        tree = cls()
+        for key, count in counts.items():
+            _check(key)
+            tree.counts[key + 1] = count
+            tree.sums[key + 1] = key * count
+            tree.total += count
+            tree.key_sum += key * count
+        # Every node adds itself to its parent once complete, smallest first
+        pending = list(tree.counts)
+        heapq.heapify(pending)
+        while pending:
+            i = heapq.heappop(pending)
+            if (parent := i + (i & -i)) > SPAN:
+                continue
+            if parent not in tree.counts:
+                tree.counts[parent] = tree.sums[parent] = 0
+                heapq.heappush(pending, parent)
+            tree.counts[parent] += tree.counts[i]
+            tree.sums[parent] += tree.sums[i]
+        return tree
+
+    def __len__(self) -> int:
+        return self.total
+
+    def add(self, key: int, count: int = 1) -> None:
+        _check(key)
+        self.total += count
+        self.key_sum += key * count
+        counts, sums = self.counts, self.sums
+        i = key + 1
+        while i <= SPAN:
+            counts[i] = counts.get(i, 0) + count
+            sums[i] = sums.get(i, 0) + key * count
+            i += i & -i
+
+    def below(self, key: int) -> tuple[int, int]:
+        """How many keys are smaller than `key`, and their sum"""
+        counts, sums = self.counts, self.sums
+        count = total = 0
+        i = min(max(key, 0), SPAN)
+        while i > 0:
+            count += counts.get(i, 0)
+            total += sums.get(i, 0)
+            i -= i & -i
+        return count, total
+
+    def rank(self, key: int) -> int:
+        """How many keys are smaller than `key`"""
+        return self.below(key)[0]
+
+    def kth(self, k: int) -> int:
+        """The k-th smallest key, from 0"""
+        if not 0 <= k < self.total:
+            raise IndexError(f"No key of rank {k} among {self.total}")
+        counts = self.counts
+        position, remaining = 0, k + 1
+        step = SPAN
+        while step:
+            if (below := counts.get(position + step, 0)) < remaining:
+                position += step
+                remaining -= below
+            step >>= 1
+        return position
+
+    def max(self) -> int:
+        return self.kth(self.total - 1)
+
+
+class _Block:
+    __slots__ = ("keys", "values", "weights", "lazy", "ordered", "cum_weights", "cum_moments")
+
+    def __init__(self, keys: list[int], values: list[int], lazy: int = 0):
+        # D is values[i] + lazy from keys[i] up to the next key
+        self.keys = keys
+        self.values = values
+        self.lazy = lazy
+
+    def refresh(self, next_key: int | None) -> None:
+        """Rebuild the sorted values, the segment after the last key ends at next_key"""
+        keys = self.keys
+        self.weights = [b - a for a, b in zip(keys, keys[1:])]
+        self.weights.append(0 if next_key is None else next_key - keys[-1])
+        order = sorted(range(len(keys)), key=self.values.__getitem__)
+        self.ordered = [self.values[i] for i in order]
+        self.cum_weights = [0, *accumulate(self.weights[i] for i in order)]
+        self.cum_moments = [0, *accumulate(self.weights[i] * self.values[i] for i in order)]
+
+    @property
+    def total(self) -> int:
+        """Sum of |D| over the block"""
+        lazy = self.lazy
+        # Values below -lazy are negative once shifted
+        i = bisect_left(self.ordered, -lazy)
+        weights, moments = self.cum_weights, self.cum_moments
+        negative = moments[i] + lazy * weights[i]
+        return moments[-1] + lazy * weights[-1] - 2 * negative
+
+
+class StepSum:
+    def __init__(self):
+        self.blocks: list[_Block] = []
+        # First key of every block, to find blocks by bisection
+        self.firsts: list[int] = []
+        # key -> how much D rises there, never zero
+        self.steps: dict[int, int] = {}
+
+    @classmethod
+    def from_steps(cls, steps: Mapping[int, int]) -> StepSum:
+        """D rising by steps[key] at every key, built in one pass"""
+        summed = cls()
+        summed.steps = {key: step for key, step in sorted(steps.items()) if step}
+        keys = list(summed.steps)
+        values = list(accumulate(summed.steps.values()))
+        size = summed.block_size
+        for start in range(0, len(keys), size):
+            summed.blocks.append(_Block(keys[start : start + size], values[start : start + size]))
+            summed.firsts.append(keys[start])
+        for b in range(len(summed.blocks)):
+            summed._refresh(b)
+        return summed
+
+    @property
+    def block_size(self) -> int:
+        return max(MIN_BLOCK, isqrt(len(self.steps)))
+
+    @property
+    def sum(self) -> int:
+        """Sum of |D(t)| from the first key where D steps to the last one"""
+        return sum(block.total for block in self.blocks)
+
+    def value(self, key: int) -> int:
+        """D(key)"""
+        if (b := bisect_right(self.firsts, key) - 1) < 0:
+            return 0
+        block = self.blocks[b]
+        return block.values[bisect_right(block.keys, key) - 1] + block.lazy
+
+    def add_suffix(self, key: int, delta: int) -> None:
+        """D(t) += delta for every t >= key"""
+        if not delta:
+            return
+        step = self.steps.get(key, 0) + delta
+        if key not in self.steps:
+            self._insert(key)
+        b = bisect_right(self.firsts, key) - 1
+        block = self.blocks[b]
+        i = bisect_left(block.keys, key)
+        block.values[i:] = [value + delta for value in block.values[i:]]
+        self._refresh(b)
+        for block in self.blocks[b + 1 :]:
+            block.lazy += delta
+        if step:
+            self.steps[key] = step
+        else:
+            # D no longer steps there, its segment joins the one before
+            del self.steps[key]
+            self._remove(key)
+
+    def prefix(self, end: int) -> int:
+        """Sum of |D(t)| for t < end"""
+        if (b := bisect_left(self.firsts, end) - 1) < 0:
+            return 0
+        total = sum(block.total for block in self.blocks[:b])
+        block = self.blocks[b]
+        keys = block.keys
+        for i in range(bisect_left(keys, end)):
+            # Only the last segment can reach past end, or past the last key
+            stop = min(end, keys[i] + block.weights[i]) if block.weights[i] else end
+            total += abs(block.values[i] + block.lazy) * (stop - keys[i])
+        return total
+
+    def _next_key(self, b: int) -> int | None:
+        return self.firsts[b + 1] if b + 1 < len(self.firsts) else None
+
+    def _refresh(self, b: int) -> None:
+        self.blocks[b].refresh(self._next_key(b))
+
+    def _insert(self, key: int) -> None:
+        """Make key a step of D, of height zero for now"""
+        value = self.value(key)
+        if not self.blocks:
+            self.blocks.append(_Block([key], [value]))
+            self.firsts.append(key)
+            self._refresh(0)
+            return
+        # Keys before the first block go at the start of it
+        b = max(bisect_right(self.firsts, key) - 1, 0)
+        block = self.blocks[b]
+        i = bisect_left(block.keys, key)
+        block.keys.insert(i, key)
+        block.values.insert(i, value - block.lazy)
+        self.firsts[b] = block.keys[0]
+        if len(block.keys) > 2 * self.block_size:
+            half = len(block.keys) // 2
+            self.blocks.insert(
+                b + 1, _Block(block.keys[half:], block.values[half:], block.lazy)
+            )
+            del block.keys[half:], block.values[half:]
+            self.firsts.insert(b + 1, self.blocks[b + 1].keys[0])
+            self._refresh(b + 1)
+        self._refresh(b)
+
+    def _remove(self, key: int) -> None:
+        b = bisect_right(self.firsts, key) - 1
+        block = self.blocks[b]
+        i = bisect_left(block.keys, key)
+        del block.keys[i], block.values[i]
+        if b + 1 < len(self.blocks) and len(block.keys) + len(self.blocks[b + 1].keys) <= (
+            self.block_size
+        ):
+            # Fold the next block in, so that blocks do not shrink away as keys go
+            following = self.blocks.pop(b + 1)
+            del self.firsts[b + 1]
+            shift = following.lazy - block.lazy
+            block.keys += following.keys
+            block.values += [value + shift for value in following.values]
+        if not block.keys:
+            del self.blocks[b], self.firsts[b]
+        else:
+            self.firsts[b] = block.keys[0]
+            self._refresh(b)
+        if b > 0:
+            self._refresh(b - 1)
@@ -0,0 +1,16 @@
+"""
+How many processes the solvers that can fan out use.
+
+Apart from aoc.shared, which imports NumPy: solvers ask for the count first,
+and those run in a single process stream their input without NumPy.
+
+Environment:
+    AOC_WORKERS=n   solvers that can fan out use n processes (default: 1, no pool)
+"""
+
+from __future__ import annotations
+import os
+
+
+def workers() -> int:
+    return max(1, int(os.environ.get("AOC_WORKERS", 1)))
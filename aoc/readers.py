@@ -0,0 +1,82 @@
+"""
+Streaming readers for line-oriented inputs.
+
+The file is memory-mapped and cut into chunks of about CHUNK_SIZE bytes that end
+on a line break, and records are parsed chunk by chunk as a generator pipeline.
+Only one chunk is ever held as bytes, so a solver that consumes the records as
+they come runs in flat memory however large the input is.
+
+Records are parsed from bytes, `int(b"42")` works and skips decoding.
+"""
+
+from __future__ import annotations
+import mmap
+from pathlib import Path
+from typing import Iterator
+
+CHUNK_SIZE = 1 << 24
+# Digits and minus signs stay, everything else becomes a space
+SPACED = bytes(c if c in b"0123456789-" else ord(" ") for c in range(256))
+
+
+def chunks(path: Path, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Consecutive pieces of the file, each one made of whole lines"""
+    with Path(path).open("rb") as fin:
+        try:
+            mapped = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return
+    with mapped:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        start = 0
+        end_of_file = len(mapped)
+        while start < end_of_file:
+            end = min(start + size, end_of_file)
+            if end < end_of_file:
+                # Cut after the last line break, or after the next one for long lines
+                if (newline := mapped.rfind(b"\n", start, end)) == -1:
+                    newline = mapped.find(b"\n", end)
+                end = end_of_file if newline == -1 else newline + 1
+            yield mapped[start:end]
+            start = end
+
+
+def lines(path: Path, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Non-empty lines, without their line break"""
+    for chunk in chunks(path, size):
+        yield from filter(None, chunk.splitlines())
+
+
+def ints(path: Path, size: int = CHUNK_SIZE) -> Iterator[int]:
+    """Every whitespace-separated integer, in order"""
+    for chunk in chunks(path, size):
+        yield from map(int, chunk.split())
+
+
+def numbers(path: Path, size: int = CHUNK_SIZE) -> Iterator[int]:
+    """
+    Every integer, whatever is around it ("Button A: X+94, Y+34"), negative
+    with a minus sign right before it
+    """
+    for chunk in chunks(path, size):
+        for word in chunk.translate(SPACED).split():
+            # A dash on its own is prose, not a number
+            if word.strip(b"-"):
+                yield int(word)
+
+
+def int_rows(path: Path, size: int = CHUNK_SIZE) -> Iterator[tuple[int, ...]]:
+    """The integers of every line, as a tuple"""
+    for line in lines(path, size):
+        yield tuple(map(int, line.split()))
+
+
+def keyed_rows(
+    path: Path, separator: bytes = b":", size: int = CHUNK_SIZE
+) -> Iterator[tuple[int, list[int]]]:
+    """Lines like `key: v1 v2 v3`"""
+    for line in lines(path, size):
+        key, values = line.split(separator, 1)
+        yield int(key), list(map(int, values.split()))
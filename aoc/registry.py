@@ -0,0 +1,77 @@
+"""
+Lazy registry of the day modules.
+
+Nothing is imported until a solver is requested, so asking for day 16 part two
+does not pay for the other 24 days (or for part one of day 16).
+"""
+
+from __future__ import annotations
+import importlib
+import re
+import sys
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+
+Solver = Callable[[Path], Any]
+
+DAY_FOLDER = re.compile(r"day(\d+)")
+
+
+@dataclass(frozen=True)
+class Day:
+    number: int
+    source: Path
+
+    @property
+    def module_name(self) -> str:
+        return f"{self.source.parent.name}.{self.source.stem}"
+
+    @property
+    def default_input(self) -> Path:
+        return self.source.parent / "input.txt"
+
+    def load(self) -> ModuleType:
+        # The day folders are namespace packages, the repo root must be importable
+        if str(ROOT) not in sys.path:
+            sys.path.insert(0, str(ROOT))
+        return importlib.import_module(self.module_name)
+
+    def solver(self, part: int) -> Solver:
+        if part not in (1, 2):
+            raise ValueError(f"Part must be 1 or 2, got {part}")
+        name = "part_one" if part == 1 else "part_two"
+        solver = getattr(self.load(), name, None)
+        if solver is None:
+            raise LookupError(f"Day {self.number} has no {name}")
+        return solver
+
+
+@cache
+def discover() -> dict[int, Day]:
+    days = {}
+    for folder in ROOT.iterdir():
+        if not folder.is_dir() or (match := DAY_FOLDER.fullmatch(folder.name)) is None:
+            continue
+        number = int(match.group(1))
+        # day21 is the odd one out with d21.py
+        for name in (f"day{number}.py", f"d{number}.py"):
+            if (source := folder / name).exists():
+                days[number] = Day(number, source)
+                break
+    return dict(sorted(days.items()))
+
+
+def get_day(number: int) -> Day:
+    try:
+        return discover()[number]
+    except KeyError:
+        raise LookupError(f"No module found for day {number}") from None
+
+
+def get_solver(day: int, part: int) -> Solver:
+    return get_day(day).solver(part)
@@ -0,0 +1,203 @@
+"""
+Rendering of maps as text or images, and frame dumps for simulations.
+
+A Canvas is one uint8 array holding a character per cell. Layers are painted
+with masks or coordinate arrays in a single NumPy assignment each (walls, then
+paths, then robots), never cell by cell. The same array is then written out:
+as text, with one added column of line breaks and a single decode; or as a
+greyscale image, through a lookup table from characters to grey levels.
+Images are binary PGM or PNG, both written with the standard library only.
+
+A FrameSink writes one image per call, numbered, for simulations that want to
+be looked at (or turned into a video) afterwards.
+
+Environment:
+    AOC_FRAMES=directory        simulations that support it dump frames there
+    AOC_FRAMES_FORMAT=pgm|png|txt   (default: pgm)
+    AOC_FRAMES_EVERY=n          keep one frame out of n (default: 1)
+"""
+
+from __future__ import annotations
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from aoc.grid import Grid
+
+NEWLINE = ord("\n")
+FORMATS = ("pgm", "png", "txt")
+# Frames are many and mostly empty space, the fastest level compresses them nearly as well
+PNG_LEVEL = 1
+
+# Grey level of the characters the maps use, anything else is mid-grey
+GREYS = {".": 255, " ": 255, "\0": 255, "#": 0, "O": 96, "[": 96, "]": 96, "@": 48, "*": 16}
+GREYS |= {str(digit): 255 - 24 * digit for digit in range(1, 10)}
+
+
+def _greys(palette: dict[str, int]) -> np.ndarray:
+    table = np.full(256, 128, dtype=np.uint8)
+    for char, grey in palette.items():
+        table[ord(char)] = grey
+    return table
+
+
+GREY_TABLE = _greys(GREYS)
+
+
+def _byte(char: str | int) -> int:
+    return ord(char) if isinstance(char, str) else char
+
+
+class Canvas:
+    def __init__(self, pixels: np.ndarray):
+        self.pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+
+    @classmethod
+    def blank(cls, height: int, width: int, fill: str = ".") -> Canvas:
+        return cls(np.full((height, width), ord(fill), dtype=np.uint8))
+
+    @classmethod
+    def from_grid(cls, grid: Grid, chars: str | None = None) -> Canvas:
+        """
+        The cells of a character grid, or of a grid of small integers
+        drawn as chars[value]
+        """
+        if chars is None:
+            return cls(grid.inner.copy())
+        table = np.frombuffer(chars.encode(), dtype=np.uint8)
+        return cls(table[grid.inner.astype(np.intp)])
+
+    @classmethod
+    def from_counts(cls, counts: np.ndarray) -> Canvas:
+        """Counts as digits, "." for zero and "*" past nine"""
+        digits = np.minimum(counts, 10).astype(np.uint8)
+        return cls(np.frombuffer(b".123456789*", dtype=np.uint8)[digits])
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    def paint(self, mask: np.ndarray, char: str | int) -> Canvas:
+        """Every cell where `mask` is true"""
+        self.pixels[mask] = _byte(char)
+        return self
+
+    def put(self, ys: np.ndarray, xs: np.ndarray, char: str | int) -> Canvas:
+        """The cells at (ys[i], xs[i])"""
+        self.pixels[np.asarray(ys, dtype=np.intp), np.asarray(xs, dtype=np.intp)] = _byte(char)
+        return self
+
+    def put_cells(self, grid: Grid, cells: np.ndarray, char: str | int) -> Canvas:
+        """The cells at the flat indices of `grid`, which has the shape of the canvas"""
+        return self.put(*grid.yxs(np.fromiter(cells, dtype=np.intp)), char)
+
+    def text(self) -> str:
+        lines = np.empty((self.height, self.width + 1), dtype=np.uint8)
+        lines[:, :-1] = self.pixels
+        lines[:, -1] = NEWLINE
+        return lines.tobytes()[:-1].decode("latin-1")
+
+    def __str__(self) -> str:
+        return self.text()
+
+    def grey(self, palette: dict[str, int] | None = None, scale: int = 1) -> np.ndarray:
+        table = GREY_TABLE if palette is None else _greys(GREYS | palette)
+        image = table[self.pixels]
+        if scale > 1:
+            image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+        return image
+
+    def pgm(self, palette: dict[str, int] | None = None, scale: int = 1) -> bytes:
+        image = self.grey(palette, scale)
+        height, width = image.shape
+        return b"P5\n%d %d\n255\n" % (width, height) + image.tobytes()
+
+    def png(self, palette: dict[str, int] | None = None, scale: int = 1) -> bytes:
+        image = self.grey(palette, scale)
+        height, width = image.shape
+        # Every row starts with its filter type, 0 for none
+        rows = np.zeros((height, width + 1), dtype=np.uint8)
+        rows[:, 1:] = image
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            body = kind + data
+            return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+        # 8 bits per pixel, greyscale
+        header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+        return b"".join(
+            (
+                b"\x89PNG\r\n\x1a\n",
+                chunk(b"IHDR", header),
+                chunk(b"IDAT", zlib.compress(rows.tobytes(), PNG_LEVEL)),
+                chunk(b"IEND", b""),
+            )
+        )
+
+    def save(self, path: Path, palette: dict[str, int] | None = None, scale: int = 1) -> None:
+        """Format from the suffix: .pgm, .png or anything else for text"""
+        path = Path(path)
+        if path.suffix == ".pgm":
+            path.write_bytes(self.pgm(palette, scale))
+        elif path.suffix == ".png":
+            path.write_bytes(self.png(palette, scale))
+        else:
+            path.write_text(self.text() + "\n")
+
+
+class FrameSink:
+    def __init__(
+        self,
+        directory: Path,
+        format: str = "pgm",
+        every: int = 1,
+        scale: int = 1,
+        palette: dict[str, int] | None = None,
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown frame format {format!r}, expected one of {FORMATS}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.format = format
+        self.every = every
+        self.scale = scale
+        self.palette = palette
+        self.offered = 0
+        self.written = 0
+
+    def write(
+        self, frame: Canvas | Callable[[], Canvas], step: int | None = None
+    ) -> Path | None:
+        """
+        Write the frame, if it is one of those kept. Pass a function drawing
+        it to skip the drawing of the others.
+        """
+        keep = self.offered % self.every == 0
+        self.offered += 1
+        if not keep:
+            return None
+        canvas = frame() if callable(frame) else frame
+        number = self.written if step is None else step
+        path = self.directory / f"frame_{number:08d}.{self.format}"
+        canvas.save(path, self.palette, self.scale)
+        self.written += 1
+        return path
+
+
+def frame_sink(name: str) -> FrameSink | None:
+    """The sink configured by the environment for `name`, None when it is off"""
+    if not (root := os.environ.get("AOC_FRAMES")):
+        return None
+    return FrameSink(
+        Path(root) / name,
+        os.environ.get("AOC_FRAMES_FORMAT", "pgm"),
+        int(os.environ.get("AOC_FRAMES_EVERY", 1)),
+    )
@@ -0,0 +1,216 @@
+"""
+Run many parts at once.
+
+Every day/part is a job run in its own worker process, at most one worker per
+CPU at a time. A job that runs past its timeout is killed, so a part that never
+ends (day 14 part two looks for a picture for up to 10**9 steps) does not hold
+up the rest.
+
+With a memory limit every worker caps its own address space (see aoc.memory),
+a part that outgrows it stops with the MEMORY status instead of swapping.
+
+Jobs start longest-first, using the durations recorded by previous runs, so the
+batch takes about as long as its slowest part. Jobs never seen before go first.
+"""
+
+from __future__ import annotations
+import json
+import multiprocessing
+import os
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import asdict, dataclass
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any, Iterable
+
+from aoc import history, memory
+from aoc.registry import ROOT, discover, get_solver
+
+DEFAULT_INPUTS = "day{day}/input.txt"
+DEFAULT_DURATIONS = ROOT / ".cache" / "durations.json"
+DEFAULT_TIMEOUT = 60.0
+
+OK, ERROR, TIMEOUT, MISSING, MEMORY = "ok", "error", "timeout", "missing", "memory"
+
+
+@dataclass(frozen=True)
+class Job:
+    day: int
+    part: int
+    path: Path
+    # Benchmarks solve the same input several times in the same worker
+    repeats: int = 1
+    warmup: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.day}.{self.part}"
+
+
+@dataclass
+class JobResult:
+    day: int
+    part: int
+    status: str
+    seconds: float
+    result: str | None = None
+    error: str | None = None
+    # Of the worker process, unknown for jobs that did not report back
+    cpu: float | None = None
+    peak_rss: int | None = None
+    # Of every repeat after the warmup
+    times: list[float] | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.day}.{self.part}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def default_workers() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def make_jobs(
+    days: Iterable[int] | None = None,
+    parts: Iterable[int] = (1, 2),
+    inputs: str = DEFAULT_INPUTS,
+) -> list[Job]:
+    days = sorted(discover()) if days is None else days
+    return [
+        Job(day, part, ROOT / inputs.format(day=day)) for day in days for part in parts
+    ]
+
+
+def schedule(jobs: list[Job], durations: dict[str, float]) -> list[Job]:
+    """Longest first, unknown durations count as the longest"""
+    return sorted(jobs, key=lambda job: -durations.get(job.key, float("inf")))
+
+
+def _work(job: Job, conn: Connection, memory_limit: int | None = None) -> None:
+    # The solvers are chatty (prints and progress bars)
+    with open(os.devnull, "w") as sink, redirect_stdout(sink), redirect_stderr(sink):
+        try:
+            solver = get_solver(job.day, job.part)
+        except LookupError as e:
+            conn.send((MISSING, 0.0, None, str(e), None, None, None))
+            conn.close()
+            return
+        # After the import, the limit is for what the part itself allocates
+        memory.set_limit(memory_limit)
+        start, start_cpu = time.perf_counter(), time.process_time()
+        times = []
+        try:
+            for i in range(job.warmup + job.repeats):
+                run_start = time.perf_counter()
+                result = solver(job.path)
+                if i >= job.warmup:
+                    times.append(time.perf_counter() - run_start)
+        except MemoryError:
+            error = f"Over the memory limit of {memory_limit} bytes"
+            status, result = MEMORY, None
+        except Exception as e:
+            status, result, error = ERROR, None, f"{type(e).__name__}: {e}"
+        else:
+            status, result, error = OK, str(result), None
+        seconds, cpu = time.perf_counter() - start, time.process_time() - start_cpu
+        conn.send((status, seconds, result, error, cpu, history.peak_rss(), times))
+    conn.close()
+
+
+def run_jobs(
+    jobs: list[Job],
+    workers: int | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    durations: dict[str, float] | None = None,
+    memory_limit: int | None = None,
+) -> list[JobResult]:
+    """Results come back in the order of `jobs`, memory_limit is in bytes per worker"""
+    workers = workers or default_workers()
+    results = {}
+    pending = []
+    for job in schedule(jobs, durations or {}):
+        if job.path.exists():
+            pending.append(job)
+        else:
+            error = f"No input {job.path}"
+            results[job] = JobResult(job.day, job.part, MISSING, 0.0, error=error)
+    pending.reverse()
+    context = multiprocessing.get_context()
+    # Receiving end of the pipe -> (job, process, deadline, start)
+    running: dict[Connection, tuple[Job, Any, float, float]] = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            job = pending.pop()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_work, args=(job, sender, memory_limit), daemon=True
+            )
+            start = time.perf_counter()
+            process.start()
+            sender.close()
+            running[receiver] = (job, process, start + timeout, start)
+        next_deadline = min(deadline for _, _, deadline, _ in running.values())
+        ready = wait(list(running), timeout=max(0.0, next_deadline - time.perf_counter()))
+        for receiver in ready:
+            job, process, _, start = running.pop(receiver)
+            try:
+                status, seconds, result, error, cpu, rss, times = receiver.recv()
+            except EOFError:
+                # The worker died without a word (segfault, os._exit, out of memory)
+                status, seconds, result = ERROR, time.perf_counter() - start, None
+                error, cpu, rss, times = "Worker exited unexpectedly", None, None, None
+            receiver.close()
+            process.join()
+            results[job] = JobResult(
+                job.day, job.part, status, seconds, result, error, cpu, rss, times
+            )
+        now = time.perf_counter()
+        for receiver, (job, process, deadline, start) in list(running.items()):
+            if now < deadline:
+                continue
+            del running[receiver]
+            process.kill()
+            process.join()
+            receiver.close()
+            results[job] = JobResult(
+                job.day, job.part, TIMEOUT, now - start, error=f"Killed after {timeout}s"
+            )
+    return [results[job] for job in jobs]
+
+
+def to_report(results: list[JobResult], wall: float, workers: int) -> dict[str, Any]:
+    return {
+        "wall": wall,
+        # What running them one after the other would have taken
+        "sequential": sum(r.seconds for r in results),
+        "workers": workers,
+        "jobs": [r.to_dict() for r in results],
+    }
+
+
+def update_durations(durations: dict[str, float], results: list[JobResult]) -> None:
+    """Remember the latest durations, timeouts included as they are a lower bound"""
+    for result in results:
+        if result.status in (OK, TIMEOUT):
+            durations[result.key] = result.seconds
+
+
+def load_durations(path: Path) -> dict[str, float]:
+    try:
+        with path.open("r") as fin:
+            return json.load(fin)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(durations: dict[str, float], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as fout:
+        json.dump(durations, fout, indent=2, sort_keys=True)
@@ -0,0 +1,207 @@
+"""
+Shortest paths over integer states.
+
+States are ints in range(n_states). Grid puzzles use flat cell indices (see
+aoc.grid), or cell * 4 + direction when the heading matters too.
+Distances and predecessors live in dense lists indexed by state, and paths are
+rebuilt from the predecessors once the search is over, the queues only ever
+hold states.
+
+Heaps are lazy: a shorter distance pushes a new entry and stale entries are
+skipped when popped, there is no decrease-key.
+
+A Search can be reused. A new search only resets the states the previous one
+reached, so many small searches over a big space stay cheap.
+"""
+
+from __future__ import annotations
+from contextlib import ExitStack
+from heapq import heapify, heappop, heappush
+from typing import Callable, ContextManager, Iterable
+
+from aoc import telemetry
+
+UNREACHED = -1
+NO_PARENT = -1
+
+# The states one step away, every step costs 1
+Neighbours = Callable[[int], Iterable[int]]
+# The states one step away, with the cost of the step
+Edges = Callable[[int], Iterable[tuple[int, int]]]
+
+
+class Search:
+    def __init__(self, n_states: int, all_parents: bool = False):
+        self.n_states = n_states
+        self.all_parents = all_parents
+        self.distance = [UNREACHED] * n_states
+        self.parent = [NO_PARENT] * n_states
+        # Every predecessor on some shortest path, by state, only with all_parents
+        self.parents: dict[int, list[int]] = {}
+        # In order of discovery
+        self.reached: list[int] = []
+        # The heap of the running search, for telemetry
+        self.frontier: list[tuple[int, ...]] = []
+
+    def reset(self) -> None:
+        distance = self.distance
+        parent = self.parent
+        for state in self.reached:
+            distance[state] = UNREACHED
+            parent[state] = NO_PARENT
+        self.parents = {}
+        self.reached = []
+        self.frontier = []
+
+    def _start(self, sources: Iterable[int]) -> list[int]:
+        self.reset()
+        sources = list(dict.fromkeys(sources))
+        for source in sources:
+            self.distance[source] = 0
+            if self.all_parents:
+                self.parents[source] = []
+        self.reached.extend(sources)
+        return sources
+
+    def bfs(
+        self, sources: Iterable[int], neighbours: Neighbours, targets: Iterable[int] = ()
+    ) -> list[int]:
+        """
+        Without targets, explore everything reachable. Otherwise stop at the closest
+        targets, which are returned, and do not expand targets.
+        """
+        self._start(sources)
+        distance = self.distance
+        parent = self.parent
+        parents = self.parents if self.all_parents else None
+        # Discovery order is BFS order, the queue is the list of reached states
+        queue = self.reached
+        targets = set(targets)
+        found = []
+        i = 0
+        while i < len(queue):
+            state = queue[i]
+            i += 1
+            d = distance[state]
+            if found and d > distance[found[0]]:
+                break
+            if state in targets:
+                found.append(state)
+                continue
+            nd = d + 1
+            for next_state in neighbours(state):
+                next_d = distance[next_state]
+                if next_d == UNREACHED:
+                    distance[next_state] = nd
+                    parent[next_state] = state
+                    queue.append(next_state)
+                    if parents is not None:
+                        parents[next_state] = [state]
+                elif parents is not None and next_d == nd:
+                    parents[next_state].append(state)
+        return found
+
+    def dijkstra(
+        self, sources: Iterable[int], edges: Edges, targets: Iterable[int] = ()
+    ) -> list[int]:
+        """Like bfs with non-negative costs, zero costs make all_parents unreliable"""
+        sources = self._start(sources)
+        distance = self.distance
+        parent = self.parent
+        parents = self.parents if self.all_parents else None
+        reached = self.reached
+        targets = set(targets)
+        found = []
+        frontier = self.frontier = [(0, source) for source in sources]
+        heapify(frontier)
+        while frontier:
+            d, state = heappop(frontier)
+            if d > distance[state]:
+                continue
+            if found and d > distance[found[0]]:
+                break
+            if state in targets:
+                found.append(state)
+                continue
+            for next_state, cost in edges(state):
+                nd = d + cost
+                next_d = distance[next_state]
+                if next_d == UNREACHED or nd < next_d:
+                    if next_d == UNREACHED:
+                        reached.append(next_state)
+                    distance[next_state] = nd
+                    parent[next_state] = state
+                    heappush(frontier, (nd, next_state))
+                    if parents is not None:
+                        parents[next_state] = [state]
+                elif parents is not None and nd == next_d:
+                    parents[next_state].append(state)
+        return found
+
+    def astar(
+        self,
+        source: int,
+        target: int,
+        edges: Edges,
+        heuristic: Callable[[int], int],
+    ) -> bool:
+        """
+        Whether target can be reached from source. The heuristic must not
+        overestimate the remaining cost.
+        Predecessors are single.
+        """
+        self._start([source])
+        distance = self.distance
+        parent = self.parent
+        reached = self.reached
+        frontier = self.frontier = [(heuristic(source), 0, source)]
+        while frontier:
+            _, d, state = heappop(frontier)
+            if state == target:
+                return True
+            if d > distance[state]:
+                continue
+            for next_state, cost in edges(state):
+                nd = d + cost
+                next_d = distance[next_state]
+                if next_d == UNREACHED or nd < next_d:
+                    if next_d == UNREACHED:
+                        reached.append(next_state)
+                    distance[next_state] = nd
+                    parent[next_state] = state
+                    priority = nd + heuristic(next_state)
+                    heappush(frontier, (priority, nd, next_state))
+        return False
+
+    def watch(self, name: str) -> ContextManager:
+        """Sample the size of the heap and of the explored space, see aoc.telemetry"""
+        stack = ExitStack()
+        stack.enter_context(telemetry.watch(f"{name} queue", lambda: len(self.frontier)))
+        stack.enter_context(telemetry.watch(f"{name} reached", lambda: len(self.reached)))
+        return stack
+
+    def path(self, target: int) -> list[int]:
+        """From a source to target, target must have been reached"""
+        path = [target]
+        parent = self.parent
+        while (previous := parent[path[-1]]) != NO_PARENT:
+            path.append(previous)
+        return path[::-1]
+
+    def dag(self, targets: Iterable[int]) -> set[int]:
+        """Every state on some shortest path to one of targets, needs all_parents"""
+        states = set(targets)
+        stack = list(states)
+        while stack:
+            for previous in self.parents[stack.pop()]:
+                if previous not in states:
+                    states.add(previous)
+                    stack.append(previous)
+        return states
+
+    def count_paths(self) -> dict[int, int]:
+        """Number of shortest paths from the sources to every state reached, needs all_parents"""
+        counts = {}
+        for state in sorted(self.reached, key=self.distance.__getitem__):
+            counts[state] = sum(counts[p] for p in self.parents[state]) or 1
+        return counts
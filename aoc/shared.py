@@ -0,0 +1,174 @@
+"""
+Parsed inputs in shared memory, handed to worker processes by name.
+
+Sending a parsed input to a pool pickles it into every task, and every worker
+unpickles its own copy. `SharedArrays` copies the arrays once into
+multiprocessing.shared_memory blocks instead. What travels to the workers is a
+Handle: block names, shapes and dtypes, a few hundred bytes whatever the size
+of the input. Workers attach to the blocks and get read-only NumPy views on the
+same pages, nothing is copied.
+
+Besides plain arrays, Grids (their padded flat array) and Ragged rows (values
+and offsets, which is also CSR for adjacency lists) are shared, and rebuilt
+around the views on the other side.
+
+Cleanup: the process that shares owns the blocks and unlinks them when the
+SharedArrays context exits, error or not, or when it is garbage collected or
+the interpreter exits. If the owner is killed, multiprocessing's resource
+tracker unlinks what it left. Workers only ever close their mappings.
+
+`fan_out(func, shared, tasks)` runs `func(objects, task)` over a pool whose
+workers attach once, when they start, so tasks stay as small as the handle.
+Its pool has as many processes as aoc.pool.workers() gives.
+"""
+
+from __future__ import annotations
+import multiprocessing
+import weakref
+from dataclasses import dataclass, field
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterable, Mapping, TypeVar
+
+import numpy as np
+
+from aoc.grid import Grid
+from aoc.ingest import Ragged
+from aoc.pool import workers
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Tasks per worker when cutting a range, so that a slow chunk does not hold up the rest
+CHUNKS_PER_WORKER = 4
+
+Shareable = np.ndarray | Grid | Ragged
+
+
+@dataclass(frozen=True)
+class Spec:
+    block: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class Handle:
+    """What a worker needs to find the shared objects"""
+
+    arrays: dict[str, Spec]
+    # name -> ("grid", height, width, pad, outside) or ("ragged",), plain arrays have none
+    kinds: dict[str, tuple] = field(default_factory=dict)
+
+
+def _release(blocks: list[SharedMemory]) -> None:
+    for block in blocks:
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedArrays:
+    def __init__(self, objects: Mapping[str, Shareable]):
+        self.blocks: list[SharedMemory] = []
+        # Set up first, so that a failure halfway still frees the blocks made so far
+        self._finalizer = weakref.finalize(self, _release, self.blocks)
+        arrays, kinds = {}, {}
+        try:
+            for name, obj in objects.items():
+                if isinstance(obj, Grid):
+                    kinds[name] = ("grid", obj.height, obj.width, obj.pad, obj.outside)
+                    arrays[name] = self._put(obj.flat)
+                elif isinstance(obj, Ragged):
+                    kinds[name] = ("ragged",)
+                    arrays[f"{name}.values"] = self._put(obj.values)
+                    arrays[f"{name}.offsets"] = self._put(obj.offsets)
+                else:
+                    arrays[name] = self._put(np.asarray(obj))
+        except BaseException:
+            self.close()
+            raise
+        self.handle = Handle(arrays, kinds)
+
+    def _put(self, array: np.ndarray) -> Spec:
+        # Zero-size blocks are not allowed
+        block = SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.blocks.append(block)
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        return Spec(block.name, array.shape, array.dtype.str)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.size for block in self.blocks)
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def __enter__(self) -> SharedArrays:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _view(block: SharedMemory, spec: Spec) -> np.ndarray:
+    array = np.ndarray(spec.shape, np.dtype(spec.dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+
+def attach(handle: Handle) -> tuple[dict[str, Any], list[SharedMemory]]:
+    """
+    The shared objects, as read-only views, and the blocks behind them. Close
+    the blocks once the views are gone, or let the process exit.
+    """
+    blocks, views = [], {}
+    for name, spec in handle.arrays.items():
+        blocks.append(block := SharedMemory(name=spec.block))
+        views[name] = _view(block, spec)
+    objects: dict[str, Any] = {}
+    for name, kind in handle.kinds.items():
+        if kind[0] == "grid":
+            objects[name] = Grid.view(views.pop(name), *kind[1:])
+        elif kind[0] == "ragged":
+            objects[name] = Ragged(views.pop(f"{name}.values"), views.pop(f"{name}.offsets"))
+    return objects | views, blocks
+
+
+# Set in every pool worker by _start_worker
+_objects: dict[str, Any] = {}
+_blocks: list[SharedMemory] = []
+
+
+def _start_worker(handle: Handle) -> None:
+    global _objects, _blocks
+    _objects, _blocks = attach(handle)
+
+
+def _call(func: Callable[[dict[str, Any], T], R], task: T) -> R:
+    return func(_objects, task)
+
+
+def fan_out(
+    func: Callable[[dict[str, Any], T], R],
+    shared: SharedArrays | Handle,
+    tasks: Iterable[T],
+    processes: int | None = None,
+) -> list[R]:
+    """
+    func(objects, task) for every task, in a pool of processes attached to
+    the shared objects. func must be picklable, a module-level function.
+    """
+    handle = shared.handle if isinstance(shared, SharedArrays) else shared
+    context = multiprocessing.get_context()
+    with context.Pool(processes or workers(), _start_worker, (handle,)) as pool:
+        return pool.map(partial(_call, func), tasks)
+
+
+def ranges(n: int, processes: int | None = None) -> list[tuple[int, int]]:
+    """[start, stop) ranges covering range(n), a few per process"""
+    count = min(n, (processes or workers()) * CHUNKS_PER_WORKER) or 1
+    bounds = [n * i // count for i in range(count + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
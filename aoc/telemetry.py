@@ -0,0 +1,139 @@
+"""
+Progress and counters, sampled in the background.
+
+Loops do not report anything themselves: they register probes, callables that
+return the current value of a counter (items done, queue length, states
+reached), and a sampler thread reads them every `interval` seconds. A sample is
+printed as one line on stderr and kept, `export()` returns them all at the end.
+Nothing runs per iteration, apart from the counting done by `progress`.
+
+Environment:
+    AOC_TELEMETRY=1                 turn it on, it is off by default
+    AOC_TELEMETRY_INTERVAL=seconds  time between samples (default: 1)
+
+Off, `progress` returns the iterable itself and `watch` a shared no-op
+context manager.
+"""
+
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+Probe = Callable[[], float]
+
+DEFAULT_INTERVAL = 1.0
+
+_NULL = nullcontext()
+
+
+def enabled() -> bool:
+    return os.environ.get("AOC_TELEMETRY", "0") not in ("", "0")
+
+
+def interval() -> float:
+    return float(os.environ.get("AOC_TELEMETRY_INTERVAL", DEFAULT_INTERVAL))
+
+
+class Sampler:
+    def __init__(self):
+        self.probes: dict[str, tuple[Probe, float | None]] = {}
+        # name -> [(seconds since start, value), ...]
+        self.samples: dict[str, list[tuple[float, float]]] = {}
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.thread: threading.Thread | None = None
+        self.stopped = threading.Event()
+
+    def add(self, name: str, probe: Probe, total: float | None = None) -> None:
+        with self.lock:
+            self.probes[name] = (probe, total)
+            self.samples.setdefault(name, [])
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def remove(self, name: str) -> None:
+        # A last sample, so that short loops show up too
+        self.sample([name])
+        with self.lock:
+            del self.probes[name]
+
+    def sample(self, names: Iterable[str] | None = None) -> None:
+        now = time.perf_counter() - self.start
+        with self.lock:
+            probes = {
+                name: self.probes[name] for name in (names or self.probes) if name in self.probes
+            }
+        parts = []
+        for name, (probe, total) in probes.items():
+            value = probe()
+            self.samples[name].append((now, value))
+            parts.append(f"{name}={value}" if total is None else f"{name}={value}/{total}")
+        if parts:
+            print(f"[{now:8.1f}s] " + " ".join(parts), file=sys.stderr)
+
+    def _run(self) -> None:
+        while not self.stopped.wait(interval()):
+            self.sample()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def export(self) -> dict[str, Any]:
+        return {
+            "interval": interval(),
+            "metrics": {
+                name: {"last": samples[-1][1] if samples else None, "samples": samples}
+                for name, samples in self.samples.items()
+            },
+        }
+
+
+SAMPLER = Sampler()
+
+
+def watch(name: str, probe: Probe, total: float | None = None) -> ContextManager:
+    """Sample probe while the block runs"""
+    if not enabled():
+        return _NULL
+    return _watch(name, probe, total)
+
+
+@contextmanager
+def _watch(name: str, probe: Probe, total: float | None) -> Iterator[None]:
+    SAMPLER.add(name, probe, total)
+    try:
+        yield
+    finally:
+        SAMPLER.remove(name)
+
+
+def progress(iterable: Iterable[T], name: str, total: int | None = None) -> Iterable[T]:
+    """Count the items of iterable as they go, a stand-in for tqdm"""
+    if not enabled():
+        return iterable
+    if total is None and hasattr(iterable, "__len__"):
+        total = len(iterable)  # type: ignore[arg-type]
+    return _progress(iterable, name, total)
+
+
+def _progress(iterable: Iterable[T], name: str, total: int | None) -> Iterator[T]:
+    done = 0
+    with _watch(name, lambda: done, total):
+        for done, item in enumerate(iterable, start=1):
+            yield item
+
+
+def export() -> dict[str, Any]:
+    SAMPLER.stop()
+    return SAMPLER.export()
@@ -1,38 +1,255 @@
+from __future__ import annotations
 from pathlib import Path
 from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any
 
 from aoc_utils import timing
 
+from aoc import memory, readers
+from aoc.cache import cached_parser
+from aoc.dispatch import Dispatch, generated
+from aoc.engines import FAST, REFERENCE, engine
+from aoc.instrument import instrumented
+from aoc.online import CountTree, StepSum
 
+
+@instrumented
+@cached_parser(version=2)
 def parse_file(path: Path) -> tuple[list[int, int]]:
-    first_list = []
-    second_list = []
-    with open(path, "r") as fin:
-        for line in fin.readlines():
-            n1, n2 = line.strip().split("  ")
-            first_list.append(int(n1))
-            second_list.append(int(n2))
+    from aoc import ingest
+
+    first_list, second_list = ingest.table(path, 2).T.tolist()
     return first_list, second_list
 
 
+# Each part has its own kernels: the distance needs both lists sorted, the
+# similarity only the counts of the second one
+DISTANCE = Dispatch("day1.distance", sample=generated(1))
+SIMILARITY = Dispatch("day1.similarity", sample=generated(1))
+
+
+@DISTANCE.scalar
+@instrumented
+def distance_lists(path: Path) -> int:
+    rows = list(readers.int_rows(path))
+    first_list, second_list = sorted(a for a, _ in rows), sorted(b for _, b in rows)
+    return sum(abs(b - a) for a, b in zip(first_list, second_list))
+
+
+@DISTANCE.vector
+@instrumented
+def distance_arrays(path: Path) -> int:
+    import numpy as np
+
+    from aoc import ingest
+
+    columns = ingest.table(path, 2).T.copy()
+    columns.sort(axis=1)
+    first, second = columns
+    return int(np.abs(second - first).sum())
+
+
+@SIMILARITY.scalar
+@instrumented
+def similarity_counts(path: Path) -> int:
+    rows = list(readers.int_rows(path))
+    second_counts = Counter(b for _, b in rows)
+    return sum(a * second_counts[a] for a, _ in rows)
+
+
+@SIMILARITY.vector
+@instrumented
+def similarity_arrays(path: Path) -> int:
+    import numpy as np
+
+    from aoc import ingest
+
+    first, second = ingest.table(path, 2).T
+    if not second.size:
+        return 0
+    second = np.sort(second)
+    # second is sorted, its distinct ids start where it changes value
+    starts = np.flatnonzero(np.diff(second, prepend=second[0] - 1))
+    ids, counts = second[starts], np.diff(starts, append=len(second))
+    where = np.minimum(np.searchsorted(ids, first), len(ids) - 1)
+    found = ids[where] == first
+    return int((first[found] * counts[where[found]]).sum())
+
+
+@instrumented
+def distance_external(path: Path) -> int:
+    """The distance, sorting the lists on disk"""
+    import numpy as np
+
+    from aoc import external
+
+    with external.spilled(path, 2) as (first, second):
+        items = external.block_items(len(first) + len(second))
+        pairs = external.aligned(external.merge(first, items), external.merge(second, items))
+        return sum(int(np.abs(b - a).sum()) for a, b in pairs)
+
+
+@instrumented
+def similarity_external(path: Path) -> int:
+    """The similarity, sorting the lists on disk and merge-joining their counts"""
+    from aoc import external
+
+    with external.spilled(path, 2) as (first, second):
+        items = external.block_items(len(first) + len(second))
+        common = external.join(
+            external.counted(external.merge(first, items)),
+            external.counted(external.merge(second, items)),
+        )
+        return sum(int((ids * first * second).sum()) for ids, first, second in common)
+
+
+@engine(1, FAST)
 def part_one(path: Path) -> int:
+    if not memory.fits(path):
+        return distance_external(path)
+    return DISTANCE(path)
+
+
+@engine(1, REFERENCE)
+def part_one_reference(path: Path) -> int:
     first_list, second_list = parse_file(path)
     return sum(abs(b - a) for a, b in zip(sorted(first_list), sorted(second_list)))
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
+@engine(2, FAST)
 def part_two(path: Path) -> int:
-    first_list, second_list = parse_file(path)
-    counts = Counter(second_list)
-    return sum(a * counts.get(a, 0) for a in first_list)
+    if not memory.fits(path):
+        return similarity_external(path)
+    return SIMILARITY(path)
+
+
+@engine(2, REFERENCE)
+def part_two_reference(path: Path) -> int:
+    # Only the counts matter, no need to keep the lists
+    first_counts, second_counts = Counter(), Counter()
+    for a, b in readers.int_rows(path):
+        first_counts[a] += 1
+        second_counts[b] += 1
+    return sum(a * n * second_counts[a] for a, n in first_counts.items())
+
+
+# Online
+
+
+LEFT, RIGHT = 0, 1
+
+
+@dataclass
+class Snapshot:
+    left: int
+    right: int
+    distance: int
+    similarity: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class LocationLists:
+    """
+    Both lists under insertions and deletions, with both answers kept current.
+
+    The similarity moves by id * (count on the other side) per update, from the
+    count map. The distance of the sorted pairs cannot be patched that way: one
+    insertion shifts the pairing of every larger id. For lists of the same
+    length it is the sum over t of |D(t)|, with D(t) = #(left ids <= t) -
+    #(right ids <= t), and an update to id x adds +1 or -1 to D from x on. A
+    StepSum keeps that sum, in O(sqrt(n) log n) per update for n distinct ids.
+
+    Like part_one, lists of different lengths pair only the m = min(len) smallest
+    ids of each. Up to the m-th smallest id c of the longer list, D is the same as
+    for the truncated lists. From c on, the truncated longer list is complete,
+    so every id x > c of the shorter list adds x - c to the distance.
+    """
+
+    def __init__(self):
+        self.lists = (CountTree(), CountTree())
+        # id -> [count on the left, count on the right]
+        self.counts: dict[int, list[int]] = {}
+        self.steps = StepSum()
+        self.similarity = 0
+
+    @classmethod
+    def from_file(cls, path: Path) -> LocationLists:
+        """The lists of an input, built in one pass rather than one id at a time"""
+        first_counts, second_counts = Counter(), Counter()
+        for a, b in readers.int_rows(path):
+            first_counts[a] += 1
+            second_counts[b] += 1
+        lists = cls()
+        lists.lists = (CountTree.from_counts(first_counts), CountTree.from_counts(second_counts))
+        for location in first_counts.keys() | second_counts.keys():
+            lists.counts[location] = [first_counts[location], second_counts[location]]
+        lists.steps = StepSum.from_steps(
+            {location: a - b for location, (a, b) in lists.counts.items()}
+        )
+        lists.similarity = sum(a * n * second_counts[a] for a, n in first_counts.items())
+        return lists
+
+    def insert(self, side: int, location: int) -> None:
+        self._update(side, location, 1)
+
+    def delete(self, side: int, location: int) -> None:
+        if not self.count(location)[side]:
+            raise KeyError(f"{location} is not in the {('left', 'right')[side]} list")
+        self._update(side, location, -1)
+
+    def _update(self, side: int, location: int, change: int) -> None:
+        self.lists[side].add(location, change)
+        counts = self.counts.setdefault(location, [0, 0])
+        counts[side] += change
+        self.similarity += change * location * counts[1 - side]
+        self.steps.add_suffix(location, change if side == LEFT else -change)
+        if not any(counts):
+            del self.counts[location]
+
+    def __len__(self) -> int:
+        return max(map(len, self.lists))
+
+    def count(self, location: int) -> tuple[int, int]:
+        left, right = self.counts.get(location, (0, 0))
+        return left, right
+
+    def rank(self, side: int, location: int) -> int:
+        """How many ids of that side are smaller"""
+        return self.lists[side].rank(location)
+
+    def kth(self, side: int, k: int) -> int:
+        """The k-th smallest id of that side, from 0"""
+        return self.lists[side].kth(k)
+
+    @property
+    def distance(self) -> int:
+        left, right = self.lists
+        if len(left) == len(right):
+            return self.steps.sum
+        longer, shorter = (left, right) if len(left) > len(right) else (right, left)
+        if not (pairs := len(shorter)):
+            return 0
+        cut = longer.kth(pairs - 1)
+        count, total = shorter.below(cut + 1)
+        above = (shorter.key_sum - total) - cut * (pairs - count)
+        return self.steps.prefix(cut) + above
+
+    def snapshot(self) -> Snapshot:
+        left, right = self.lists
+        return Snapshot(len(left), len(right), self.distance, self.similarity)
+
 
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -1,76 +1,62 @@
 from __future__ import annotations
 from pathlib import Path
-from itertools import product
-from tqdm import tqdm
-from collections import deque
 
 from aoc_utils import timing
 
-Point = tuple[int, int]
-
+from aoc.cache import cached_parser
+from aoc.grid import Grid
+from aoc.instrument import instrumented
+from aoc.search import Search
+from aoc.telemetry import progress
 
 class HikingMap:
-    directions = ((0, 1), (0, -1), (1, 0), (-1, 0))
-
-    def __init__(self, lines: list[list[int]]):
-        self.lines = lines
-        self.max_x = len(lines[0])
-        self.max_y = len(lines)
-        self.reachable_ends: dict[Point, set[Point]] = {}
-        self.zeros = {
-            (i, j)
-            for i, j in product(range(self.max_y), range(self.max_x))
-            if self[(i, j)] == 0
-        }
-
-    def __getitem__(self, point: Point) -> int:
-        return self.lines[point[0]][point[1]]
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self.max_x = grid.width
+        self.max_y = grid.height
+        # Cells are flat grid indices, see aoc.grid
+        self.zeros = [int(cell) for cell in grid.find(0)]
+
+    def __getitem__(self, cell: int) -> int:
+        return self.grid.cells[cell]
 
     @classmethod
+    @instrumented
+    @cached_parser(version=2)
     def from_input(cls, path: Path) -> HikingMap:
         with path.open("r") as fin:
             text = fin.read()
-        lines = []
-        for line in text.split("\n"):
-            lines.append(list(map(int, line.strip())))
-        return HikingMap(lines)
+        return HikingMap(Grid.from_digits(text.split("\n")))
 
-    def get_next(self, point: Point, max_height_diff: int = 1) -> tuple[Point, int]:
+    def get_next(self, cell: int, max_height_diff: int = 1) -> list[tuple[int, int]]:
         np = []
-        height = self[point]
-        for direction in self.directions:
-            p = self.add_direction(point, direction)
-            if (0 <= p[0] < self.max_y) and (0 <= p[1] < self.max_x):
-                next_height = self[p]
-                if 0 < next_height - height <= max_height_diff:
-                    np.append((p, next_height))
+        cells = self.grid.cells
+        height = cells[cell]
+        for offset in self.grid.offsets:
+            # The border is lower than everything, no need to check the bounds
+            next_height = cells[p := cell + offset]
+            if 0 < next_height - height <= max_height_diff:
+                np.append((p, next_height))
         return np
 
-    @staticmethod
-    def add_direction(point: Point, direction: tuple[int, int]):
-        return point[0] + direction[0], point[1] + direction[1]
-
-    def explore(self) -> dict[Point, list[Point]]:
-        # For the moment I will live without caching
+    @instrumented
+    def explore(self) -> dict[int, dict[int, int]]:
+        """Number of trails from every trailhead to each summit it reaches"""
+        # Every step climbs by one, so every trail is a shortest path
+        search = Search(len(self.grid), all_parents=True)
         trails = {}
-        for start in tqdm(self.zeros):
-            trails[start] = self.explore_one(start)
+        for start in progress(self.zeros, "trailheads"):
+            trails[start] = self.explore_one(start, search)
         return trails
 
-    def explore_one(self, start: Point) -> list[Point]:
-        # I will use BFS instead of recursion, since we have to explore
-        # all the space anyhow
-        # Note: there is no way to go back nor to make loops, this might change next!
-        reachable_ends = []
-        queue = deque([(start, self[start])])
-        while queue:
-            lp, _ = queue.popleft()
-            for np, nh in self.get_next(lp):
-                if nh == 9:
-                    reachable_ends.append(np)
-                else:
-                    queue.append((np, nh))
-        return reachable_ends
+    def explore_one(self, start: int, search: Search) -> dict[int, int]:
+        search.bfs([start], self.next_cells)
+        counts = search.count_paths()
+        cells = self.grid.cells
+        return {cell: n for cell, n in counts.items() if cells[cell] == 9}
+
+    def next_cells(self, cell: int) -> list[int]:
+        return [np for np, _ in self.get_next(cell)]
 
 
 def parse_file(path: Path) -> HikingMap:
@@ -80,12 +66,8 @@ def parse_file(path: Path) -> HikingMap:
 def part_one(path: Path) -> int:
     hiking_map = parse_file(path)
     trails = hiking_map.explore()
-    return sum(len(set(v)) for v in trails.values())
-
+    return sum(len(v) for v in trails.values())
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
 
 # Part two
 
@@ -93,9 +75,14 @@ print(result)
 def part_two(path: Path) -> int:
     hiking_map = parse_file(path)
     trails = hiking_map.explore()
-    return sum(len(v) for v in trails.values())
+    return sum(sum(v.values()) for v in trails.values())
+
 
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -1,17 +1,16 @@
 from pathlib import Path
 from typing import Optional
-from tqdm import tqdm
-from collections import defaultdict, Counter
 
 from aoc_utils import timing
 
+from aoc.instrument import instrumented
+from aoc.memo import memoize
+from aoc.telemetry import progress
 
-# Let us try to see if it is possible to cache.
-# Considering that all the numbers are multiplied by
-# 2024 it might make sense
-cache = {}
+MEMO_ENTRIES = 1 << 18
 
 
+@instrumented
 def parse_file(path: Path) -> list[int]:
     with path.open("r") as fin:
         return list(map(int, fin.read().strip().split(" ")))
@@ -24,20 +23,18 @@ def split(n: int) -> Optional[list[int]]:
     return None
 
 
-def cached_split(n: int, N: int) -> dict[int, int]:
-    if N < 1:
+# Let us try to see if it is possible to cache.
+# Considering that all the numbers are multiplied by
+# 2024 it might make sense.
+# Only the number of stones is kept per (stone, blinks), not the stones
+# themselves: whole distributions per entry add up to hundreds of MB.
+@memoize(max_entries=MEMO_ENTRIES)
+def count_stones(n: int, N: int) -> int:
+    if N < 0:
         raise ValueError
-    if (n, N) in cache:
-        return cache[(n, N)]
-    if N == 1:
-        cache[(n, N)] = Counter(apply_rules(n))
-    else:
-        numbers = defaultdict(int)
-        for val, occurrences in cached_split(n, 1).items():
-            for nn, vv in cached_split(val, N - 1).items():
-                numbers[nn] += vv * occurrences
-        cache[(n, N)] = numbers
-    return cache[(n, N)]
+    if N == 0:
+        return 1
+    return sum(count_stones(nn, N - 1) for nn in apply_rules(n))
 
 
 def apply_rules(n: int) -> list[int]:
@@ -48,9 +45,18 @@ def apply_rules(n: int) -> list[int]:
     return [n * 2024]
 
 
+def prepare(blinks: int = 75) -> None:
+    """
+    Fill the cache for the digits, every stone ends up splitting into them
+    whatever the input
+    """
+    for n in range(10):
+        count_stones(n, blinks)
+
+
 def part_one(path: Path) -> int:
     numbers = parse_file(path)
-    for _ in tqdm(range(25)):
+    for _ in progress(range(25), "blinks"):
         new_numbers = []
         for n in numbers:
             new_numbers.extend(apply_rules(n))
@@ -58,21 +64,22 @@ def part_one(path: Path) -> int:
     return len(new_numbers)
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
 def part_two(path: Path) -> int:
     numbers = parse_file(path)
     total_length = 0
-    for n in tqdm(numbers):
-        total_length += sum(cached_split(n, 75).values())
+    for n in progress(numbers, "stones"):
+        total_length += count_stones(n, 75)
     return total_length
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -1,16 +1,27 @@
+from __future__ import annotations
 from pathlib import Path
-import numpy as np
-from typing import Optional
-from tqdm import tqdm
-import re
+from typing import TYPE_CHECKING, Iterator, Optional
 
 from aoc_utils import timing
 
+from aoc import readers
+from aoc.cache import cached_parser
+from aoc.dispatch import Dispatch, generated
+from aoc.instrument import instrumented
+from aoc.telemetry import progress
+
+if TYPE_CHECKING:
+    import numpy as np
+
+FIELDS = 6
+
 
 class ClawMachine:
     A_COST = 3
     B_COST = 1
 
+    __slots__ = ("x_a", "y_a", "x_b", "y_b", "x_prize", "y_prize")
+
     def __init__(
         self, x_a: int, y_a: int, x_b: int, y_b: int, x_prize: int, y_prize: int
     ):
@@ -48,37 +59,120 @@ class ClawMachine:
         We solve these two equations in two unknwons:
         p_a * a_x + p_b * b_x = x
         p_a * a_y + p_b * b_y = y
+        with Cramer's rule, in integers so that it stays exact for far prizes
         """
-        sol = np.linalg.solve(
-            np.array([[self.x_a, self.x_b], [self.y_a, self.y_b]]),
-            np.array([self.x_prize, self.y_prize]),
-        )
+        determinant = self.x_a * self.y_b - self.x_b * self.y_a
+        if determinant == 0:
+            return 0
+        push_a, rest_a = divmod(self.x_prize * self.y_b - self.x_b * self.y_prize, determinant)
+        push_b, rest_b = divmod(self.x_a * self.y_prize - self.x_prize * self.y_a, determinant)
+        if rest_a or rest_b or push_a < 0 or push_b < 0:
+            return 0
+        if showsol:
+            print(push_a, push_b)
+        return self.A_COST * push_a + self.B_COST * push_b
 
-        if (
-            np.allclose(sol - np.round(sol, 0), np.zeros_like(sol), atol=1e-4)
-            and (sol >= 0).all()
-        ):
-            if showsol:
-                print(sol.astype(int), sol - np.round(sol))
 
-            coeffs = np.array([self.A_COST, self.B_COST])
-            return np.dot(coeffs, np.round(sol).astype(int))
-        return 0
+class ClawMachineList(list):
+    """The machines one by one, for inputs too small to be worth importing NumPy"""
+
+    def move_prizes(self, offset: int) -> None:
+        for machine in self:
+            machine.x_prize += offset
+            machine.y_prize += offset
+
+    def total_tokens(self) -> int:
+        return sum(machine.mathsolve() for machine in self)
+
+
+class ClawMachines:
+    """All the machines as one int64 array per field"""
+
+    FIELDS = ClawMachine.__slots__
+
+    def __init__(self, values: np.ndarray):
+        import numpy as np
+
+        # One row per machine, one column per field
+        self.values = values.reshape(-1, len(self.FIELDS)).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[ClawMachine]:
+        for row in self.values.tolist():
+            yield ClawMachine(*row)
 
+    def __getattr__(self, name: str) -> np.ndarray:
+        if name not in self.FIELDS:
+            raise AttributeError(name)
+        return self.values[:, self.FIELDS.index(name)]
 
-def parse_file(path: Path) -> list[ClawMachine]:
-    with path.open("r") as fin:
-        matches = re.findall(
-            r"Button A: X\+(\d+), Y\+(\d+).*\nButton B: X\+(\d+), Y\+(\d+).*\nPrize: X\=(\d+), Y=(\d+)",
-            fin.read(),
+    def move_prizes(self, offset: int) -> None:
+        self.values[:, 4:] += offset
+
+    def tokens(self) -> np.ndarray:
+        """
+        Cost of every machine, 0 when it cannot be won.
+        Cramer's rule in integers, exact even for the far prizes of part two
+        """
+        import numpy as np
+
+        determinant = self.x_a * self.y_b - self.x_b * self.y_a
+        pushes_a = self.x_prize * self.y_b - self.x_b * self.y_prize
+        pushes_b = self.x_a * self.y_prize - self.x_prize * self.y_a
+        # Parallel buttons never show up, keep them from dividing by zero
+        safe = np.where(determinant == 0, 1, determinant)
+        winnable = (
+            (determinant != 0)
+            & (pushes_a % safe == 0)
+            & (pushes_b % safe == 0)
+            & (pushes_a // safe >= 0)
+            & (pushes_b // safe >= 0)
+        )
+        cost = (
+            ClawMachine.A_COST * (pushes_a // safe) + ClawMachine.B_COST * (pushes_b // safe)
         )
-    return [ClawMachine(*list(map(int, match))) for match in matches]
+        return np.where(winnable, cost, 0)
+
+    def total_tokens(self) -> int:
+        return int(self.tokens().sum())
+
+
+# Buttons A and B then the prize, two numbers each
+PARSE = Dispatch("day13.parse", sample=generated(13))
+
+
+# Each implementation is cached under its own key: the cache must not hand a
+# scalar run the arrays of an earlier vector one, and NumPy along with them
+@PARSE.scalar
+@instrumented
+@cached_parser(version=1)
+def parse_list(path: Path) -> ClawMachineList:
+    numbers = list(readers.numbers(path))
+    return ClawMachineList(
+        ClawMachine(*numbers[i : i + FIELDS]) for i in range(0, len(numbers), FIELDS)
+    )
+
+
+@PARSE.vector
+@instrumented
+@cached_parser(version=1)
+def parse_arrays(path: Path) -> ClawMachines:
+    from aoc import ingest
+
+    return ClawMachines(ingest.table(path, FIELDS))
+
+
+@instrumented
+def parse_file(path: Path) -> ClawMachineList | ClawMachines:
+    return PARSE(path)
 
 
 def part_one(path: Path) -> int:
     claw_machines = parse_file(path)
     total = 0
-    for i, claw_machine in enumerate(tqdm(claw_machines)):
+    for i, claw_machine in enumerate(progress(claw_machines, "claw machines")):
         tokens = claw_machine.solve()
         print(f"Claw Machine {i}: {tokens}")
         if tokens is not None:
@@ -86,23 +180,20 @@ def part_one(path: Path) -> int:
     return total
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
 def part_two(path: Path) -> int:
     claw_machines = parse_file(path)
-    offset = 10000000000000
-    for claw_machine in claw_machines:
-        claw_machine.x_prize += offset
-        claw_machine.y_prize += offset
+    claw_machines.move_prizes(10000000000000)
+    return claw_machines.total_tokens()
 
-    return int(sum(claw_machine.mathsolve(True) for claw_machine in claw_machines))
 
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -3,16 +3,25 @@ from typing import TypeAlias
 from itertools import product
 from typing_extensions import Self
 import re
-from tqdm import tqdm
+
+import numpy as np
 
 from aoc_utils import timing
 
+from aoc import ingest
+from aoc.grid import Grid
+from aoc.instrument import instrumented
+from aoc.render import Canvas, frame_sink
+from aoc.telemetry import progress
+
 
 Point: TypeAlias = tuple[int, int]
 Velocity: TypeAlias = tuple[int, int]
 
 
 class Robot:
+    __slots__ = ("position", "velocity")
+
     def __init__(self, position: Point, velocity: Velocity):
         self.position = position
         self.velocity = velocity
@@ -25,102 +34,116 @@ class Robot:
 
 
 class RobotMap:
-    def __init__(self, robots: list[Robot], max_x: int, max_y: int):
-        self.robots = robots
+    """
+    Robots are stored as two (n, 2) int arrays of (x, y) rows, positions and
+    velocities, rather than one object each
+    """
+
+    def __init__(
+        self, positions: np.ndarray, velocities: np.ndarray, max_x: int, max_y: int
+    ):
+        self.positions = positions
+        self.velocities = velocities
         self.max_x = max_x
         self.max_y = max_y
 
+    @classmethod
+    def from_robots(cls, robots: list[Robot], max_x: int, max_y: int) -> Self:
+        positions = np.array([robot.position for robot in robots], dtype=np.int64)
+        velocities = np.array([robot.velocity for robot in robots], dtype=np.int64)
+        return cls(positions.reshape(-1, 2), velocities.reshape(-1, 2), max_x, max_y)
+
+    @property
+    def robots(self) -> list[Robot]:
+        return [
+            Robot(tuple(p), tuple(v))
+            for p, v in zip(self.positions.tolist(), self.velocities.tolist())
+        ]
+
+    @property
+    def size(self) -> np.ndarray:
+        return np.array([self.max_x, self.max_y])
+
+    @instrumented
     def do_steps(self, n_steps: int, visualize: bool = True) -> None:
-        for step in tqdm(range(n_steps)):
-            for robot in self.robots:
-                robot.one_step(self.max_x, self.max_y)
+        if not visualize:
+            # Nothing to look at on the way, jump straight to the end
+            self.positions = (self.positions + n_steps * self.velocities) % self.size
+            return
+        frames = frame_sink("day14")
+        for step in progress(range(n_steps), "steps"):
+            self.positions = (self.positions + self.velocities) % self.size
+            if frames is not None:
+                frames.write(lambda: Canvas.from_counts(self.occupancy().inner), step)
             max_strings_lengths = self.get_contiguous_strings()
-            do_visualize = sorted(max_strings_lengths.values(), reverse=True)[2] >= 5
-            if visualize and do_visualize:
+            if sorted(max_strings_lengths.values(), reverse=True)[2] >= 5:
                 print("##################")
                 print(f"Step: {step}")
                 print(self)
 
+    def occupancy(self) -> Grid:
+        """Number of robots per tile, the bathroom wraps around so there is no border"""
+        grid = Grid.full(self.max_y, self.max_x, 0, dtype=np.int32, pad=0)
+        xs, ys = self.positions.T
+        np.add.at(grid.flat, grid.ids(ys, xs), 1)
+        return grid
+
+    @instrumented
     def count_in_quadrants(self) -> dict[tuple[bool, bool], int]:
         quadrant_counts = {
             (up, left): 0 for up, left in product([True, False], [True, False])
         }
         x_division = (self.max_x - 1) // 2
         y_division = (self.max_y - 1) // 2
-        for robot in self.robots:
-            x, y = robot.position
-            if x != x_division and y != y_division:
-                quadrant_counts[
-                    robot.position[0] > x_division, robot.position[1] > y_division
-                ] += 1
+        counts = self.occupancy().inner
+        for right, bottom in quadrant_counts:
+            xs = slice(x_division + 1, None) if right else slice(0, x_division)
+            ys = slice(y_division + 1, None) if bottom else slice(0, y_division)
+            quadrant_counts[right, bottom] = int(counts[ys, xs].sum())
         return quadrant_counts
 
     def robot_positions(self) -> set[Point]:
-        positions = set()
-        for robot in self.robots:
-            positions.add(robot.position)
-        return positions
+        return set(map(tuple, self.positions.tolist()))
 
     def vertically_symmetric(self, symmetry_fraction: float = 0.2) -> bool:
-        positions = self.robot_positions()
-        n_asym = 0
-        for x, y in positions:
-            if ((self.max_x - 1 - x), y) not in positions:
-                n_asym += 1
-        return (n_asym / len(positions)) < (1 - symmetry_fraction)
+        occupied = self.occupancy().inner > 0
+        n_asym = (occupied & ~occupied[:, ::-1]).sum()
+        return (n_asym / occupied.sum()) < (1 - symmetry_fraction)
 
     def robots_on_lines(self) -> dict[int, set[int]]:
-        roboset = set([robot.position for robot in self.robots])
+        ys, xs = np.nonzero(self.occupancy().inner)
         robots_on_lines = {i: set() for i in range(self.max_y)}
-        for y in range(self.max_y):
-            for x in range(self.max_x):
-                if (x, y) in roboset:
-                    robots_on_lines[y].add(x)
+        for y, x in zip(ys.tolist(), xs.tolist()):
+            robots_on_lines[y].add(x)
         return robots_on_lines
 
+    @instrumented
     def get_contiguous_strings(self) -> dict[int, int]:
-        robots_on_lines = self.robots_on_lines()
-        max_strings_length = dict()
-        for y, robots_on_line in robots_on_lines.items():
-            current_length = 0
-            max_length = 0
-            for x in range(self.max_x):
-                if x in robots_on_line:
-                    current_length += 1
-                else:
-                    max_length = max(current_length, max_length)
-                    current_length = 0
-            max_strings_length[y] = max_length
-        return max_strings_length
+        """Longest horizontal run of occupied tiles, line by line"""
+        occupied = np.zeros((self.max_y, self.max_x + 2), dtype=np.int8)
+        occupied[:, 1:-1] = self.occupancy().inner > 0
+        # Runs start where the line goes from empty to occupied and end on the way back
+        rows, starts = np.nonzero(np.diff(occupied, axis=1) == 1)
+        _, ends = np.nonzero(np.diff(occupied, axis=1) == -1)
+        max_strings_length = np.zeros(self.max_y, dtype=np.int64)
+        np.maximum.at(max_strings_length, rows, ends - starts)
+        return dict(enumerate(max_strings_length.tolist()))
 
     def __str__(self):
-        occupations = {
-            (i, j): 0 for i, j in product(range(self.max_x), range(self.max_y))
-        }
-        for robot in self.robots:
-            occupations[(robot.position[0], robot.position[1])] += 1
-        lines = []
-        for y in range(self.max_y):
-            line = []
-            for x in range(self.max_x):
-                occ = occupations[(x, y)]
-                line.append(str(occ) if occ > 0 else ".")
-            lines.append("".join(line))
-        return "\n".join(lines)
+        return Canvas.from_counts(self.occupancy().inner).text()
 
 
+@instrumented
 def parse_file(path: Path) -> RobotMap:
-    with path.open("r") as fin:
-        input_text = fin.read()
-    robots = []
-    for match in re.findall("p=(-*\d+),(-*\d+) v=(-*\d+),(-*\d+)", input_text):
-        x, y, vx, vy = list(map(int, match))
-        robots.append(Robot((x, y), (vx, vy)))
+    robots = ingest.table(path, 4)
     if "example" in path.name:
         max_x, max_y = 11, 7
+    elif (size := re.search(r"(\d+)x(\d+)", path.stem)) is not None:
+        # generated inputs carry their size in the name
+        max_x, max_y = map(int, size.groups())
     else:
         max_x, max_y = 101, 103
-    return RobotMap(robots, max_x, max_y)
+    return RobotMap(robots[:, :2], robots[:, 2:], max_x, max_y)
 
 
 def part_one(path: Path) -> int:
@@ -134,10 +157,6 @@ def part_one(path: Path) -> int:
     return ret
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
@@ -146,6 +165,11 @@ def part_two(path: Path) -> int:
     robot_map.do_steps(10**9, visualize=True)
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
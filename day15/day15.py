@@ -1,240 +1,152 @@
 from pathlib import Path
-from typing import TypeAlias, Optional
+from typing import TypeAlias
 from typing_extensions import Self
-from tqdm import tqdm
 
 from aoc_utils import timing
 
-Point: TypeAlias = tuple[int, int]
-Vector: TypeAlias = tuple[int, int]
+from aoc.cache import cached_parser
+from aoc.grid import DOWN, LEFT, OUTSIDE, RIGHT, UP, Grid
+from aoc.instrument import instrumented
+from aoc.render import Canvas
+from aoc.telemetry import progress
 
-DIRECTIONS = {">": (0, 1), "<": (0, -1), "^": (-1, 0), "v": (1, 0)}
+Point: TypeAlias = tuple[int, int]
 
+DIRECTIONS = {">": RIGHT, "<": LEFT, "^": UP, "v": DOWN}
 
-def add(point: Point, vector: Vector) -> Point:
-    return point[0] + vector[0], point[1] + vector[1]
+WALL, BOX, ROBOT, FREE = map(ord, "#O@.")
+BOX_LEFT, BOX_RIGHT = map(ord, "[]")
 
 
 class RobotMap:
-    def __init__(
-        self,
-        boxes: set[Point],
-        obstacles: set[Point],
-        robot: Point,
-        max_x: int,
-        max_y: int,
-        moves: list[Vector],
-    ):
-        self.boxes = boxes
-        self.obstacles = obstacles
+    """
+    The warehouse, walls included, on a grid: cells are flat indices and
+    moves are directions of aoc.grid.
+    """
+
+    def __init__(self, grid: Grid, robot: int, moves: list[int]):
+        self.grid = grid
         self.robot = robot
-        self.max_x = max_x
-        self.max_y = max_y
         self.moves = moves
+        self.max_x = grid.width
+        self.max_y = grid.height
 
-    @classmethod
-    def from_file(cls, path: Path) -> Self:
+    @staticmethod
+    def read(path: Path) -> tuple[list[str], list[int]]:
         with path.open("r") as fin:
             map_text, moves_text = fin.read().strip().split("\n\n")
-        robot = None
-        boxes = set()
-        obstacles = set()
-        for y, line in enumerate(lines := map_text.strip().split("\n")[1:-1]):
-            for x, char in enumerate(line[1:-1]):
-                if char == "@":
-                    robot = (y, x)
-                if char == "O":
-                    boxes.add((y, x))
-                if char == "#":
-                    obstacles.add((y, x))
-        if robot is None:
-            raise ValueError
-        max_y = len(lines)
-        max_x = len(lines[0]) - 2
         moves = list()
         for char in moves_text:
             if char != "\n":
                 moves.append(DIRECTIONS[char])
-        return cls(boxes, obstacles, robot, max_x, max_y, moves)
+        return map_text.strip().split("\n"), moves
 
-    def in_bounds(self, point: Point) -> bool:
-        return 0 <= point[0] < self.max_y and 0 <= point[1] < self.max_x
-
-    def valid(self, point: Point) -> bool:
-        return self.in_bounds(point) and point not in self.obstacles
-
-    def move_one(self, move: Vector) -> None:
-        next_robot = add(self.robot, move)
-        if not self.valid(next_robot):
+    @classmethod
+    @instrumented
+    @cached_parser(version=2)
+    def from_file(cls, path: Path) -> Self:
+        lines, moves = cls.read(path)
+        grid = Grid.from_lines(lines)
+        robot = grid.find_one(ROBOT)
+        grid[robot] = FREE
+        return cls(grid, robot, moves)
+
+    @property
+    def boxes(self) -> set[Point]:
+        return {self.grid.yx(cell) for cell in self.grid.find(BOX)}
+
+    def move_one(self, move: int) -> None:
+        cells = self.grid.cells
+        offset = self.grid.offsets[move]
+        next_robot = self.robot + offset
+        # Walk over the row of boxes, if any, to the first cell that is not a box
+        advanced_box = next_robot
+        while cells[advanced_box] == BOX:
+            advanced_box += offset
+        if cells[advanced_box] != FREE:
             return None
-        if next_robot in self.boxes:
-            advanced_box = next_robot
-            while advanced_box in self.boxes:
-                advanced_box = add(advanced_box, move)
-            if not self.valid(advanced_box):
-                return None
-            self.boxes.remove(next_robot)
-            self.boxes.add(advanced_box)
+        if advanced_box != next_robot:
+            cells[advanced_box] = BOX
+            cells[next_robot] = FREE
         self.robot = next_robot
 
+    @instrumented
     def move_all(self) -> None:
-        for move in tqdm(self.moves):
+        for move in progress(self.moves, "moves"):
             self.move_one(move)
 
-    def __str__(self) -> str:
-        lines = ["#" * (self.max_x + 2)]
-        for y in range(self.max_y):
-            line = ["#"]
-            for x in range(self.max_x):
-                if (y, x) in self.boxes:
-                    line.append("O")
-                elif (y, x) == self.robot:
-                    line.append("@")
-                elif (y, x) in self.obstacles:
-                    line.append("#")
-                else:
-                    line.append(".")
-            line.append("#")
-            lines.append("".join(line))
-        lines.append("#" * (self.max_x + 2))
-        return "\n".join(lines)
-
-
-class WideRobotMap:
-    def __init__(
-        self,
-        boxes: set[Point],
-        obstacles: set[Point],
-        robot: Point,
-        max_x: int,
-        max_y: int,
-        moves: list[Vector],
-    ):
-        """
-        The convention is that we store
-        only the location of the left edge of the box
-        and of the obstacles
-        """
-        self.boxes = boxes
-        self.obstacles = obstacles
-        self.robot = robot
-        self.max_x = max_x
-        self.max_y = max_y
-        self.moves = moves
+    def gps(self) -> int:
+        ys, xs = self.grid.yxs(self.grid.find(BOX))
+        return int((100 * ys + xs).sum())
 
-    @classmethod
-    def from_file(cls, path: Path) -> Self:
-        with path.open("r") as fin:
-            map_text, moves_text = fin.read().strip().split("\n\n")
-        robot = None
-        boxes = set()
-        obstacles = set()
-        for y, line in enumerate(lines := map_text.strip().split("\n")[1:-1]):
-            for x, char in enumerate(line[1:-1]):
-                if char == "@":
-                    robot = (y, 2 * x)
-                if char == "O":
-                    boxes.add((y, 2 * x))
-                if char == "#":
-                    obstacles.add((y, 2 * x))
-        if robot is None:
-            raise ValueError
-        max_y = len(lines)
-        max_x = 2 * (len(lines[0]) - 2)
-        moves = list()
-        for char in moves_text:
-            if char != "\n":
-                moves.append(DIRECTIONS[char])
-        return cls(boxes, obstacles, robot, max_x, max_y, moves)
+    def __str__(self) -> str:
+        return Canvas.from_grid(self.grid).put(*self.grid.yx(self.robot), ROBOT).text()
 
-    def in_bounds(self, point: Point) -> bool:
-        return 0 <= point[0] < self.max_y and 0 <= point[1] < self.max_x
 
-    def robot_intercepts_item(self, point: Point, items: set[Point]) -> Optional[Point]:
-        if point in items:
-            return point
-        if (pm := (point[0], point[1] - 1)) in items:
-            return pm
-        return None
+class WideRobotMap(RobotMap):
+    """Everything but the robot is twice as wide, boxes are [ and ]"""
 
-    def item_intercepts_item(self, item: Point, items: set[Point]) -> set[Point]:
-        intercepted = set()
-        for i in range(-1, 2):
-            if (ps := (item[0], item[1] + i)) in items:
-                intercepted.add(ps)
-        return intercepted
-
-    def is_robot_valid(self, point: Point) -> bool:
-        return self.in_bounds(point) and (
-            self.robot_intercepts_item(point, self.obstacles) is None
-        )
-
-    def is_item_in_bounds(self, item: Point) -> bool:
-        return 0 <= item[0] < self.max_y and 0 <= item[1] and item[1] + 1 < self.max_x
-
-    def is_item_valid(self, item: Point) -> bool:
-        return self.is_item_in_bounds(item) and not self.item_intercepts_item(
-            item, self.obstacles
-        )
-
-    def move_boxes(
-        self, next_robot: Point, move: Vector
-    ) -> tuple[bool, dict[Point, Point]]:
-        updates = {}
-        if (
-            intercepted_box := self.robot_intercepts_item(next_robot, self.boxes)
-        ) is not None:
-            intercepted_boxes = {intercepted_box}
-        else:
-            intercepted_boxes = {}
-        while intercepted_boxes:
-            box = intercepted_boxes.pop()
-            next_box_position = add(box, move)
-            if not self.is_item_valid(next_box_position):
-                return False, {}
-            updates[box] = next_box_position
-            for box_to_displace in self.item_intercepts_item(
-                next_box_position, self.boxes
-            ).difference({box}):
-                intercepted_boxes.add(box_to_displace)
-        return True, updates
-
-    def move_one(self, move: Vector) -> None:
-        next_robot = add(self.robot, move)
-        if not self.is_robot_valid(next_robot):
-            return None
-        can_move, updates = self.move_boxes(next_robot, move)
+    @classmethod
+    @instrumented
+    @cached_parser(version=2)
+    def from_file(cls, path: Path) -> Self:
+        lines, moves = cls.read(path)
+        widen = str.maketrans({"#": "##", "O": "[]", ".": "..", "@": "@."})
+        grid = Grid.from_lines([line.translate(widen) for line in lines])
+        robot = grid.find_one(ROBOT)
+        grid[robot] = FREE
+        return cls(grid, robot, moves)
+
+    @property
+    def boxes(self) -> set[Point]:
+        """Left edges of the boxes"""
+        return {self.grid.yx(cell) for cell in self.grid.find(BOX_LEFT)}
+
+    def move_boxes(self, next_robot: int, move: int) -> tuple[bool, list[int]]:
+        """
+        Whether the robot can step onto `next_robot`, and the box halves that
+        it pushes, in an order that lets each one move onto a free cell.
+        """
+        cells = self.grid.cells
+        offset = self.grid.offsets[move]
+        vertical = move in (UP, DOWN)
+        to_move = []
+        seen = set()
+        frontier = [next_robot]
+        while frontier:
+            cell = frontier.pop()
+            if cell in seen:
+                continue
+            seen.add(cell)
+            value = cells[cell]
+            if value == WALL or value == OUTSIDE:
+                return False, []
+            if value == FREE:
+                continue
+            to_move.append(cell)
+            frontier.append(cell + offset)
+            if vertical:
+                # Both halves of a box move together
+                frontier.append(cell + 1 if value == BOX_LEFT else cell - 1)
+        # The furthest cells along the move go first
+        to_move.sort(key=lambda cell: cell * offset, reverse=True)
+        return True, to_move
+
+    def move_one(self, move: int) -> None:
+        next_robot = self.robot + self.grid.offsets[move]
+        can_move, to_move = self.move_boxes(next_robot, move)
         if can_move:
+            cells = self.grid.cells
+            offset = self.grid.offsets[move]
+            for cell in to_move:
+                cells[cell + offset] = cells[cell]
+                cells[cell] = FREE
             self.robot = next_robot
-            self.boxes = self.boxes.difference(updates.keys())
-            self.boxes = self.boxes.union(updates.values())
         return None
 
-    def move_all(self) -> None:
-        for move in tqdm(self.moves):
-            self.move_one(move)
-
-    def __str__(self) -> str:
-        lines = ["#" * (self.max_x + 4)]
-        for y in range(self.max_y):
-            line = ["##"]
-            for x in range(self.max_x):
-                if (y, x) in self.boxes:
-                    line.append("[")
-                elif (y, x - 1) in self.boxes:
-                    line.append("]")
-                elif (y, x) == self.robot:
-                    line.append("@")
-                elif (y, x) in self.obstacles:
-                    line.append("#")
-                elif (y, x - 1) in self.obstacles:
-                    line.append("#")
-                else:
-                    line.append(".")
-            line.append("##")
-            lines.append("".join(line))
-        lines.append("#" * (self.max_x + 4))
-        return "\n".join(lines)
+    def gps(self) -> int:
+        ys, xs = self.grid.yxs(self.grid.find(BOX_LEFT))
+        return int((100 * ys + xs).sum())
 
 
 def parse_file(path: Path) -> RobotMap:
@@ -245,13 +157,9 @@ def part_one(path: Path) -> int:
     robot_map = parse_file(path)
     robot_map.move_all()
     print(robot_map)
-    return sum(100 * (y + 1) + (x + 1) for y, x in robot_map.boxes)
+    return robot_map.gps()
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
@@ -259,9 +167,14 @@ def part_two(path: Path) -> int:
     wide_robot_map = WideRobotMap.from_file(path)
     wide_robot_map.move_all()
     # print(wide_robot_map)
-    return sum(100 * (y + 1) + x + 2 for y, x in wide_robot_map.boxes)
+    return wide_robot_map.gps()
+
 
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
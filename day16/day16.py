@@ -1,123 +1,94 @@
 from pathlib import Path
-from typing import TypeAlias, Sequence
-from heapq import heappush, heappop
-from tqdm import tqdm
+from typing import Iterable, TypeAlias
 
 from aoc_utils import timing
 
+from aoc.cache import cached_parser
+from aoc.grid import RIGHT, Grid
+from aoc.instrument import instrumented
+from aoc.render import Canvas
+from aoc.search import Search
 
-Vector: TypeAlias = tuple[int, int]
-Point: TypeAlias = tuple[int, int]
-
-DIRECTIONS = {
-    (1, 0): [(0, 1), (0, -1)],
-    (-1, 0): [(0, 1), (0, -1)],
-    (0, 1): [(1, 0), (-1, 0)],
-    (0, -1): [(1, 0), (-1, 0)],
-}
 
+Point: TypeAlias = tuple[int, int]
 
-def add(point: Point, vector: Vector) -> Point:
-    return point[0] + vector[0], point[1] + vector[1]
+WALL = ord("#")
 
 
 class Maze:
-    position: Point
-    direction: Vector
-    target: Point
+    """Positions are flat grid indices and directions those of aoc.grid"""
+
+    position: int
+    direction: int
+    target: int
     rotation_cost = 1000
     step_cost = 1
 
     def __init__(self, maze_text: str):
-        self.obstacles = set()
-        self.direction = (0, 1)
-        for i, line in enumerate(lines := maze_text.strip().split("\n")):
-            for j, char in enumerate(line):
-                if char == "S":
-                    self.position = (i, j)
-                if char == "E":
-                    self.target = (i, j)
-                if char == "#":
-                    self.obstacles.add((i, j))
-        self.max_x = len(lines[0])
-        self.max_y = len(lines)
-        assert all((0, p) in self.obstacles for p in range(self.max_x))
-        assert all((self.max_y - 1, p) in self.obstacles for p in range(self.max_x))
-        assert all((p, 0) in self.obstacles for p in range(self.max_x))
-        assert all((p, self.max_x - 1) in self.obstacles for p in range(self.max_x))
-
-    def get_moves(self, point: Point, vector: Vector) -> list[int, Point, Vector]:
+        self.grid = Grid.from_lines(maze_text.strip().split("\n"))
+        self.direction = RIGHT
+        self.position = self.grid.find_one("S")
+        self.target = self.grid.find_one("E")
+        self.max_x = self.grid.width
+        self.max_y = self.grid.height
+        walls = self.grid.inner == WALL
+        assert walls[0].all() and walls[-1].all()
+        assert walls[:, 0].all() and walls[:, -1].all()
+
+    @property
+    def obstacles(self) -> set[Point]:
+        return {self.grid.yx(cell) for cell in self.grid.find(WALL)}
+
+    def get_moves(self, point: int, direction: int) -> list[tuple[int, int, int]]:
+        cells = self.grid.cells
+        offsets = self.grid.offsets
         moves = []
-        if (np := add(point, vector)) not in self.obstacles:
-            moves.append((self.step_cost, np, vector))
-        for nv in DIRECTIONS[vector]:
-            if (np := add(point, nv)) not in self.obstacles:
-                moves.append((self.rotation_cost + self.step_cost, np, nv))
+        if cells[np := point + offsets[direction]] != WALL:
+            moves.append((self.step_cost, np, direction))
+        for nd in ((direction + 1) % 4, (direction - 1) % 4):
+            if cells[np := point + offsets[nd]] != WALL:
+                moves.append((self.rotation_cost + self.step_cost, np, nd))
         return moves
 
-    def explore(self) -> tuple[int, list[Point]]:
-        queue = []
-        heappush(queue, (0, self.position, self.direction, [self.position]))
-        visited = set()
-        pbar = tqdm()
-        while queue:
-            cost, position, direction, path = heappop(queue)
-            pbar.update(1)
-            pbar.set_postfix({"ql": len(queue)})
-            if position == self.target:
-                return cost, path
-            for mc, mp, md in self.get_moves(position, direction):
-                if (mp, md) not in visited:
-                    visited.add((mp, md))
-                    state = (cost + mc, mp, md, list(path) + [mp])
-                    heappush(queue, state)
-        raise ValueError
-
-    def explore_p2(self) -> tuple[int, list[list[Point]]]:
-        """
-        The problem is probably endless loops
-        """
-        best_score = 10**9
-        all_best_paths = []
-        visited = {}
-        queue = []
-        heappush(queue, (0, self.position, self.direction, [self.position]))
-        # pbar = tqdm()
-        while queue:
-            cost, position, direction, path = heappop(queue)
-            visited[position] = cost
-            # pbar.update(1)
-            # pbar.set_postfix(
-            #     {"ql": len(queue), "bs": best_score, "ns": len(all_best_paths)}
-            # )
-            if position == self.target:
-                if cost <= best_score:
-                    best_score = cost
-                    all_best_paths.append(path)
-                else:
-                    return best_score, all_best_paths
-            for mc, mp, md in self.get_moves(position, direction):
-                if cost + mc <= visited.get(mp, 10**9) + self.rotation_cost:
-                    state = (cost + mc, mp, md, list(path) + [mp])
-                    heappush(queue, state)
-        return best_score, all_best_paths
-
-    def pprint(self, path: Sequence[Point]) -> str:
-        path = set(path)
-        lines = list()
-        for i in range(self.max_y):
-            line = []
-            for j in range(self.max_x):
-                if (i, j) in self.obstacles:
-                    line.append("#")
-                elif (i, j) in path:
-                    line.append("@")
-                else:
-                    line.append(".")
-            lines.append("".join(line))
-        return "\n".join(lines)
-
-
+    def state(self, cell: int, direction: int) -> int:
+        return cell * 4 + direction
+
+    def edges(self, state: int) -> list[tuple[int, int]]:
+        cell, direction = divmod(state, 4)
+        return [(self.state(mp, md), mc) for mc, mp, md in self.get_moves(cell, direction)]
+
+    @instrumented
+    def explore(self) -> tuple[int, list[int]]:
+        search = Search(len(self.grid) * 4)
+        start = self.state(self.position, self.direction)
+        with search.watch("maze"):
+            ends = search.dijkstra([start], self.edges, self.ends())
+        if not ends:
+            raise ValueError
+        return search.distance[ends[0]], [state // 4 for state in search.path(ends[0])]
+
+    @instrumented
+    def explore_p2(self) -> tuple[int, set[int]]:
+        """The best score and every cell on one of the best paths"""
+        search = Search(len(self.grid) * 4, all_parents=True)
+        start = self.state(self.position, self.direction)
+        with search.watch("maze"):
+            ends = search.dijkstra([start], self.edges, self.ends())
+        if not ends:
+            raise ValueError
+        return search.distance[ends[0]], {state // 4 for state in search.dag(ends)}
+
+    def ends(self) -> list[int]:
+        return [self.state(self.target, direction) for direction in range(4)]
+
+    def pprint(self, path: Iterable[int]) -> str:
+        canvas = Canvas.from_grid(self.grid)
+        canvas.paint(canvas.pixels != WALL, ".")
+        return canvas.put_cells(self.grid, path, "@").text()
+
+
+@instrumented
+@cached_parser(version=2)
 def parse_file(path: Path) -> Maze:
     with path.open("r") as fin:
         return Maze(fin.read().strip())
@@ -130,24 +101,22 @@ def part_one(path: Path) -> int:
     return cost
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
 def part_two(path: Path) -> int:
     maze = parse_file(path)
-    _, paths = maze.explore_p2()
-    seats = set()
-    for path in paths:
-        seats = seats.union(path)
+    _, seats = maze.explore_p2()
     print(seats)
     print(maze.pprint(seats))
     return len(seats)
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
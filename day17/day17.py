@@ -2,9 +2,12 @@ from pathlib import Path
 from typing import Literal
 from typing_extensions import Self
 import re
-from tqdm import tqdm
 from aoc_utils import timing
 
+from aoc.cache import cached_parser
+from aoc.instrument import instrumented
+from aoc.telemetry import progress
+
 
 class Computer:
     def __init__(
@@ -28,6 +31,8 @@ class Computer:
         return self.registers[register]
 
     @classmethod
+    @instrumented
+    @cached_parser(version=1)
     def from_file(cls, path: Path) -> Self:
         with path.open("r") as fin:
             text = fin.read()
@@ -78,13 +83,10 @@ def part_one(path: Path) -> int:
     return ",".join(list(map(str, computer.outputs)))
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
+@instrumented
 def solve(computer: Computer) -> int:
     """
     This solution is heavily linked with the computer program I got.
@@ -105,18 +107,7 @@ def solve(computer: Computer) -> int:
     computer = Computer({"A": min_stack, "B": 0, "C": 0}, computer.instructions)
     computer.execute()
     print(computer.outputs, computer.instructions)
-    print(min_stack)
-    exit()
-    for i in range(8):
-        register = {"A": 8**15 * i, "B": 0, "C": 0}
-        computer = Computer(register, computer.instructions)
-        computer.execute()
-        print(i, computer.outputs, computer.instructions)
-    exit()
-    total = 0
-    # for i, digit in enumerate(digits):
-    #     total += 8 ** (len(computer.instructions) - 1 - i) * digit
-    return total
+    return min_stack
 
 
 def part_two(path: Path) -> int:
@@ -144,10 +135,7 @@ def part_two(path: Path) -> int:
     computer.execute()
     print(computer)
     exit()
-    pbar = tqdm()
-    for i in count(start=8**15):
-        if i % 10**4 == 0:
-            pbar.update(10**4)
+    for i in progress(count(start=8**15), "candidates"):
         registers = {key: val for key, val in original_registers.items()}
         registers["A"] = i
         computer = Computer(registers, instructions)
@@ -158,6 +146,11 @@ def part_two(path: Path) -> int:
     return i
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -1,89 +1,133 @@
 from pathlib import Path
-from heapq import heappush, heappop
-from tqdm import tqdm
+from collections import Counter
 from typing import Optional
+import re
+
+import numpy as np
 
 from aoc_utils import timing
 
+from aoc import ingest
+from aoc.cache import cached_parser
+from aoc.grid import Grid
+from aoc.instrument import instrumented
+from aoc.render import Canvas
+from aoc.search import Search
+from aoc.telemetry import progress
+from aoc.unionfind import UnionFind
+
 Point = tuple[int, int]
 Vector = tuple[int, int]
 
 
+@instrumented
+@cached_parser(version=2)
+def parse_file(path: Path) -> list[Point]:
+    return list(map(tuple, ingest.table(path, 2).tolist()))
+
+
+FREE, CORRUPTED = map(ord, ".#")
+
+
 class MemoryMap:
-    directions = ((0, 1), (0, -1), (1, 0), (-1, 0))
+    """
+    Points are (x, y) as in the puzzle, internally the memory space is a grid
+    of flat indices whose border counts as corrupted.
+    """
 
     def __init__(self, filepath: Path, p1: bool = True):
-        with filepath.open("r") as fin:
-            txt = fin.read().strip()
-        max_bytes = 1024 if "example" not in filepath.name else 12
-        self.corrupted = set()
-        lines = txt.split("\n")
-        for line in lines[:max_bytes]:
-            x, y = line.strip().split(",")
-            self.corrupted.add((int(x), int(y)))
-        self.more_corrupted = list()
-        for line in lines[max_bytes:]:
-            x, y = line.strip().split(",")
-            self.more_corrupted.append((int(x), int(y)))
+        falling = parse_file(filepath)
         if "example" in filepath.name:
-            max_coord = 6
+            max_bytes, max_coord = 12, 6
+        elif (size := re.search(r"(\d+)x\d+-(\d+)", filepath.stem)) is not None:
+            # generated inputs carry the side and the bytes of part one in the name
+            max_bytes, max_coord = int(size.group(2)), int(size.group(1)) - 1
         else:
-            max_coord = 70
+            max_bytes, max_coord = 1024, 70
         self.max_x = max_coord
         self.max_y = max_coord
+        self.memory = Grid.full(max_coord + 1, max_coord + 1, FREE)
+        self.first_corrupted = falling[:max_bytes]
+        for p in self.first_corrupted:
+            self.corrupt(p)
+        self.more_corrupted = falling[max_bytes:]
 
-    def astar(self, start: Point, end: Point) -> Optional[list[Point]]:
-        frontier = [(self.manhattan(end, start), start, [start])]
-        visited = set()
-        while frontier:
-            _, p, path = heappop(frontier)
-            if p == end:
-                return path
-            for np in self.next(p):
-                next_path = path + [np]
-                if np not in visited:
-                    heappush(
-                        frontier,
-                        (self.manhattan(end, np), np, next_path),
-                    )
-                    visited.add(np)
-        return None
+    @property
+    def corrupted(self) -> set[Point]:
+        return {self.point(cell) for cell in self.memory.find(CORRUPTED)}
 
+    def cell(self, point: Point) -> int:
+        return self.memory.id(point[1], point[0])
+
+    def point(self, cell: int) -> Point:
+        y, x = self.memory.yx(cell)
+        return x, y
+
+    def corrupt(self, point: Point) -> None:
+        self.memory[self.cell(point)] = CORRUPTED
+
+    @instrumented
+    def astar(self, start: Point, end: Point) -> Optional[list[Point]]:
+        target = self.cell(end)
+        stride = self.memory.stride
+        target_y, target_x = divmod(target, stride)
+
+        def manhattan(cell: int) -> int:
+            y, x = divmod(cell, stride)
+            return abs(target_y - y) + abs(target_x - x)
+
+        search = Search(len(self.memory))
+        if not search.astar(self.cell(start), target, self.edges, manhattan):
+            return None
+        return [self.point(cell) for cell in search.path(target)]
+
+    def edges(self, cell: int) -> list[tuple[int, int]]:
+        cells = self.memory.cells
+        return [
+            (neighbour, 1)
+            for offset in self.memory.offsets
+            if cells[neighbour := cell + offset] == FREE
+        ]
+
+    @instrumented
     def find_blocker(self, start: Point, end: Point) -> Point:
-        for p in tqdm(self.more_corrupted):
-            self.corrupted.add(p)
-            if self.astar(start, end) is None:
+        """
+        Backwards: with every byte fallen, free them again from the last one
+        and merge the free regions they join. The byte that connects start
+        and end is the one that cut them apart.
+        """
+        # A byte may fall on the same cell twice, it is free once both are undone.
+        # Those of part one are never undone, their cells stay corrupted.
+        pending = Counter(map(self.cell, self.first_corrupted + self.more_corrupted))
+        for cell in pending:
+            self.memory[cell] = CORRUPTED
+        regions = UnionFind(len(self.memory))
+        free = self.memory.flat == FREE
+        # Right and down neighbours are enough to see every pair once
+        for offset in (1, self.memory.stride):
+            pairs = np.flatnonzero(free[:-offset] & free[offset:])
+            regions.union_all(zip(pairs.tolist(), (pairs + offset).tolist()))
+        source, target = self.cell(start), self.cell(end)
+        if regions.connected(source, target):
+            raise ValueError("No byte blocks the way")
+        cells = self.memory.cells
+        for p in progress(reversed(self.more_corrupted), "bytes", len(self.more_corrupted)):
+            cell = self.cell(p)
+            pending[cell] -= 1
+            if pending[cell]:
+                continue
+            self.memory[cell] = FREE
+            for neighbour in self.memory.neighbours(cell):
+                if cells[neighbour] == FREE:
+                    regions.union(cell, neighbour)
+            if regions.connected(source, target):
                 return p
-        raise ValueError
-
-    def next(self, point: Point) -> list[Point]:
-        candidates = []
-        for direction in self.directions:
-            np = point[0] + direction[0], point[1] + direction[1]
-            if (
-                0 <= np[0] <= self.max_x
-                and 0 <= np[1] <= self.max_y
-                and np not in self.corrupted
-            ):
-                candidates.append(np)
-        return candidates
-
-    def manhattan(self, p1: Point, p2: Point) -> int:
-        return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
+        # Then the way was cut by the bytes of part one, not by any of these
+        raise ValueError("Start and end are apart before the bytes of part two")
 
     def draw(self, path: list[Point]) -> None:
-        lines = list()
-        for y in range(self.max_y + 1):
-            line = list()
-            for x in range(self.max_x + 1):
-                if (x, y) in path:
-                    line.append("@")
-                elif (x, y) in self.corrupted:
-                    line.append("#")
-                else:
-                    line.append(".")
-            lines.append("".join(line))
-        print("\n".join(lines))
+        xs, ys = zip(*path)
+        print(Canvas.from_grid(self.memory).put(ys, xs, "@"))
 
 
 def part_one(path: Path) -> int:
@@ -92,10 +136,6 @@ def part_one(path: Path) -> int:
     return len(path) - 1
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
@@ -105,6 +145,11 @@ def part_two(path: Path) -> Point:
     return blocker
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -3,7 +3,11 @@ from collections import defaultdict
 
 from aoc_utils import timing
 
+from aoc.instrument import instrumented
+from aoc.memo import Memo
 
+
+@instrumented
 def parse_file(path: Path) -> tuple[dict[int, set[str]], list[str]]:
     with path.open("r") as fin:
         towels, patterns = fin.read().strip().split("\n\n")
@@ -14,22 +18,44 @@ def parse_file(path: Path) -> tuple[dict[int, set[str]], list[str]]:
     return towels_by_length, patterns
 
 
-def solve_p2(pattern: str, towels_by_length: dict[int, set[str]]) -> dict[int, int]:
-    possibilities = defaultdict(int, {0: 1})
-    possibilities[0] = 1
-    for i in range(0, len(pattern)):
-        for l, towels in towels_by_length.items():
-            if pattern[i : i + l] in towels:
-                possibilities[i + l] += possibilities.get(i, 0)
-    return possibilities
+# Patterns share a lot of suffixes, the counts depend on the towels, so they
+# only live as long as one input
+suffixes = Memo("day19.suffixes", max_entries=1 << 20)
+
 
+def count_suffix(pattern: str, towels_by_length: dict[int, set[str]]) -> int:
+    if not pattern:
+        return 1
+    if (count := suffixes.get(pattern)) is not None:
+        return count
+    count = 0
+    for l, towels in towels_by_length.items():
+        if pattern[:l] in towels:
+            count += count_suffix(pattern[l:], towels_by_length)
+    suffixes.put(pattern, count)
+    return count
 
-def part_one_and_two(path: Path) -> int:
+
+@instrumented
+def count_arrangements(path: Path) -> list[int]:
     towels_by_length, patterns = parse_file(path)
-    s = [solve_p2(pattern, towels_by_length)[len(pattern)] for pattern in patterns]
-    print(sum(v > 0 for v in s))
-    print(sum(s))
+    with suffixes.scope():
+        return [count_suffix(pattern, towels_by_length) for pattern in patterns]
+
+
+def part_one(path: Path) -> int:
+    return sum(v > 0 for v in count_arrangements(path))
+
+
+def part_two(path: Path) -> int:
+    return sum(count_arrangements(path))
+
 
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
 
-with timing():
-    part_one_and_two(Path(__file__).parent / "input.txt")
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
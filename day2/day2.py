@@ -1,14 +1,10 @@
 from pathlib import Path
+from typing import Callable
 
 from aoc_utils import timing
 
-
-def parse_file(path: Path) -> list[tuple[int, ...]]:
-    numbers = []
-    with path.open("r") as fin:
-        for line in fin.readlines():
-            numbers.append(tuple([int(val) for val in line.strip().split(" ")]))
-    return numbers
+from aoc import readers
+from aoc.instrument import instrumented
 
 
 def all_increasing(line: tuple[int, int, int, int, int]) -> bool:
@@ -41,23 +37,29 @@ def is_line_safe_with_dampening(line: tuple[int, ...]) -> bool:
     return False
 
 
-def part_one(path: Path) -> int:
-    numbers = parse_file(path)
-    return sum([is_line_safe(line) for line in numbers])
+@instrumented
+def count_safe(path: Path, is_safe: Callable[[tuple[int, ...]], bool]) -> int:
+    # Lines are independent, stream them. One phase for the whole file, timing
+    # every line would cost more than checking it
+    return sum(is_safe(line) for line in readers.int_rows(path))
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
+def part_one(path: Path) -> int:
+    return count_safe(path, is_line_safe)
+
 
 # Part two
 
 
 def part_two(path: Path) -> int:
-    lines = parse_file(path)
-    return sum([is_line_safe_with_dampening(line) for line in lines])
+    return count_safe(path, is_line_safe_with_dampening)
+
 
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -1,10 +1,12 @@
 from pathlib import Path
 from collections import defaultdict, deque
 from itertools import pairwise, product
-from functools import cache
 from math import inf
 from itertools import product
 
+from aoc.instrument import instrumented
+from aoc.memo import memoize
+
 
 Graph = dict[str, dict[str, str]]
 Transitions = dict[tuple[str, str], list[str]]
@@ -98,7 +100,8 @@ def press(code: str, nesting: int = 2) -> list[str]:
     return codes
 
 
-@cache
+# 25 pairs of keys per level, the bound is only a safety net
+@memoize(max_entries=4096)
 def press_dirpad(t: tuple[str, str], nesting: int):
     transitions = directional_transitions[t]
     if nesting == 1:
@@ -109,6 +112,14 @@ def press_dirpad(t: tuple[str, str], nesting: int):
     )
 
 
+def prepare(nesting: int = 25) -> None:
+    """Fill the cache of press_dirpad, it does not depend on the codes"""
+    for t in product(direction_graph, repeat=2):
+        for level in range(1, nesting + 1):
+            press_dirpad(t, level)
+
+
+@instrumented
 def press_smart(code: str, nesting: int = 2) -> int:
     codes = expand(code, numeric_transitions)
     values = []
@@ -117,16 +128,34 @@ def press_smart(code: str, nesting: int = 2) -> int:
     return min(values)
 
 
-with (Path(__file__).parent / "input.txt").open("r") as fin:
-    codes = fin.read().strip().split("\n")
+@instrumented
+def parse_file(path: Path) -> list[str]:
+    with path.open("r") as fin:
+        return fin.read().strip().split("\n")
+
+
+def complexity(code: str) -> int:
+    return int(code.replace("A", ""))
+
+
+def part_one(path: Path) -> int:
+    codes = parse_file(path)
+    solutions = {code: press(code, nesting=2) for code in codes}
+    return sum(
+        complexity(code) * min(len(sol) for sol in sols)
+        for code, sols in solutions.items()
+    )
+
+
+# Part two
+
+
+def part_two(path: Path) -> int:
+    codes = parse_file(path)
+    solutions_p2 = {code: press_smart(code, nesting=25) for code in codes}
+    return sum(complexity(code) * length for code, length in solutions_p2.items())
 
-solutions = {code: press(code, nesting=2) for code in codes}
-solutions_p2 = {code: press_smart(code, nesting=25) for code in codes}
 
-total = 0
-total_p2 = 0
-for code, sols in solutions.items():
-    total += int(code.replace("A", "")) * min(len(sol) for sol in sols)
-    total_p2 += int(code.replace("A", "")) * solutions_p2[code]
-print(total)
-print(total_p2)
+if __name__ == "__main__":
+    print(part_one(Path(__file__).parent / "input.txt"))
+    print(part_two(Path(__file__).parent / "input.txt"))
@@ -1,5 +1,10 @@
 from pathlib import Path
 from collections import deque, defaultdict
+from typing import Any, Iterable
+
+from aoc import readers
+from aoc.instrument import instrumented
+from aoc.pool import workers
 
 
 MAGIC = 16777216
@@ -30,7 +35,7 @@ def generate(n: int) -> int:
     return n
 
 
-def part_one(secrets: list[int]) -> int:
+def final_secrets(secrets: Iterable[int]) -> int:
     tot = 0
     for secret in secrets:
         for _ in range(2000):
@@ -39,7 +44,8 @@ def part_one(secrets: list[int]) -> int:
     return tot
 
 
-def part_two(secrets: list[int]) -> int:
+def bananas(secrets: Iterable[int]) -> dict[tuple[int, ...], int]:
+    """Bananas got from all the buyers for every sequence of four changes"""
     accumulator = defaultdict(int)
     for secret in secrets:
         seen = set()
@@ -54,11 +60,46 @@ def part_two(secrets: list[int]) -> int:
                 seen.add(idx)
             secret = n
             previous = value
-    return max(accumulator.values())
+    return accumulator
+
+
+def _per_range(objects: dict[str, Any], task: tuple[int, int, bool]) -> Any:
+    """final_secrets or bananas of the secrets in [start, stop), in a pool worker"""
+    start, stop, part2 = task
+    secrets = objects["secrets"][start:stop].tolist()
+    return bananas(secrets) if part2 else final_secrets(secrets)
+
+
+@instrumented
+def fan_out(path: Path, part2: bool = False) -> list[Any]:
+    """Split the secrets over AOC_WORKERS processes, which share the parsed array"""
+    # Imported here, single-process runs stream the secrets without NumPy
+    from aoc import ingest, shared
 
+    secrets = ingest.ints(path)
+    with shared.SharedArrays({"secrets": secrets}) as arrays:
+        tasks = [(start, stop, part2) for start, stop in shared.ranges(len(secrets))]
+        return shared.fan_out(_per_range, arrays, tasks)
+
+
+def part_one(path: Path) -> int:
+    if workers() > 1:
+        return sum(fan_out(path))
+    # Secrets are independent, stream them
+    return final_secrets(readers.ints(path))
+
+
+def part_two(path: Path) -> int:
+    if workers() > 1:
+        accumulator = defaultdict(int)
+        for partial in fan_out(path, part2=True):
+            for sequence, count in partial.items():
+                accumulator[sequence] += count
+    else:
+        accumulator = bananas(readers.ints(path))
+    return max(accumulator.values())
 
-with (Path(__file__).parent / "input.txt").open("r") as f:
-    secrets = list(map(int, f.read().strip().split("\n")))
 
-# print(part_one(secrets))
-print(part_two(secrets))
+if __name__ == "__main__":
+    # print(part_one(Path(__file__).parent / "input.txt"))
+    print(part_two(Path(__file__).parent / "input.txt"))
@@ -1,6 +1,10 @@
 from collections import defaultdict
+from pathlib import Path
 from functools import partial
 
+from aoc.instrument import instrumented
+from aoc.unionfind import components
+
 
 def get_graph(txt: str) -> dict[str, set[str]]:
     graph = defaultdict(set)
@@ -10,6 +14,7 @@ def get_graph(txt: str) -> dict[str, set[str]]:
     return graph
 
 
+@instrumented
 def find_set_of_three_connected_computers(
     graph: dict[str, set[str]]
 ) -> set[tuple[str, str, str]]:
@@ -22,6 +27,7 @@ def find_set_of_three_connected_computers(
     return sets
 
 
+@instrumented
 def find_fully_connected_groups(graph: dict[str, set[str]]) -> list[set[str]]:
     all_groups = set()
     for source, targets in graph.items():
@@ -35,14 +41,33 @@ def find_fully_connected_groups(graph: dict[str, set[str]]) -> list[set[str]]:
     return all_groups
 
 
-if __name__ == "__main__":
-    from pathlib import Path
+@instrumented
+def parse_file(path: Path) -> dict[str, set[str]]:
+    with open(path, "r") as f:
+        return get_graph(f.read())
 
-    with open(Path(__file__).parent / "input.txt", "r") as f:
-        txt = f.read()
-    graph = get_graph(txt)
+
+def part_one(path: Path) -> int:
+    graph = parse_file(path)
     sets = find_set_of_three_connected_computers(graph)
-    print(sum(any(elem.startswith("t") for elem in group) for group in sets))
-    fully_connected = find_fully_connected_groups(graph)
-    longest_group = sorted(fully_connected, key=lambda x: len(x))[-1]
-    print(",".join(longest_group))
+    return sum(any(elem.startswith("t") for elem in group) for group in sets)
+
+
+def part_two(path: Path) -> str:
+    graph = parse_file(path)
+    longest_group = ()
+    # A group never spans two components, nor beats the size of its own
+    edges = ((source, target) for source, targets in graph.items() for target in targets)
+    for component in components(edges):
+        if len(component) <= len(longest_group):
+            break
+        subgraph = {node: graph[node] for node in component}
+        fully_connected = find_fully_connected_groups(subgraph)
+        longest_in_component = sorted(fully_connected, key=lambda x: len(x))[-1]
+        longest_group = max(longest_group, longest_in_component, key=len)
+    return ",".join(longest_group)
+
+
+if __name__ == "__main__":
+    print(part_one(Path(__file__).parent / "input.txt"))
+    print(part_two(Path(__file__).parent / "input.txt"))
@@ -4,6 +4,8 @@ from pathlib import Path
 from collections import defaultdict
 import re
 
+from aoc.instrument import instrumented
+
 
 operations = {
     "AND": lambda x, y: x & y,
@@ -11,14 +13,18 @@ operations = {
     "XOR": lambda x, y: x ^ y,
 }
 
+# Pairs of gates whose outputs are swapped
+SWAPS = 4
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Node:
     operation: str
     left: str
     right: str
 
 
+@instrumented
 def parse(path: Path) -> Wires:
     with path.open("r") as fin:
         txt = fin.read()
@@ -45,6 +51,7 @@ class Wires:
             self.parents[t] = ((l, r), op)
         self.connections = {k: sorted(v) for k, v in self.connections.items()}
 
+    @instrumented
     def do(self) -> dict[str, int]:
         new_values = self.values
         while new_values := self.accumulate(new_values):
@@ -108,6 +115,7 @@ class Wires:
                 possible_issues.append((x, and_t, xor_t))
         return
 
+    @instrumented
     def check_basic_ops(self) -> list[tuple[str, str]]:
         violations = []
         for x, y in zip(self.xs, self.ys):
@@ -118,6 +126,35 @@ class Wires:
                 violations.append((x, y))
         return violations
 
+    @instrumented
+    def misplaced_outputs(self) -> list[str]:
+        """
+        Outputs that do not fit a ripple carry adder. Past bit 0, bit i is
+            x_i XOR y_i -> s    x_i AND y_i -> c    s XOR carry -> z_i
+            s AND carry -> d    c OR d -> next carry (z_n for the last bit)
+        so z wires come from XORs of a carry but the last one, other XORs feed
+        XORs, and ANDs feed ORs. A swap of two outputs breaks one of these on both wires.
+        """
+        last = max(wire for wire in self.parents if wire.startswith("z"))
+        first_bit = {self.xs[0], self.ys[0]}
+        misplaced = []
+        for output, ((left, right), op) in self.parents.items():
+            from_inputs = left[0] in "xy" and right[0] in "xy"
+            feeds = {next_op for next_op, _, _ in self.connections.get(output, [])}
+            if output.startswith("z"):
+                wrong = op != ("OR" if output == last else "XOR") or (
+                    from_inputs and {left, right} != first_bit
+                )
+            elif op == "XOR":
+                wrong = not from_inputs or "XOR" not in feeds
+            elif op == "AND":
+                wrong = {left, right} != first_bit and "OR" not in feeds
+            else:
+                wrong = False
+            if wrong:
+                misplaced.append(output)
+        return sorted(misplaced)
+
     @property
     def xs(self) -> list[str]:
         return sorted([x for x in self.connections if x.startswith("x")])
@@ -127,11 +164,21 @@ class Wires:
         return sorted([y for y in self.connections if y.startswith("y")])
 
 
-if __name__ == "__main__":
-    path = Path(__file__).parent / "input.txt"
+def part_one(path: Path) -> int:
     wires = parse(path)
     wires.do()
     z = [v for k, v in dict(sorted(wires.values.items())).items() if k.startswith("z")]
-    print(sum(2**i * v for i, v in enumerate(z)))
-    wires.navigate(wires.connections)
-    print(",".join(sorted("thm,z08,wss,wrm,z22,hwq,gbs,z29".split(","))))
+    return sum(2**i * v for i, v in enumerate(z))
+
+
+def part_two(path: Path) -> str:
+    wires = parse(path)
+    misplaced = wires.misplaced_outputs()
+    if len(misplaced) != 2 * SWAPS:
+        raise ValueError(f"Expected {2 * SWAPS} swapped wires, found {len(misplaced)}")
+    return ",".join(misplaced)
+
+
+if __name__ == "__main__":
+    print(part_one(Path(__file__).parent / "input.txt"))
+    print(part_two(Path(__file__).parent / "input.txt"))
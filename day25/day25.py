@@ -1,10 +1,13 @@
 from pathlib import Path
 from itertools import product
 
+from aoc.instrument import instrumented
+
 Key = tuple[int, int, int, int, int]
 Lock = tuple[int, int, int, int, int]
 
 
+@instrumented
 def parse(path: Path) -> tuple[list[Lock], list[Key]]:
     with path.open("r") as fin:
         txt = fin.read()
@@ -28,6 +31,7 @@ def parse_one(lines: list[str]) -> Lock | Key:
     return tuple(lock_or_key)
 
 
+@instrumented
 def find_compatible(locks: list[Lock], keys: list[Key]) -> list[tuple[Lock, Key]]:
     fitting = list()
     for lock, key in product(locks, keys):
@@ -36,7 +40,10 @@ def find_compatible(locks: list[Lock], keys: list[Key]) -> list[tuple[Lock, Key]
     return fitting
 
 
+def part_one(path: Path) -> int:
+    locks, keys = parse(path)
+    return len(find_compatible(locks, keys))
+
+
 if __name__ == "__main__":
-    locks, keys = parse(Path(__file__).parent / "input.txt")
-    fitting = find_compatible(locks, keys)
-    print(len(fitting))
+    print(part_one(Path(__file__).parent / "input.txt"))
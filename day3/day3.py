@@ -3,13 +3,17 @@ import re
 
 from aoc_utils import timing
 
+from aoc.instrument import instrumented
 
+
+@instrumented
 def parse_file(path: Path) -> str:
     with path.open("r") as f:
         text = f.read()
     return text
 
 
+@instrumented
 def split_by_do_or_dont(text: str) -> list[str]:
     "return the sequences that should be activated only"
     splitted_by_dont = text.split("don't()")
@@ -19,6 +23,7 @@ def split_by_do_or_dont(text: str) -> list[str]:
     return valid_sequences
 
 
+@instrumented
 def execute_mul(text: str) -> int:
     pattern = pattern = re.compile(r"mul\((\d{1,3}),(\d{1,3})\)")
     operations = re.findall(pattern, text)
@@ -30,10 +35,6 @@ def part_one(path: Path) -> int:
     return execute_mul(text)
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
@@ -43,6 +44,11 @@ def part_two(path: Path) -> int:
     return sum(map(execute_mul, valid_sequences))
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -4,7 +4,10 @@ from collections import defaultdict
 
 from aoc_utils import timing
 
+from aoc.instrument import instrumented
 
+
+@instrumented
 def parse_file(path: Path) -> str:
     with path.open("r") as fin:
         return fin.read()
@@ -16,6 +19,7 @@ def find_on_line(line: str) -> int:
     return len(re.findall(r"XMAS", line)) + len(re.findall(r"SAMX", line))
 
 
+@instrumented
 def get_vertical_lines(lines: list[str]) -> list[str]:
     vertical_lines = defaultdict(list)
     for line in lines:
@@ -25,6 +29,7 @@ def get_vertical_lines(lines: list[str]) -> list[str]:
     return vertical_lines
 
 
+@instrumented
 def get_diagonal_lines(lines: list[str]) -> list[str]:
     number_of_rows = len(lines)
     number_of_columns = (s := set(len(line) for line in lines)).pop()
@@ -60,13 +65,10 @@ def part_one(path: Path) -> int:
     return horizontal + vertical + diagonal + other_diagonal
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
+@instrumented
 def scan_x_mas(lines: list[str]) -> int:
     matches = 0
     # Yes, we could use numpy and call it a day
@@ -101,6 +103,11 @@ def part_two(path: Path) -> int:
     return scan_x_mas(lines)
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -1,17 +1,21 @@
 from __future__ import annotations
 from pathlib import Path
 from collections import defaultdict
-from functools import cached_property
 from typing import Optional
 
 from aoc_utils import timing
 
+from aoc.cache import cached_parser
+from aoc.instrument import instrumented
+
 Rule = dict[int, set[int]]
 PrecedingPageRules = dict[int, set[int]]
 
 
 class Manual:
     # If I was fully awake this would inherit from list
+    __slots__ = ("pages",)
+
     def __init__(self, pages: list[int]):
         self.pages = pages
 
@@ -25,7 +29,7 @@ class Manual:
     def from_line(cls, line: str) -> Manual:
         return Manual(list(map(int, line.strip().split(","))))
 
-    @cached_property
+    @property
     def middle_page(self):
         return self.pages[len(self) // 2]
 
@@ -56,19 +60,20 @@ class Manual:
         This yielded valid manuals, that did not violate any rule, but that gave the wrong result!
         Also, this technique worked well on the example.
         """
-        new_manual = self
+        new_manual = Manual(self.pages.copy())
+        pages = new_manual.pages
         # Efficiency consideration, this scales O(N^2)
         # Maybe it could be made efficient by not checking anymore
         # before the indexes that were checked already
         # However, I am not sure it requires some assumptions on the rules to be consistent
         while (swap_tuple := new_manual.violates_rule(rules)) is not None:
             a, b = swap_tuple
-            new_list = new_manual.pages.copy()
-            new_list[a], new_list[b] = new_list[b], new_list[a]
-            new_manual = Manual(new_list)
+            pages[a], pages[b] = pages[b], pages[a]
         return new_manual
 
 
+@instrumented
+@cached_parser(version=2)
 def parse_file(path: Path) -> tuple[PrecedingPageRules, list[Manual]]:
     rules = defaultdict(set)
     manuals = list()
@@ -87,10 +92,6 @@ def part_one(path: Path) -> int:
     return sum(manual.middle_page for manual in manuals if manual.respects_rules(rules))
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
@@ -103,6 +104,11 @@ def part_two(path: Path) -> int:
     return sum(manual.middle_page for manual in fixed)
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
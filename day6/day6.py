@@ -1,126 +1,196 @@
 from __future__ import annotations
-import copy
 from pathlib import Path
-from tqdm import tqdm
-from itertools import product
+from typing import Any, Callable, Sequence
 
+import numpy as np
 
 from aoc_utils import timing
 
-MIN_X = 0
-MAX_X = 130
-MIN_Y = 0
-MAX_Y = 130
+from aoc.cache import cached_parser
+from aoc.engines import FAST, REFERENCE, engine
+from aoc.grid import ARROWS, OUTSIDE, Grid
+from aoc import shared
+from aoc.instrument import instrumented
+from aoc.telemetry import progress
 
-transitions = {"^": ">", "v": "<", ">": "v", "<": "^"}
-
-
-movements = {
-    "^": (-1, 0),
-    "v": (1, 0),
-    ">": (0, 1),
-    "<": (0, -1),
-}
-
-
-def add_direction(
-    point: tuple[int, int], direction: tuple[int, int]
-) -> tuple[int, int]:
-    return point[0] + direction[0], point[1] + direction[1]
+OBSTRUCTION = ord("#")
 
 
 class Map:
     def __init__(self, lines: list[str]):
-        self.obstructions = set()
-        for i, line in enumerate(lines):
-            for j, char in enumerate(line):
-                if char == "#":
-                    self.obstructions.add((i, j))
-                if char in movements:
-                    self.position = (i, j)
-                    self.direction = char
-        self.max_y = len(lines)
-        self.max_x = len(lines[0])
-
-    def add_obstruction(self, obstruction: tuple[int, int]) -> Map:
-        new_obstructions = {obstruction}.union(self.obstructions)
-        # Note: this must be done properly with a proper init
-        new_map = copy.deepcopy(self)
-        new_map.obstructions = new_obstructions
-        return new_map
-
-    def in_bounds(self, position: tuple[int, int]) -> bool:
-        return (
-            position[0] >= 0
-            and position[0] < self.max_x
-            and position[1] >= 0
-            and position[1] < self.max_y
-        )
-
-
-def explore(my_map: Map) -> set:
+        self.grid = Grid.from_lines(lines)
+        for arrow, direction in ARROWS.items():
+            if len(guard := self.grid.find(arrow)):
+                self.position = int(guard[0])
+                self.direction = direction
+        self.max_y = self.grid.height
+        self.max_x = self.grid.width
+
+    @property
+    def obstructions(self) -> set[tuple[int, int]]:
+        return {self.grid.yx(cell) for cell in self.grid.find(OBSTRUCTION)}
+
+
+@instrumented
+def explore(my_map: Map) -> set[int]:
+    """The cells visited by the guard, as flat grid indices"""
+    cells = my_map.grid.cells
+    offsets = my_map.grid.offsets
     current = my_map.position
     direction = my_map.direction
-    explored = {my_map.position}
+    explored = {current}
     while True:
-        next_position = add_direction(current, movements[direction])
-        if not my_map.in_bounds(next_position):
+        next_position = current + offsets[direction]
+        if cells[next_position] == OUTSIDE:
             return explored
-        if next_position not in my_map.obstructions:
+        if cells[next_position] != OBSTRUCTION:
             explored.add(next_position)
             current = next_position
         else:
-            direction = transitions[direction]
+            direction = (direction + 1) % 4
 
 
 def has_loop(
-    free_spaces: set[tuple[int, int]],
-    obstructions: set[tuple[int, int]],
-    new_obstruction: tuple[int, int],
-    position: tuple[int, int],
-    direction: str,
+    cells: memoryview,
+    offsets: tuple[int, ...],
+    new_obstruction: int,
+    position: int,
+    direction: int,
 ) -> bool:
     current = position
-    explored = {(position, direction)}
-    free_spaces.remove(new_obstruction)
-    while True:
-        next_position = (
-            current[0] + movements[direction][0],
-            current[1] + movements[direction][1],
-        )
-        if next_position in free_spaces:
-            if (next_position, direction) in explored:
-                free_spaces.add(new_obstruction)
-                return True
-            else:
-                explored.add((next_position, direction))
+    # A loop has to go through one of its turns twice, no need to remember every step
+    turns = set()
+    cells[new_obstruction] = OBSTRUCTION
+    try:
+        while True:
+            next_position = current + offsets[direction]
+            cell = cells[next_position]
+            if cell == OUTSIDE:
+                return False
+            if cell != OBSTRUCTION:
                 current = next_position
-        else:
-            if next_position in obstructions or next_position == new_obstruction:
-                direction = transitions[direction]
             else:
-                free_spaces.add(new_obstruction)
-                return False
-
-
-def find_loop_makers(my_map: Map) -> set[tuple[int, int]]:
-    free_spaces = set(product(range(0, MAX_X), range(0, MAX_Y))).difference(
-        my_map.obstructions
-    )
+                if (state := current * 4 + direction) in turns:
+                    return True
+                turns.add(state)
+                direction = (direction + 1) % 4
+    finally:
+        cells[new_obstruction] = ord(".")
+
+
+def _facing_up(array: np.ndarray, direction: int) -> np.ndarray:
+    """A view of the padded map in which walking `direction` goes up the rows"""
+    return (array, array.T[::-1], array[::-1], array.T)[direction]
+
+
+@instrumented
+def jump_tables(grid: Grid) -> np.ndarray:
+    """
+    Per direction and cell, the last cell the guard reaches walking straight
+    from there: the one before an obstruction, or ~cell when it then leaves
+    the map. Only meaningful on free cells.
+    """
+    padded = grid.padded
+    blocked = (padded == OBSTRUCTION) | (padded == OUTSIDE)
+    ids = np.arange(padded.size).reshape(padded.shape)
+    tables = np.empty((len(grid.offsets), padded.size), dtype=np.int64)
+    for direction, table in enumerate(tables):
+        cells, stops, ahead = (_facing_up(a, direction) for a in (padded, ids, blocked))
+        rows = np.arange(cells.shape[0])[:, None]
+        columns = np.arange(cells.shape[1])[None, :]
+        # Closest blocked row above, a free cell always has one thanks to the border
+        wall = np.maximum.accumulate(np.where(ahead, rows, 0), axis=0)
+        last = stops[np.minimum(wall + 1, cells.shape[0] - 1), columns]
+        table[stops] = np.where(cells[wall, columns] == OUTSIDE, ~last, last)
+    return tables
+
+
+def has_loop_jumping(
+    jumps: Sequence[Sequence[int]],
+    offsets: tuple[int, ...],
+    new_obstruction: int,
+    position: int,
+    direction: int,
+) -> bool:
+    """has_loop, a whole straight line at a time"""
+    current = position
+    turns = set()
+    while True:
+        offset = offsets[direction]
+        stop = jumps[direction][current]
+        last = stop if stop >= 0 else ~stop
+        # The jump tables know nothing of the new obstruction, is it on the way?
+        ahead, rest = divmod(new_obstruction - current, offset)
+        if rest == 0 and 0 < ahead <= (last - current) // offset:
+            current = new_obstruction - offset
+        elif stop < 0:
+            return False
+        else:
+            current = stop
+        if (state := current * 4 + direction) in turns:
+            return True
+        turns.add(state)
+        direction = (direction + 1) % 4
+
+
+def _loop_makers(objects: dict[str, Any], task: tuple) -> list[int]:
+    """The candidates in [start, stop) that make a loop, in a pool worker"""
+    start, stop, offsets, position, direction = task
+    # memoryviews index into plain ints, straight from the shared pages
+    jumps = [memoryview(table) for table in objects["jumps"]]
+    return [
+        new_obstruction
+        for new_obstruction in objects["candidates"][start:stop].tolist()
+        if has_loop_jumping(jumps, offsets, new_obstruction, position, direction)
+    ]
+
+
+@instrumented
+def find_loop_makers_shared(my_map: Map, candidates: set[int]) -> set[tuple[int, int]]:
+    """find_loop_makers over AOC_WORKERS processes, which share the jump tables"""
+    jumps = jump_tables(my_map.grid)
+    ordered = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+    with shared.SharedArrays({"jumps": jumps, "candidates": ordered}) as arrays:
+        tasks = [
+            (start, stop, my_map.grid.offsets, my_map.position, my_map.direction)
+            for start, stop in shared.ranges(len(ordered))
+        ]
+        found = shared.fan_out(_loop_makers, arrays, tasks)
+    return {my_map.grid.yx(cell) for cells in found for cell in cells}
+
+
+@instrumented
+def find_loop_makers(my_map: Map, jumping: bool = True) -> set[tuple[int, int]]:
     explored = explore(my_map)
-    valid = set()
-    for new_obstruction in tqdm(explored):
-        if has_loop(
-            free_spaces,
-            my_map.obstructions,
-            new_obstruction,
-            my_map.position,
-            my_map.direction,
-        ):
-            valid.add(new_obstruction)
-    return valid
-
-
+    # The guard would notice an obstruction placed on its starting cell
+    explored.discard(my_map.position)
+    if jumping and shared.workers() > 1:
+        return find_loop_makers_shared(my_map, explored)
+    offsets = my_map.grid.offsets
+    loops: Callable[[int], bool]
+    if jumping:
+        jumps = jump_tables(my_map.grid).tolist()
+
+        def loops(new_obstruction: int) -> bool:
+            return has_loop_jumping(
+                jumps, offsets, new_obstruction, my_map.position, my_map.direction
+            )
+
+    else:
+        cells = my_map.grid.copy().cells
+
+        def loops(new_obstruction: int) -> bool:
+            return has_loop(cells, offsets, new_obstruction, my_map.position, my_map.direction)
+
+    return {
+        my_map.grid.yx(new_obstruction)
+        for new_obstruction in progress(explored, "candidates")
+        if loops(new_obstruction)
+    }
+
+
+@instrumented
+@cached_parser(version=2)
 def parse_file(path: Path) -> Map:
     with path.open("r") as fin:
         lines = fin.readlines()
@@ -133,19 +203,29 @@ def part_one(path: Path) -> int:
     return len(explored)
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
+@engine(2, FAST)
 def part_two(path: Path) -> int:
     my_map = parse_file(path)
     valid = find_loop_makers(my_map)
     return len(valid)
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+@engine(2, REFERENCE)
+def part_two_reference(path: Path) -> int:
+    """Steps the guard one cell at a time"""
+    my_map = parse_file(path)
+    valid = find_loop_makers(my_map, jumping=False)
+    return len(valid)
+
+
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -1,19 +1,12 @@
 from pathlib import Path
-from tqdm import tqdm
+from typing import Any, Iterable
 
 from aoc_utils import timing
 
-Calibrations = list[tuple[int, list[int]]]
-
-
-def parse_file(path: Path) -> Calibrations:
-    calibrations = []
-    with path.open("r") as fin:
-        for line in fin.readlines():
-            key, vals = line.split(":")
-            vals = list(map(int, vals.strip().split(" ")))
-            calibrations.append((int(key), vals))
-    return calibrations
+from aoc import readers
+from aoc.instrument import instrumented
+from aoc.pool import workers
+from aoc.telemetry import progress
 
 
 def get_next(val1: int, val2: int, part2: bool = False) -> tuple[int, ...]:
@@ -38,30 +31,58 @@ def get_valid_contribution(total: int, factors: list[int], part2: bool = False)
     return total * int(total in queue)
 
 
-def part_one(path: Path) -> int:
-    calibrations = parse_file(path)
+@instrumented
+def total_valid(calibrations: Iterable[tuple[int, list[int]]], part2: bool = False) -> int:
     total = 0
-    for left, right in tqdm(calibrations):
-        total += get_valid_contribution(left, right)
+    for left, right in progress(calibrations, "calibrations"):
+        total += get_valid_contribution(left, right, part2)
     return total
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
+def _total_rows(objects: dict[str, Any], task: tuple[int, int, bool]) -> int:
+    """total_valid of the rows in [start, stop), in a pool worker"""
+    start, stop, part2 = task
+    rows = objects["rows"].slice(start, stop).tolist()
+    return total_valid(((row[0], row[1:]) for row in rows), part2)
+
+
+@instrumented
+def total_valid_shared(path: Path, part2: bool = False) -> int:
+    """total_valid over AOC_WORKERS processes, which share the parsed rows"""
+    # Imported here, single-process runs stream the rows without NumPy
+    from aoc import ingest, shared
+
+    try:
+        rows = ingest.rows(path)
+    except OverflowError:
+        # Test values past int64 cannot be shared as an array, stream them here
+        return total_valid(readers.keyed_rows(path), part2)
+    with shared.SharedArrays({"rows": rows}) as arrays:
+        tasks = [(start, stop, part2) for start, stop in shared.ranges(len(rows))]
+        return sum(shared.fan_out(_total_rows, arrays, tasks))
+
+
+def part_one(path: Path) -> int:
+    if workers() > 1:
+        return total_valid_shared(path)
+    # Calibrations are independent, stream them
+    return total_valid(readers.keyed_rows(path))
+
 
 # Part two
 
 
 def part_two(path: Path) -> int:
-    calibrations = parse_file(path)
-    total = 0
-    for left, right in tqdm(calibrations):
-        if get_valid_contribution(left, right, part2=True):
-            total += left
-    return total
+    if workers() > 1:
+        return total_valid_shared(path, part2=True)
+    return total_valid(readers.keyed_rows(path), part2=True)
+
 
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
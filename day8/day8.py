@@ -1,13 +1,20 @@
 from pathlib import Path
 from collections import defaultdict
-from itertools import product, count
+from itertools import combinations
+
+import numpy as np
 
 from aoc_utils import timing
 
+from aoc.grid import Grid
+from aoc.instrument import instrumented
+from aoc.render import Canvas
+
 Antennas = dict[str, list[tuple[int, int]]]
 Point = tuple[int, int]
 
 
+@instrumented
 def parse_file(path: Path) -> tuple[Antennas, int, int]:
     with path.open("r") as fin:
         text = fin.read()
@@ -23,82 +30,55 @@ def parse_file(path: Path) -> tuple[Antennas, int, int]:
 
 
 def find_pair_resonances(
-    first: Point, second: Point, max_x: int, max_y: int, part2: bool = False
-) -> set[Point]:
-    resonances = set()
+    first: Point, second: Point, resonances: Grid, part2: bool = False
+) -> None:
+    """Marks the resonances of a pair of antennas on the `resonances` grid"""
     diff = second[0] - first[0], second[1] - first[1]
-    iterator = count() if part2 else range(2, 3)
-    for i in iterator:
-        resonance = first[0] + i * diff[0], first[1] + i * diff[1]
-        if 0 <= resonance[0] < max_x and 0 <= resonance[1] < max_y:
-            resonances.add(resonance)
-        else:
-            break
-    for i in iterator:
-        resonance = second[0] - i * diff[0], second[1] - i * diff[1]
-        if 0 <= resonance[0] < max_x and 0 <= resonance[1] < max_y:
-            resonances.add(resonance)
-        else:
-            break
-    return resonances
-
-
-def find_class_resonances(
-    points: list[Point], max_x: int, max_y: int, part2: bool = False
-) -> set[Point]:
-    resonances = set()
-    for first, second in product(points, points):
-        if first == second:
-            continue
-        resonances = resonances.union(
-            find_pair_resonances(first, second, max_x, max_y, part2)
-        )
-    return resonances
+    # Multiples of the distance that may still be on the map, the rest is masked out
+    reach = max(resonances.width, resonances.height) if part2 else 2
+    multiples = np.arange(0 if part2 else 2, reach + 1)
+    for origin, sign in ((first, 1), (second, -1)):
+        xs = origin[0] + sign * multiples * diff[0]
+        ys = origin[1] + sign * multiples * diff[1]
+        on_map = (0 <= xs) & (xs < resonances.width) & (0 <= ys) & (ys < resonances.height)
+        resonances.flat[resonances.ids(ys[on_map], xs[on_map])] = True
 
 
+@instrumented
 def find_all_resonances(
     antennas: Antennas, max_x: int, max_y: int, part2: bool = False
-):
-    resonances = set()
+) -> Grid:
+    resonances = Grid.full(max_y, max_x, False, dtype=bool)
     for _, points in antennas.items():
-        resonances = resonances.union(
-            find_class_resonances(points, max_x, max_y, part2)
-        )
+        for first, second in combinations(points, 2):
+            find_pair_resonances(first, second, resonances, part2)
     return resonances
 
 
-def print_resonances(resonances: set[Point], max_x: int, max_y: int) -> None:
-    lines = []
-    for i in range(max_y):
-        line = []
-        for j in range(max_x):
-            char = "." if (j, i) not in resonances else "#"
-            line.append(char)
-        line = "".join(line)
-        lines.append(line)
-    lines = "\n".join(lines)
-    print(lines)
+def print_resonances(resonances: Grid) -> None:
+    print(Canvas.from_grid(resonances, ".#"))
 
 
 def part_one(path: Path) -> int:
     antennas, max_x, max_y = parse_file(path)
     resonances = find_all_resonances(antennas, max_x, max_y, part2=False)
-    return len(resonances)
+    return int(resonances.flat.sum())
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
 def part_two(path: Path) -> int:
     antennas, max_x, max_y = parse_file(path)
     resonances = find_all_resonances(antennas, max_x, max_y, part2=True)
-    return len(resonances)
+    return int(resonances.flat.sum())
+
 
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -1,14 +1,22 @@
+import heapq
 from pathlib import Path
 from typing import Optional
 
 from aoc_utils import timing
 
+from aoc.cache import cached_parser
+from aoc.engines import FAST, REFERENCE, engine
+from aoc.instrument import instrumented
 
+
+@instrumented
+@cached_parser(version=1)
 def parse_file(path: Path) -> list[int]:
     with path.open("r") as fin:
         return list(map(int, fin.read().strip()))
 
 
+@instrumented
 def expand(fs: list[int]) -> list[Optional[int]]:
     # This naive approach will probably fail me in part two...
     extended_fs = []
@@ -21,6 +29,7 @@ def expand(fs: list[int]) -> list[Optional[int]]:
     return extended_fs
 
 
+@instrumented
 def compactify(fs: list[Optional[int]]) -> list[int]:
     compact_fs = fs.copy()
     free_spaces = [i for i, val in enumerate(fs) if val is None]
@@ -49,10 +58,6 @@ def part_one(path: Path) -> int:
     return sum(i * val for i, val in enumerate(compact_fs))
 
 
-with timing():
-    result = part_one(Path(__file__).parent / "input.txt")
-print(result)
-
 # Part two
 
 
@@ -65,6 +70,7 @@ def find_span(arr: list[Optional[int]]) -> int:
     return 0
 
 
+@instrumented
 def compactify_two(fs: list[int]) -> list[Optional[int]]:
     original_fs = []
     new_fs = []
@@ -106,12 +112,58 @@ def compactify_two(fs: list[int]) -> list[Optional[int]]:
     return expanded_fs
 
 
+@instrumented
+def checksum_two(fs: list[int]) -> int:
+    """
+    compactify_two without building the disk: the free spans of every size
+    sit in a heap of their starts, a file goes to the leftmost span that
+    fits (at most one per size to look at) and what it leaves free goes back
+    to the heap of its new size.
+    """
+    free: list[list[int]] = [[] for _ in range(10)]
+    files = []
+    start = 0
+    for i, span in enumerate(fs):
+        if i % 2 == 0:
+            files.append((start, span))
+        elif span:
+            # In order of start already, so a valid heap
+            free[span].append(start)
+        start += span
+    checksum = 0
+    for fid in range(len(files) - 1, -1, -1):
+        fstart, fspan = files[fid]
+        best, best_span = fstart, 0
+        for span in range(fspan, 10):
+            if free[span] and free[span][0] < best:
+                best, best_span = free[span][0], span
+        if best_span:
+            heapq.heappop(free[best_span])
+            if best_span > fspan:
+                heapq.heappush(free[best_span - fspan], best + fspan)
+        # Sum of the positions best .. best + fspan - 1, times the id
+        checksum += fid * (fspan * best + fspan * (fspan - 1) // 2)
+    return checksum
+
+
+@engine(2, FAST)
 def part_two(path: Path) -> int:
+    fs = parse_file(path)
+    return checksum_two(fs)
+
+
+@engine(2, REFERENCE)
+def part_two_reference(path: Path) -> int:
     fs = parse_file(path)
     extended_fs = compactify_two(fs)
     return sum(i * val for i, val in enumerate(extended_fs) if val is not None)
 
 
-with timing():
-    result = part_two(Path(__file__).parent / "input.txt")
-print(result)
+if __name__ == "__main__":
+    with timing():
+        result = part_one(Path(__file__).parent / "input.txt")
+    print(result)
+
+    with timing():
+        result = part_two(Path(__file__).parent / "input.txt")
+    print(result)
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from day1.day1 import LEFT, RIGHT, LocationLists, part_one_reference, part_two_reference
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setenv("AOC_CACHE", "0")
+
+
+@pytest.mark.parametrize("seed, largest", [(0, 5), (1, 60), (2, 10**6)])
+def test_matches_reference_after_every_update(tmp_path, seed, largest):
+    rng = random.Random(seed)
+    online, lists = LocationLists(), ([], [])
+    path = tmp_path / "input.txt"
+    for _ in range(400):
+        side = rng.choice((LEFT, RIGHT))
+        if lists[side] and rng.random() < 0.4:
+            location = rng.choice(lists[side])
+            lists[side].remove(location)
+            online.delete(side, location)
+        else:
+            location = rng.randrange(largest)
+            lists[side].append(location)
+            online.insert(side, location)
+        if len(lists[LEFT]) == len(lists[RIGHT]):
+            path.write_text("".join(f"{a}   {b}\n" for a, b in zip(*lists)))
+            assert online.distance == part_one_reference(path)
+            assert online.similarity == part_two_reference(path)
+        else:
+            # An input file cannot hold lists of different lengths, zip them as part_one does
+            left, right = sorted(lists[LEFT]), sorted(lists[RIGHT])
+            assert online.distance == sum(abs(b - a) for a, b in zip(left, right))
+            assert online.similarity == sum(a * right.count(a) for a in left)
+
+
+def test_unequal_lengths_zip_like_part_one():
+    online = LocationLists()
+    for location in (1, 2, 3):
+        online.insert(LEFT, location)
+    online.insert(RIGHT, 5)
+    assert online.distance == 4
+
+
+def test_from_file_matches_reference(tmp_path):
+    rng = random.Random(3)
+    path = tmp_path / "input.txt"
+    path.write_text(
+        "".join(f"{rng.randrange(1000)}   {rng.randrange(1000)}\n" for _ in range(2000))
+    )
+    online = LocationLists.from_file(path)
+    assert online.distance == part_one_reference(path)
+    assert online.similarity == part_two_reference(path)
+    # Updates from a bulk-loaded state stay in step too
+    for _ in range(50):
+        online.delete(LEFT, online.kth(LEFT, rng.randrange(len(online))))
+        online.insert(LEFT, rng.randrange(1000))
+    rows = [(online.kth(LEFT, i), online.kth(RIGHT, i)) for i in range(len(online))]
+    path.write_text("".join(f"{a}   {b}\n" for a, b in rows))
+    assert online.distance == part_one_reference(path)
+    assert online.similarity == part_two_reference(path)
+
+
+def test_delete_missing_raises():
+    online = LocationLists()
+    online.insert(LEFT, 7)
+    with pytest.raises(KeyError):
+        online.delete(RIGHT, 7)